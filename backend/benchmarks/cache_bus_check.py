@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Exercise the change-stream cache bus against a real MongoDB.
+
+    python benchmarks/cache_bus_check.py               # single-node replica set from PATH
+    python benchmarks/cache_bus_check.py --standalone  # confirm the TTL fallback
+    python benchmarks/cache_bus_check.py --mongo-uri "mongodb://localhost:27017/?replicaSet=rs0"
+
+Two bus instances stand in for two replicas. The script checks that a write
+made elsewhere evicts the cached entry in both, that a restarted bus resumes
+from its token without missing the writes made while it was down, and that
+without a replica set the caches fall back to the short TTL.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from common import SERVICES, LocalMongo, percentile
+
+COLLECTION = "cache_bus_check"
+
+def load_cache_bus(mongo_uri: str):
+    """Import the course service's cache bus module pointed at mongo_uri"""
+    os.environ["MONGO_URI"] = mongo_uri
+    os.environ["CACHE_BUS_RETRY_SECONDS"] = "1"
+    service_dir, _ = SERVICES["course-service"]
+    sys.path.insert(0, str(service_dir))
+    from app.utils import cache_bus
+    return cache_bus
+
+def wait_until(condition, timeout: float = 10.0) -> float:
+    """Poll condition; return the seconds it took to become true"""
+    started = time.perf_counter()
+    while not condition():
+        if time.perf_counter() - started > timeout:
+            raise TimeoutError("Condition not met in time")
+        time.sleep(0.001)
+    return time.perf_counter() - started
+
+def make_replica(module, database):
+    """A bus and one cache, wired up the way a service does at import time"""
+    bus = module.CacheBus(database)
+    cache = bus.cache(COLLECTION)
+    bus.invalidate_on(COLLECTION, cache)
+    return bus, cache
+
+def check_invalidation(module, database, rounds: int) -> list:
+    collection = database[COLLECTION]
+    replicas = [make_replica(module, database) for _ in range(2)]
+    for bus, _ in replicas:
+        bus.start()
+    for bus, _ in replicas:
+        wait_until(lambda: bus.streaming)
+
+    latencies = []
+    doc_id = collection.insert_one({"title": "before"}).inserted_id
+    for i in range(rounds):
+        for _, cache in replicas:
+            cache.set(str(doc_id), {"title": "stale"})
+        started = time.perf_counter()
+        collection.update_one({"_id": doc_id}, {"$set": {"title": f"after {i}"}})
+        for _, cache in replicas:
+            wait_until(lambda: cache.get(str(doc_id)) is None)
+        latencies.append(time.perf_counter() - started)
+
+    # Resume: writes made while a replica is stopped are delivered when it restarts
+    bus, cache = replicas[0]
+    bus.stop()
+    collection.update_one({"_id": doc_id}, {"$set": {"title": "while stopped"}})
+    cache.set(str(doc_id), {"title": "stale"})
+    bus.start()
+    wait_until(lambda: cache.get(str(doc_id)) is None)
+    print("✓ Restarted bus resumed from its token and delivered the missed write")
+
+    for bus, _ in replicas:
+        bus.stop()
+    collection.drop()
+    return latencies
+
+def check_fallback(module, database):
+    bus, cache = make_replica(module, database)
+    bus.start()
+    wait_until(lambda: bus._fallback_logged)
+    assert not bus.streaming, "Bus reports streaming without a replica set"
+    assert bus.ttl() == module.CACHE_TTL_SECONDS
+    bus.stop()
+    print(f"✓ Without a replica set caches use the {module.CACHE_TTL_SECONDS}s TTL")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", help="Use an existing server instead of starting mongod")
+    parser.add_argument("--standalone", action="store_true", help="Start a standalone mongod and check the TTL fallback")
+    parser.add_argument("--rounds", type=int, default=200, help="Writes to time for invalidation latency")
+    args = parser.parse_args()
+
+    with LocalMongo(args.mongo_uri, replica_set=not args.standalone) as mongo:
+        module = load_cache_bus(mongo.uri)
+        database = module.db
+        if args.standalone:
+            check_fallback(module, database)
+            return
+
+        latencies = check_invalidation(module, database, args.rounds)
+        print(f"✓ Both replicas invalidated after every write ({len(latencies)} rounds)")
+        print(f"   p50 {percentile(latencies, 50) * 1000:.1f} ms  "
+              f"p95 {percentile(latencies, 95) * 1000:.1f} ms  "
+              f"p99 {percentile(latencies, 99) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
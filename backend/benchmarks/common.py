@@ -0,0 +1,167 @@
+"""
+Shared helpers for the benchmark scripts: locating the services, starting a
+throwaway mongod, and launching service processes on free ports
+"""
+
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Service name -> (directory, default port)
+SERVICES = {
+    "student-service": (BACKEND_DIR / "student-service", 8001),
+    "course-service": (BACKEND_DIR / "course-service", 8000),
+    "enrollment-service": (BACKEND_DIR / "enrollment-service", 8002),
+}
+
+def free_port() -> int:
+    """Ask the OS for an unused TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def read_rss_mb(pid: int) -> float:
+    """Resident set size of a process in MiB"""
+    status_file = Path(f"/proc/{pid}/status")
+    if status_file.exists():
+        for line in status_file.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    # macOS and other systems without procfs
+    output = subprocess.run(
+        ["ps", "-o", "rss=", "-p", str(pid)],
+        capture_output=True, text=True
+    ).stdout.strip()
+    return int(output) / 1024 if output else 0.0
+
+class LocalMongo:
+    """
+    A throwaway mongod on a random port, or an existing server if MONGO_URI is given.
+    With replica_set=True it runs as a single-node replica set so change streams work.
+    """
+
+    def __init__(self, uri: str = None, replica_set: bool = False):
+        self.uri = uri
+        self.replica_set = replica_set
+        self.process = None
+        self.data_dir = None
+
+    def __enter__(self):
+        if self.uri:
+            return self
+
+        mongod = shutil.which("mongod")
+        if not mongod:
+            raise RuntimeError("mongod not found on PATH; pass --mongo-uri to use an existing server")
+
+        port = free_port()
+        self.data_dir = tempfile.mkdtemp(prefix="bench-mongo-")
+        args = [mongod, "--dbpath", self.data_dir, "--port", str(port), "--bind_ip", "127.0.0.1", "--quiet"]
+        if self.replica_set:
+            args += ["--replSet", "rs0"]
+        self.process = subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.uri = f"mongodb://127.0.0.1:{port}/?directConnection=true"
+        wait_for_port(port, timeout=30)
+        if self.replica_set:
+            initiate_replica_set(self.uri, port)
+        return self
+
+    def __exit__(self, *exc):
+        if self.process:
+            self.process.terminate()
+            self.process.wait(timeout=30)
+        if self.data_dir:
+            shutil.rmtree(self.data_dir, ignore_errors=True)
+
+def initiate_replica_set(uri: str, port: int, timeout: float = 30):
+    """Turn a fresh mongod into a one-member replica set and wait until it is primary"""
+    from pymongo import MongoClient
+
+    client = MongoClient(uri)
+    try:
+        client.admin.command("replSetInitiate", {
+            "_id": "rs0",
+            "members": [{"_id": 0, "host": f"127.0.0.1:{port}"}]
+        })
+        deadline = time.monotonic() + timeout
+        while not client.admin.command("hello").get("isWritablePrimary"):
+            if time.monotonic() > deadline:
+                raise TimeoutError("Replica set did not elect a primary")
+            time.sleep(0.1)
+    finally:
+        client.close()
+
+def wait_for_port(port: int, timeout: float):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+            if sock.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.05)
+    raise TimeoutError(f"Nothing listening on port {port} after {timeout}s")
+
+def service_env(mongo_uri: str, urls: dict = None, extra: dict = None) -> dict:
+    """Environment for a service process; explicit values win over the service's .env"""
+    env = dict(os.environ)
+    env["MONGO_URI"] = mongo_uri
+    env["PYTHONDONTWRITEBYTECODE"] = "1"
+    for name, url in (urls or {}).items():
+        env[name] = url
+    env.update(extra or {})
+    return env
+
+def start_service(name: str, port: int, env: dict, args: list = None, workers: int = None) -> subprocess.Popen:
+    """Launch a service from its own directory: bare uvicorn, or gunicorn.conf.py with workers processes"""
+    service_dir, _ = SERVICES[name]
+    if workers:
+        env = {**env, "WEB_CONCURRENCY": str(workers)}
+        command = ["gunicorn", "main:app", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}"]
+    else:
+        command = ["uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port)]
+    return subprocess.Popen(
+        [sys.executable, "-m", *command, *(args or [])],
+        cwd=service_dir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    )
+
+def wait_healthy(port: int, path: str = "/health", timeout: float = 60.0) -> float:
+    """Poll a service until it answers 200 and return the seconds waited"""
+    started = time.perf_counter()
+    deadline = started + timeout
+    url = f"http://127.0.0.1:{port}{path}"
+    with httpx.Client(timeout=1.0) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if client.get(url).status_code == 200:
+                    return time.perf_counter() - started
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.01)
+    raise TimeoutError(f"{url} did not become healthy within {timeout}s")
+
+def stop_process(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Measure what response compression saves on the wire and costs in CPU.
+
+    # Offline: representative payloads through every gzip level and brotli quality
+    python benchmarks/compression.py
+
+    # Online: fetch live endpoints with each Accept-Encoding the middleware serves
+    python benchmarks/compression.py --url http://localhost:8000/courses \\
+        --url http://localhost:8002/enrollments/student/<id> --token <jwt>
+
+The payloads are shaped like the largest responses the services send: a
+CourseListResponse page of 100 courses, a StudentProgress with dozens of
+EnrollmentWithDetails, and an admin course roster. CPU is process time per
+compression, so it is what one request would add to a worker.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import sys
+import time
+from datetime import datetime
+
+import httpx
+
+from common import SERVICES
+from seed import build_courses, build_enrollment, build_student
+
+GZIP_LEVELS = [1, 5, 6, 9]
+BROTLI_QUALITIES = [1, 4, 6, 11]
+
+def load_compression():
+    """Import the course service's compression module for its defaults and brotli support"""
+    service_dir, _ = SERVICES["course-service"]
+    sys.path.insert(0, str(service_dir))
+    from app.utils import compression
+    return compression
+
+def with_id(document: dict) -> dict:
+    document = dict(document)
+    document["id"] = str(document.pop("_id"))
+    return document
+
+def build_payloads(rng: random.Random) -> dict:
+    """Response bodies shaped like the routes', keyed by a short name"""
+    now = datetime.utcnow()
+    courses = build_courses(100, 0, 0.5, rng, now)
+    students = [build_student(i, "", rng, now) for i in range(200)]
+
+    course_list = {"courses": [with_id({**c, "enrollment_count": rng.randint(0, 300)}) for c in courses], "total": 100}
+
+    enrollments = []
+    for course in rng.sample(courses, 40):
+        status = rng.choice(["enrolled", "enrolled", "completed", "dropped"])
+        enrollments.append({**build_enrollment(students[0], course, status, rng, now), "id": str(course["_id"])})
+    progress = {
+        "total_enrolled": sum(1 for e in enrollments if e["status"] == "enrolled"),
+        "total_completed": sum(1 for e in enrollments if e["status"] == "completed"),
+        "total_dropped": sum(1 for e in enrollments if e["status"] == "dropped"),
+        "total_credits_enrolled": sum(e["course_credits"] for e in enrollments if e["status"] != "dropped"),
+        "total_credits_completed": sum(e["course_credits"] for e in enrollments if e["status"] == "completed"),
+        "enrollments": enrollments
+    }
+
+    course = courses[0]
+    roster_rows = [build_enrollment(s, course, rng.choice(["enrolled", "completed"]), rng, now) for s in students]
+    roster = {
+        "course_id": str(course["_id"]),
+        "course_title": course["title"],
+        "total_enrollments": len(roster_rows),
+        "active_enrollments": sum(1 for r in roster_rows if r["status"] == "enrolled"),
+        "completed_enrollments": sum(1 for r in roster_rows if r["status"] == "completed"),
+        "dropped_enrollments": 0,
+        "students": [
+            {"student_id": r["student_id"], "student_name": r["student_name"], "student_email": r["student_email"],
+             "status": r["status"], "progress": r["progress"], "enrollment_date": r["enrollment_date"]}
+            for r in roster_rows
+        ]
+    }
+
+    return {
+        "GET /courses (100)": course_list,
+        "student progress (40)": progress,
+        "course roster (200)": roster,
+    }
+
+def codecs(compression) -> list:
+    """(label, compress function) for identity, each gzip level and, if installed, each brotli quality"""
+    entries = [("identity", lambda body: body)]
+    for level in GZIP_LEVELS:
+        default = " (default)" if level == compression.GZIP_LEVEL else ""
+        entries.append((f"gzip -{level}{default}", lambda body, level=level: gzip.compress(body, compresslevel=level, mtime=0)))
+    if compression.brotli:
+        for quality in BROTLI_QUALITIES:
+            default = " (default)" if quality == compression.BROTLI_QUALITY else ""
+            entries.append((f"br q{quality}{default}",
+                            lambda body, quality=quality: compression.brotli.compress(body, quality=quality)))
+    return entries
+
+def cpu_ms(function, body: bytes, repeat: int) -> float:
+    started = time.process_time()
+    for _ in range(repeat):
+        function(body)
+    return (time.process_time() - started) * 1000 / repeat
+
+def measure_offline(compression, repeat: int) -> list:
+    results = []
+    for name, payload in build_payloads(random.Random(42)).items():
+        body = json.dumps(payload).encode("utf-8")
+        for label, function in codecs(compression):
+            results.append({
+                "payload": name,
+                "encoding": label,
+                "raw_bytes": len(body),
+                "wire_bytes": len(function(body)),
+                "cpu_ms": cpu_ms(function, body, repeat),
+            })
+    return results
+
+def measure_online(urls: list, token: str, repeat: int, compression) -> list:
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    results = []
+    with httpx.Client(timeout=30) as client:
+        for url in urls:
+            for accept in ["identity"] + compression.supported_encodings():
+                timings = []
+                for _ in range(repeat):
+                    started = time.perf_counter()
+                    response = client.get(url, headers={**headers, "Accept-Encoding": accept})
+                    timings.append((time.perf_counter() - started) * 1000)
+                response.raise_for_status()
+                # num_bytes_downloaded counts the body as it arrived, before httpx decodes it
+                wire_bytes = response.num_bytes_downloaded
+                results.append({
+                    "payload": url,
+                    "encoding": response.headers.get("content-encoding", "identity") + f" (asked {accept})",
+                    "raw_bytes": len(response.content),
+                    "wire_bytes": wire_bytes,
+                    "ms": sum(timings) / len(timings),
+                })
+    return results
+
+def print_table(results: list, timing_key: str, timing_label: str):
+    print(f"{'payload':<36} {'encoding':<26} {'raw':>9} {'wire':>9} {'saved':>6} {timing_label:>9}")
+    for row in results:
+        saved = 1 - row["wire_bytes"] / max(row["raw_bytes"], 1)
+        print(f"{row['payload'][:36]:<36} {row['encoding']:<26} {row['raw_bytes']:>9} {row['wire_bytes']:>9} "
+              f"{saved:>6.0%} {row[timing_key]:>9.3f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", action="append", default=[], help="Live endpoint to fetch (repeatable)")
+    parser.add_argument("--token", help="Bearer token for endpoints that need one")
+    parser.add_argument("--repeat", type=int, default=50, help="Compressions or requests per measurement")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    compression = load_compression()
+    if not compression.brotli:
+        print("⚠️  brotli is not installed; measuring gzip only (pip install brotli)")
+
+    if args.url:
+        results = measure_online(args.url, args.token, args.repeat, compression)
+        print_table(results, "ms", "ms/req")
+    else:
+        results = measure_offline(compression, args.repeat)
+        print_table(results, "cpu_ms", "cpu ms")
+    print(f"\nResponses under {compression.COMPRESSION_MIN_SIZE} bytes are sent uncompressed (COMPRESSION_MIN_SIZE)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"✓ Wrote {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Explain every query the routes issue and flag the ones the indexes serve badly.
+
+    # Against a seeded database (see seed.py), after running migrate.py
+    python benchmarks/index_advisor.py --mongo-uri mongodb://localhost:27017
+
+    # Fail (exit 1) when any query scans the collection or examines too much
+    python benchmarks/index_advisor.py --check --json plans.json
+
+Each entry in build_queries() mirrors one query in a route handler, filled in with ids
+taken from the data (the busiest course, so rosters and counts are the worst
+case). The winning plan is run with executionStats and flagged for a
+collection scan, a blocking in-memory sort, or examining more than
+--max-ratio keys or documents per result (for aggregations, per document their
+$match selects). Keep build_queries() in step with the routes.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from pymongo import MongoClient
+
+ACTIVE = ["enrolled", "completed"]
+
+def count_pipeline(match: dict) -> list:
+    """What count_documents sends to the server"""
+    return [{"$match": match}, {"$group": {"_id": 1, "n": {"$sum": 1}}}]
+
+def build_queries(db) -> list:
+    """(route, collection, command) for each query shape, using ids that exist in db"""
+    sample = db["enrollments"].find_one({"status": "enrolled"})
+    if not sample:
+        raise SystemExit("No enrollments to explain against; seed the database first (benchmarks/seed.py)")
+    busiest = next(db["enrollments"].aggregate([
+        {"$match": {"status": {"$in": ACTIVE}}},
+        {"$group": {"_id": "$course_id", "n": {"$sum": 1}}},
+        {"$sort": {"n": -1}},
+        {"$limit": 1}
+    ]))["_id"]
+    student_id = sample["student_id"]
+    course_id = sample["course_id"]
+    student = db["students"].find_one({}, {"email": 1, "name_normalized": 1}) or {"email": "nobody@example.com"}
+    name_prefix = student.get("name_normalized", "a")[:3]
+    course = db["courses"].find_one({}, {"title": 1}) or {"_id": None, "title": "none"}
+
+    def find(filter, sort=None, limit=0, skip=0, projection=None, collation=None):
+        command = {"filter": filter, "limit": limit, "skip": skip}
+        if sort:
+            command["sort"] = sort
+        if projection:
+            command["projection"] = projection
+        if collation:
+            command["collation"] = collation
+        return ("find", command)
+
+    def aggregate(pipeline):
+        return ("aggregate", {"pipeline": pipeline, "cursor": {}})
+
+    return [
+        # enrollment-service
+        ("POST /enrollments: already enrolled?", "enrollments",
+         find({"student_id": student_id, "course_id": course_id, "status": {"$in": ACTIVE}}, limit=1)),
+        ("POST /enrollments: course full?", "enrollments",
+         aggregate(count_pipeline({"course_id": busiest, "status": "enrolled"}))),
+        ("POST /enrollments/drop, /complete: active enrollment", "enrollments",
+         find({"student_id": student_id, "course_id": course_id, "status": "enrolled"}, limit=1)),
+        ("GET /enrollments/student/{id}", "enrollments",
+         find({"student_id": student_id})),
+        ("GET /enrollments/student/{id}?limit=5", "enrollments",
+         find({"student_id": student_id}, sort={"enrollment_date": -1}, limit=5)),
+        ("GET /enrollments/student/{id}/summary", "student_summaries",
+         find({"_id": student_id}, limit=1)),
+        ("GET /enrollments/course/{id}", "enrollments",
+         find({"course_id": busiest})),
+        ("GET /enrollments/course/{id}/count", "enrollments",
+         aggregate(count_pipeline({"course_id": busiest, "status": {"$in": ACTIVE}}))),
+        ("GET /enrollments/counts", "enrollments",
+         aggregate([
+             {"$match": {"status": {"$in": ACTIVE}}},
+             {"$group": {"_id": "$course_id", "count": {"$sum": 1}}}
+         ])),
+        ("GET /enrollments/stats: per status", "enrollments",
+         aggregate(count_pipeline({"status": "enrolled"}))),
+        ("GET /enrollments", "enrollments",
+         find({}, sort={"enrollment_date": -1}, limit=100)),
+        ("PUT /enrollments/snapshots/course/{id}", "enrollments",
+         aggregate([
+             {"$match": {"course_id": busiest, "status": {"$in": ACTIVE}, "course_credits": {"$ne": -1}}},
+             {"$group": {"_id": {"student_id": "$student_id", "status": "$status"}, "n": {"$sum": 1}}}
+         ])),
+        # course-service
+        ("GET /courses", "courses",
+         find({}, sort={"created_at": -1}, limit=100)),
+        ("GET /courses/search?q=", "courses",
+         find({"$text": {"$search": max(course["title"].split(), key=len)}},
+              sort={"score": {"$meta": "textScore"}, "_id": 1}, limit=20)),
+        ("GET /courses/search?sort=title", "courses",
+         find({}, sort={"title": 1, "_id": 1}, limit=20, collation={"locale": "en", "strength": 2})),
+        ("GET /courses/catalog: seat counts", "enrollments",
+         aggregate([
+             {"$match": {"course_id": {"$in": [busiest, course_id]}, "status": {"$in": ACTIVE}}},
+             {"$group": {"_id": "$course_id", "count": {"$sum": 1}}}
+         ])),
+        ("GET /courses/catalog: caller's enrollments", "enrollments",
+         find({"student_id": student_id, "course_id": {"$in": [busiest, course_id]}, "status": {"$in": ACTIVE}},
+              projection={"course_id": 1, "status": 1})),
+        ("POST /courses: duplicate title", "courses",
+         find({"title": course["title"]}, limit=1)),
+        ("PUT /courses/{id}: duplicate title", "courses",
+         find({"title": course["title"], "_id": {"$ne": course["_id"]}}, limit=1)),
+        # student-service
+        ("POST /students/login", "students",
+         find({"email": student["email"]}, limit=1)),
+        ("PUT /students/me: email taken?", "students",
+         find({"email": student["email"], "_id": {"$ne": student.get("_id")}}, limit=1)),
+        ("GET /admin/students", "students",
+         find({}, limit=100, projection={"password": 0})),
+        ("GET /admin/students/search?field=name", "students",
+         find({"name_normalized": {"$regex": "^" + re.escape(name_prefix)}}, sort={"name_normalized": 1, "_id": 1}, limit=11)),
+        ("GET /admin/students/search?field=email", "students",
+         find({"email_normalized": {"$regex": "^" + re.escape(student["email"][:8].lower())}}, sort={"email_normalized": 1, "_id": 1}, limit=11)),
+    ]
+
+def find_key(document, key):
+    """First value stored under key anywhere in a nested explain document"""
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        values = document.values()
+    elif isinstance(document, list):
+        values = document
+    else:
+        return None
+    for value in values:
+        found = find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+def plan_stages(plan: dict) -> tuple:
+    """Stage names from the root of the winning plan down, plus the indexes it reads"""
+    stages, indexes = [], []
+    pending = [plan.get("queryPlan", plan)]
+    while pending:
+        stage = pending.pop(0)
+        stages.append(stage["stage"])
+        if "indexName" in stage:
+            indexes.append(stage["indexName"])
+        if "inputStage" in stage:
+            pending.append(stage["inputStage"])
+        pending.extend(stage.get("inputStages", []))
+    return stages, indexes
+
+def explain(db, collection: str, kind: str, command: dict) -> dict:
+    result = db.command("explain", {kind: collection, **command}, verbosity="executionStats")
+    winning_plan = find_key(result, "winningPlan") or {}
+    stats = find_key(result, "executionStats") or {}
+    stages, indexes = plan_stages(winning_plan) if winning_plan else ([], [])
+    returned = stats.get("nReturned", 0)
+    if kind == "aggregate":
+        # The pipeline returns groups; what the index has to narrow down is the $match
+        returned = db[collection].count_documents(command["pipeline"][0].get("$match", {}))
+    return {
+        "stages": stages,
+        "indexes": indexes,
+        "keys_examined": stats.get("totalKeysExamined", 0),
+        "docs_examined": stats.get("totalDocsExamined", 0),
+        "returned": returned,
+        "ms": stats.get("executionTimeMillis", 0),
+    }
+
+def is_filtered(kind: str, command: dict) -> bool:
+    if kind == "find":
+        return bool(command["filter"])
+    return bool(command["pipeline"][0].get("$match"))
+
+def review(plan: dict, filtered: bool, max_ratio: float, min_examined: int) -> list:
+    flags = []
+    # Unfiltered pages are meant to read the collection in natural order
+    if "COLLSCAN" in plan["stages"] and filtered:
+        flags.append("collection scan")
+    if "SORT" in plan["stages"]:
+        flags.append("in-memory sort")
+    examined = max(plan["keys_examined"], plan["docs_examined"])
+    ratio = examined / max(plan["returned"], 1)
+    if examined >= min_examined and ratio > max_ratio:
+        flags.append(f"examined {ratio:.0f}x what it returned")
+    return flags
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--max-ratio", type=float, default=10,
+                        help="Flag queries examining more than this many keys or documents per result")
+    parser.add_argument("--min-examined", type=int, default=100,
+                        help="Ignore the ratio for queries examining fewer entries than this")
+    parser.add_argument("--json", help="Write the plans and flags to this file")
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any query is flagged")
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_uri)["student_portal"]
+    report = []
+    for route, collection, (kind, command) in build_queries(db):
+        plan = explain(db, collection, kind, command)
+        plan["flags"] = review(plan, is_filtered(kind, command), args.max_ratio, args.min_examined)
+        report.append({"route": route, "collection": collection, **plan})
+
+    print(f"{'query':<52} {'plan':<34} {'keys':>8} {'docs':>8} {'returned':>8} {'ms':>5}")
+    for entry in report:
+        marker = "❌" if entry["flags"] else "✓"
+        print(f"{marker} {entry['route']:<50} {' > '.join(entry['stages']):<34} "
+              f"{entry['keys_examined']:>8} {entry['docs_examined']:>8} {entry['returned']:>8} {entry['ms']:>5}")
+        if entry["indexes"]:
+            print(f"   index: {', '.join(entry['indexes'])}")
+        for flag in entry["flags"]:
+            print(f"   ⚠️  {flag}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Wrote {args.json}")
+
+    flagged = [entry for entry in report if entry["flags"]]
+    print(f"\n{len(flagged)} of {len(report)} queries flagged")
+    if args.check and flagged:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Drive the portal's core user journeys and report throughput and latency per endpoint.
+
+Student journey: register, log in, then loop over browsing the catalog, opening
+the dashboard and occasionally enrolling. Admin journey: log in, then loop over
+the student list, course rosters and enrollment stats.
+
+    # Against docker-compose (default URLs), started with rate limiting off:
+    #   docker compose -f docker-compose.yml -f docker-compose.benchmark.yml up -d
+    python benchmarks/loadtest.py --users 50 --duration 60
+
+    # Against a local stack started by the script (mongod, migrations, admin, 3 services)
+    python benchmarks/loadtest.py --spawn --users 20 --duration 30 --json run.json
+
+    # The production runtime (gunicorn, uvloop, httptools) with two workers per service
+    python benchmarks/loadtest.py --spawn --workers 2 --users 50 --duration 60
+
+    # Compare with an earlier run
+    python benchmarks/loadtest.py --users 50 --duration 60 --compare run.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import defaultdict
+from contextlib import ExitStack
+from pathlib import Path
+
+import httpx
+
+from common import (
+    SERVICES,
+    LocalMongo,
+    free_port,
+    percentile,
+    service_env,
+    start_service,
+    stop_process,
+    wait_healthy,
+)
+
+ADMIN_EMAIL = "admin@example.com"
+ADMIN_PASSWORD = "admin123"
+STUDENT_PASSWORD = "loadtest-password"
+
+class Recorder:
+    """Collects latency samples and failures per endpoint name"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.throttled = defaultdict(int)
+
+    async def call(self, name: str, request) -> httpx.Response:
+        started = time.perf_counter()
+        try:
+            response = await request
+        except httpx.HTTPError:
+            self.errors[name] += 1
+            return None
+        self.samples[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        if response.status_code == 429:
+            self.throttled[name] += 1
+        return response
+
+    def report(self, elapsed: float) -> dict:
+        results = {}
+        for name in sorted(set(self.samples) | set(self.errors)):
+            latencies = self.samples[name]
+            results[name] = {
+                "requests": len(latencies),
+                "errors": self.errors[name],
+                "rps": round(len(latencies) / elapsed, 1),
+                "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+                "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+                "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+            }
+        return results
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+async def admin_login(client: httpx.AsyncClient, urls: dict, recorder: Recorder) -> str:
+    response = await recorder.call("POST /admin/login", client.post(
+        f"{urls['student']}/admin/login",
+        json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD}
+    ))
+    if response is None or response.status_code != 200:
+        raise RuntimeError("Admin login failed; run setup_admin.py against this database first")
+    return response.json()["access_token"]
+
+async def seed_courses(client: httpx.AsyncClient, urls: dict, count: int) -> list:
+    """Make sure at least `count` courses exist and return their ids"""
+    token = await admin_login(client, urls, Recorder())
+    existing = (await client.get(f"{urls['course']}/courses", params={"limit": count})).json()
+    course_ids = [course["id"] for course in existing["courses"]]
+
+    for i in range(len(course_ids), count):
+        response = await client.post(
+            f"{urls['course']}/courses",
+            headers=bearer(token),
+            json={
+                "title": f"Load Test Course {uuid.uuid4().hex[:8]}",
+                "description": "Seeded by benchmarks/loadtest.py",
+                "credits": random.randint(1, 6),
+                "instructor": f"Instructor {i % 25}",
+                "duration_weeks": random.choice([4, 8, 12, 16]),
+            }
+        )
+        response.raise_for_status()
+        course_ids.append(response.json()["id"])
+    return course_ids
+
+async def student_journey(client, urls, course_ids, recorder, deadline, enroll_rate):
+    email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+    await recorder.call("POST /students/register", client.post(
+        f"{urls['student']}/students/register",
+        json={"name": "Load Test Student", "email": email, "password": STUDENT_PASSWORD}
+    ))
+    response = await recorder.call("POST /students/login", client.post(
+        f"{urls['student']}/students/login",
+        json={"email": email, "password": STUDENT_PASSWORD}
+    ))
+    if response is None or response.status_code != 200:
+        return
+    login = response.json()
+    headers, student_id = bearer(login["access_token"]), login["user"]["id"]
+    remaining = list(course_ids)
+    random.shuffle(remaining)
+
+    while time.monotonic() < deadline:
+        await recorder.call("GET /courses", client.get(
+            f"{urls['course']}/courses", params={"skip": 0, "limit": 100}
+        ))
+        if remaining and random.random() < enroll_rate:
+            await recorder.call("POST /enrollments", client.post(
+                f"{urls['enrollment']}/enrollments",
+                headers=headers,
+                json={"student_id": student_id, "course_id": remaining.pop()}
+            ))
+        await recorder.call("GET /enrollments/student/{id}", client.get(
+            f"{urls['enrollment']}/enrollments/student/{student_id}", headers=headers
+        ))
+
+async def admin_journey(client, urls, course_ids, recorder, deadline):
+    headers = bearer(await admin_login(client, urls, recorder))
+    while time.monotonic() < deadline:
+        await recorder.call("GET /admin/students", client.get(
+            f"{urls['student']}/admin/students", headers=headers, params={"skip": 0, "limit": 50}
+        ))
+        await recorder.call("GET /enrollments/course/{id}", client.get(
+            f"{urls['enrollment']}/enrollments/course/{random.choice(course_ids)}", headers=headers
+        ))
+        await recorder.call("GET /enrollments/stats", client.get(
+            f"{urls['enrollment']}/enrollments/stats", headers=headers
+        ))
+
+async def run_load(urls: dict, users: int, admins: int, duration: float, courses: int, enroll_rate: float) -> tuple:
+    limits = httpx.Limits(max_connections=users + admins + 10)
+    async with httpx.AsyncClient(timeout=30.0, limits=limits) as client:
+        course_ids = await seed_courses(client, urls, courses)
+        recorder = Recorder()
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(
+            *(student_journey(client, urls, course_ids, recorder, deadline, enroll_rate) for _ in range(users)),
+            *(admin_journey(client, urls, course_ids, recorder, deadline) for _ in range(admins))
+        )
+        return recorder.report(time.monotonic() - started), dict(recorder.throttled)
+
+def run_script(service: str, script: str, env: dict):
+    service_dir, _ = SERVICES[service]
+    subprocess.run([sys.executable, script], cwd=service_dir, env=env, check=True, stdout=subprocess.DEVNULL)
+
+def spawn_stack(stack: ExitStack, mongo_uri: str, workers: int = None) -> dict:
+    """Start all three services against mongo_uri and return their base URLs"""
+    ports = {name: free_port() for name in SERVICES}
+    urls = {
+        "STUDENT_SERVICE_URL": f"http://127.0.0.1:{ports['student-service']}",
+        "COURSE_SERVICE_URL": f"http://127.0.0.1:{ports['course-service']}",
+        "ENROLLMENT_SERVICE_URL": f"http://127.0.0.1:{ports['enrollment-service']}",
+    }
+    # Every simulated user connects from this one address, so per-client limits would
+    # throttle the whole run; the concurrency cap stays on
+    env = service_env(mongo_uri, urls, {"RATE_LIMIT_ENABLED": "false"})
+    for name in SERVICES:
+        run_script(name, "migrate.py", env)
+    run_script("student-service", "setup_admin.py", env)
+
+    for name, port in ports.items():
+        process = start_service(name, port, env, workers=workers)
+        stack.callback(stop_process, process)
+        wait_healthy(port, "/ready")
+
+    return {
+        "student": urls["STUDENT_SERVICE_URL"],
+        "course": urls["COURSE_SERVICE_URL"],
+        "enrollment": urls["ENROLLMENT_SERVICE_URL"],
+    }
+
+def print_report(results: dict, baseline: dict = None):
+    header = f"{'endpoint':<32}{'reqs':>8}{'errs':>6}{'rps':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    print(header + (f"{'Δp95':>9}{'Δrps':>9}" if baseline else ""))
+    for name, r in results.items():
+        line = f"{name:<32}{r['requests']:>8}{r['errors']:>6}{r['rps']:>8}{r['p50_ms']:>9}{r['p95_ms']:>9}{r['p99_ms']:>9}"
+        if baseline and name in baseline.get("endpoints", {}):
+            before = baseline["endpoints"][name]
+            line += f"{format_delta(before['p95_ms'], r['p95_ms']):>9}{format_delta(before['rps'], r['rps']):>9}"
+        print(line)
+
+def format_delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.0f}%"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--student-url", default="http://localhost:8001")
+    parser.add_argument("--course-url", default="http://localhost:8000")
+    parser.add_argument("--enrollment-url", default="http://localhost:8002")
+    parser.add_argument("--spawn", action="store_true", help="Start mongod and the three services locally")
+    parser.add_argument("--mongo-uri", help="With --spawn, use this MongoDB instead of starting mongod")
+    parser.add_argument("--workers", type=int,
+                        help="With --spawn, run each service under gunicorn.conf.py with this many workers instead of bare uvicorn")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent student sessions")
+    parser.add_argument("--admins", type=int, default=2, help="Concurrent admin sessions")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds of load after seeding")
+    parser.add_argument("--courses", type=int, default=50, help="Courses to make sure exist before the run")
+    parser.add_argument("--enroll-rate", type=float, default=0.3, help="Chance a student enrolls on each loop")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for reproducible journeys")
+    parser.add_argument("--json", dest="json_path", help="Write results to this file")
+    parser.add_argument("--compare", help="Earlier --json output to compare against")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    urls = {"student": args.student_url, "course": args.course_url, "enrollment": args.enrollment_url}
+
+    with ExitStack() as stack:
+        if args.spawn:
+            mongo = stack.enter_context(LocalMongo(args.mongo_uri))
+            urls = spawn_stack(stack, mongo.uri, args.workers)
+        results, throttled = asyncio.run(
+            run_load(urls, args.users, args.admins, args.duration, args.courses, args.enroll_rate)
+        )
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(results, baseline)
+
+    if throttled:
+        # Throttled students stop after register or login, so the run measured far less load than asked for
+        counts = ", ".join(f"{name}: {count}" for name, count in sorted(throttled.items()))
+        sys.exit(
+            f"\n❌ Rate limited ({counts}); results are not comparable and were not saved.\n"
+            "   Start the stack with docker-compose.benchmark.yml (RATE_LIMIT_ENABLED=false) or use --spawn."
+        )
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps({
+            "config": {k: v for k, v in vars(args).items() if k not in ("json_path", "compare")},
+            "endpoints": results
+        }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Bulk-load a synthetic dataset for scale testing: students, courses and
+enrollments with skewed course popularity and per-course drop rates.
+
+    # 100k students, 5k courses, ~2M enrollments (the defaults)
+    python benchmarks/seed.py --mongo-uri mongodb://localhost:27017
+
+    # Something quick for a laptop
+    python benchmarks/seed.py --students 5000 --courses 300 --per-student 8 --reset
+
+Every seeded student logs in with SEED_PASSWORD and gets the same
+student_summaries document the enrollment service would maintain. Run each
+service's migrate.py first so the unique indexes exist; --reset wipes the
+seeded collections and is meant for throwaway databases only.
+"""
+
+import argparse
+import os
+import random
+import time
+from bisect import bisect_left
+from datetime import datetime, timedelta
+
+import bcrypt
+from bson import ObjectId
+from pymongo import MongoClient
+
+SEED_PASSWORD = "seeded-password"
+EMAIL_DOMAIN = "seed.example.com"
+
+FIRST_NAMES = ["Aarav", "Maya", "Liam", "Zara", "Noah", "Priya", "Ethan", "Chloe", "Omar", "Sofia",
+               "Ravi", "Emma", "Lucas", "Aisha", "Mateo", "Hana", "Kai", "Nina", "Leo", "Isla"]
+LAST_NAMES = ["Sharma", "Smith", "Garcia", "Chen", "Khan", "Nguyen", "Patel", "Brown", "Silva", "Kim",
+              "Mueller", "Rossi", "Ito", "Okafor", "Cohen", "Novak", "Lopez", "Singh", "Walker", "Haddad"]
+SUBJECTS = ["Algorithms", "Databases", "Statistics", "Economics", "Biology", "Physics", "Design",
+            "Marketing", "Psychology", "Linear Algebra", "Networks", "Ethics", "Chemistry", "History"]
+LEVELS = ["Introduction to", "Foundations of", "Applied", "Advanced", "Topics in", "Practical"]
+DROP_REASONS = ["Schedule conflict", "Too difficult", "Lost interest", "Switched programs", None]
+CAPACITIES = [30, 50, 100, 200, 500]
+
+class ZipfSampler:
+    """Draws course indexes where rank k is picked with weight 1 / k**skew"""
+
+    def __init__(self, size: int, skew: float, rng: random.Random):
+        self.rng = rng
+        total = 0.0
+        self.cumulative = []
+        for rank in range(1, size + 1):
+            total += 1.0 / rank ** skew
+            self.cumulative.append(total)
+        self.total = total
+
+    def sample(self) -> int:
+        return bisect_left(self.cumulative, self.rng.random() * self.total)
+
+    def sample_distinct(self, count: int) -> set:
+        picked = set()
+        # Heavy skew makes repeats common; the cap keeps tiny catalogs from looping forever
+        for _ in range(count * 20):
+            if len(picked) == count:
+                break
+            picked.add(self.sample())
+        return picked
+
+def hash_password_once() -> str:
+    """bcrypt is deliberately slow, so every seeded student shares one hash"""
+    return bcrypt.hashpw(SEED_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+
+def random_date(rng: random.Random, now: datetime, days_back: int) -> datetime:
+    return now - timedelta(seconds=rng.randint(0, days_back * 86400))
+
+def build_courses(count: int, offset: int, capped_fraction: float, rng: random.Random, now: datetime) -> list:
+    courses = []
+    for i in range(offset, offset + count):
+        created = random_date(rng, now, 730).isoformat()
+        courses.append({
+            "_id": ObjectId(),
+            # The number keeps titles unique across runs and catalog sizes
+            "title": f"{rng.choice(LEVELS)} {rng.choice(SUBJECTS)} {i + 1:05d}",
+            "description": "Synthetic course generated by benchmarks/seed.py",
+            "credits": rng.randint(1, 6),
+            "instructor": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            "duration_weeks": rng.choice([4, 6, 8, 12, 16]),
+            "max_students": rng.choice(CAPACITIES) if rng.random() < capped_fraction else None,
+            "current_enrollments": 0,
+            "created_at": created,
+            "updated_at": created
+        })
+    return courses
+
+def build_student(index: int, password_hash: str, rng: random.Random, now: datetime) -> dict:
+    created = random_date(rng, now, 730).isoformat()
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        # What the student service's normalize_name gives for these plain ASCII names
+        "name_normalized": name.lower(),
+        "email": f"student{index:07d}@{EMAIL_DOMAIN}",
+        "email_normalized": f"student{index:07d}@{EMAIL_DOMAIN}".lower(),
+        "password": password_hash,
+        "created_at": created,
+        "updated_at": created
+    }
+
+def build_summary(student_id: str, enrollments: list, now: datetime) -> dict:
+    """The student_summaries document the enrollment service would have maintained"""
+    counted = [e for e in enrollments if e["status"] in ("enrolled", "completed")]
+    return {
+        "_id": student_id,
+        "total_enrolled": sum(1 for e in enrollments if e["status"] == "enrolled"),
+        "total_completed": sum(1 for e in enrollments if e["status"] == "completed"),
+        "total_dropped": sum(1 for e in enrollments if e["status"] == "dropped"),
+        "total_credits_enrolled": sum(e["course_credits"] for e in counted),
+        "total_credits_completed": sum(e["course_credits"] for e in counted if e["status"] == "completed"),
+        "updated_at": now.isoformat()
+    }
+
+def build_enrollment(student: dict, course: dict, status: str, rng: random.Random, now: datetime) -> dict:
+    enrolled_at = random_date(rng, now, 365)
+    finished_at = (enrolled_at + timedelta(days=rng.randint(1, 120))).isoformat()
+    return {
+        "student_id": str(student["_id"]),
+        "course_id": str(course["_id"]),
+        "status": status,
+        "progress": 100 if status == "completed" else rng.randint(0, 99),
+        "course_title": course["title"],
+        "course_credits": course["credits"],
+        "student_name": student["name"],
+        "student_email": student["email"],
+        "enrollment_date": enrolled_at.isoformat(),
+        "completion_date": finished_at if status == "completed" else None,
+        "drop_date": finished_at if status == "dropped" else None,
+        "drop_reason": rng.choice(DROP_REASONS) if status == "dropped" else None
+    }
+
+class BatchWriter:
+    """Buffers documents and flushes them with unordered insert_many"""
+
+    def __init__(self, collection, batch_size: int):
+        self.collection = collection
+        self.batch_size = batch_size
+        self.buffer = []
+        self.written = 0
+
+    def add(self, document: dict):
+        self.buffer.append(document)
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            # Unordered lets the server apply the batch without stopping at the first error
+            self.collection.insert_many(self.buffer, ordered=False)
+            self.written += len(self.buffer)
+            self.buffer = []
+
+def seed(args):
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    # The services' relaxed profile for imports: journaled on the primary, no wait for a majority
+    db = MongoClient(args.mongo_uri, w=1, journal=True)["student_portal"]
+
+    if args.reset:
+        for name in ("students", "courses", "enrollments", "student_summaries"):
+            db[name].delete_many({})
+        print("✓ Cleared students, courses, enrollments and summaries")
+
+    started = time.perf_counter()
+    course_offset = db["courses"].count_documents({})
+    courses = build_courses(args.courses, course_offset, args.capped_fraction, rng, now)
+    rng.shuffle(courses)  # Popularity rank is independent of title and creation date
+    for start in range(0, len(courses), args.batch_size):
+        db["courses"].insert_many(courses[start:start + args.batch_size], ordered=False)
+    print(f"✓ Inserted {len(courses)} courses")
+
+    # Each course gets its own drop rate so some courses shed students far more than others
+    drop_rates = [rng.betavariate(2, 2 / args.drop_rate - 2) for _ in courses]
+    active = [0] * len(courses)
+    popularity = ZipfSampler(len(courses), args.skew, rng)
+    password_hash = hash_password_once()
+
+    students = BatchWriter(db["students"], args.batch_size)
+    enrollments = BatchWriter(db["enrollments"], args.batch_size)
+    summaries = BatchWriter(db["student_summaries"], args.batch_size)
+    offset = db["students"].count_documents({"email": {"$regex": f"@{EMAIL_DOMAIN}$"}})
+
+    for index in range(offset, offset + args.students):
+        student = build_student(index, password_hash, rng, now)
+        students.add(student)
+        student_id = str(student["_id"])
+
+        student_enrollments = []
+        wanted = min(len(courses), max(1, round(rng.expovariate(1 / args.per_student))))
+        for course_index in popularity.sample_distinct(wanted):
+            course = courses[course_index]
+            roll = rng.random()
+            if roll < drop_rates[course_index]:
+                status = "dropped"
+            elif roll < drop_rates[course_index] + args.completion_rate:
+                status = "completed"
+            elif course["max_students"] and active[course_index] >= course["max_students"]:
+                continue  # Full; the API would have refused this enrollment too
+            else:
+                status = "enrolled"
+                active[course_index] += 1
+            student_enrollments.append(build_enrollment(student, course, status, rng, now))
+
+        for enrollment in student_enrollments:
+            enrollments.add(enrollment)
+        summaries.add(build_summary(student_id, student_enrollments, now))
+
+        if (index - offset + 1) % args.batch_size == 0:
+            elapsed = time.perf_counter() - started
+            print(f"  {index - offset + 1} students, {enrollments.written + len(enrollments.buffer)} enrollments ({elapsed:.0f}s)")
+
+    students.flush()
+    enrollments.flush()
+    summaries.flush()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Seeded {students.written} students, {len(courses)} courses and "
+          f"{enrollments.written} enrollments in {elapsed:.1f}s "
+          f"({(students.written + enrollments.written) / elapsed:.0f} docs/s)")
+    print(f"   Students log in as student<N>@{EMAIL_DOMAIN} / {SEED_PASSWORD}")
+
+    top = sorted(range(len(courses)), key=lambda i: active[i], reverse=True)[:3]
+    for i in top:
+        print(f"   {active[i]:>7} active  {courses[i]['title']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGO_URI", "mongodb://localhost:27017"))
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--courses", type=int, default=5_000)
+    parser.add_argument("--per-student", type=float, default=20, help="Mean enrollments per student (exponential)")
+    parser.add_argument("--skew", type=float, default=1.1, help="Zipf exponent for course popularity; 0 is uniform")
+    parser.add_argument("--drop-rate", type=float, default=0.15, help="Mean share of enrollments that are dropped")
+    parser.add_argument("--completion-rate", type=float, default=0.3, help="Share of enrollments that are completed")
+    parser.add_argument("--capped-fraction", type=float, default=0.3, help="Share of courses with max_students")
+    parser.add_argument("--batch-size", type=int, default=10_000, help="Documents per insert_many")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same distributions")
+    parser.add_argument("--reset", action="store_true", help="Delete existing students, courses and enrollments first")
+    args = parser.parse_args()
+
+    if not 0 < args.drop_rate < 1:
+        parser.error("--drop-rate must be between 0 and 1")
+    if args.drop_rate + args.completion_rate > 1:
+        parser.error("--drop-rate plus --completion-rate must not exceed 1")
+    seed(args)
+
+if __name__ == "__main__":
+    main()
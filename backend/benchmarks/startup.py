@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Measure cold-start cost for each service: import time of main.py, time from
+process spawn to the first healthy response, and resident memory once healthy.
+
+    python benchmarks/startup.py                 # report only
+    python benchmarks/startup.py --check         # fail if over startup_budget.json
+    python benchmarks/startup.py --mongo-uri mongodb://localhost:27017
+
+Without --mongo-uri a throwaway mongod is started from PATH.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from common import (
+    SERVICES,
+    LocalMongo,
+    free_port,
+    read_rss_mb,
+    service_env,
+    start_service,
+    stop_process,
+    wait_healthy,
+)
+
+BUDGET_FILE = Path(__file__).resolve().parent / "startup_budget.json"
+HEALTH_PATH = "/ready"
+
+def measure_import(name: str, env: dict) -> tuple:
+    """Import main.py in a fresh interpreter; return (total_ms, slowest imports)"""
+    service_dir, _ = SERVICES[name]
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=service_dir,
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {name} failed:\n{result.stderr[-2000:]}")
+
+    # Lines look like: "import time:   self [us] |  cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, cumulative_us, module = [part.strip() for part in line.replace("import time:", "|").split("|")]
+        modules.append((module, int(self_us), int(cumulative_us)))
+
+    total_us = next((cumulative for module, _, cumulative in modules if module == "main"), 0)
+    slowest = sorted(modules, key=lambda m: m[1], reverse=True)[:5]
+    return total_us / 1000, slowest
+
+def measure_ready(name: str, env: dict) -> tuple:
+    """Spawn uvicorn and time the first healthy response; return (ready_ms, rss_mb)"""
+    port = free_port()
+    started = time.perf_counter()
+    process = start_service(name, port, env)
+    try:
+        wait_healthy(port, HEALTH_PATH)
+        ready_ms = (time.perf_counter() - started) * 1000
+        return ready_ms, read_rss_mb(process.pid)
+    finally:
+        stop_process(process)
+
+def run(services: list, runs: int, mongo_uri: str) -> dict:
+    results = {}
+    for name in services:
+        env = service_env(mongo_uri)
+        import_times, ready_times, rss_values = [], [], []
+        slowest = []
+        for _ in range(runs):
+            import_ms, slowest = measure_import(name, env)
+            ready_ms, rss_mb = measure_ready(name, env)
+            import_times.append(import_ms)
+            ready_times.append(ready_ms)
+            rss_values.append(rss_mb)
+
+        results[name] = {
+            "import_ms": round(statistics.median(import_times), 1),
+            "ready_ms": round(statistics.median(ready_times), 1),
+            "rss_mb": round(statistics.median(rss_values), 1),
+            "slowest_imports": [
+                {"module": module, "self_ms": round(self_us / 1000, 1)}
+                for module, self_us, _ in slowest
+            ]
+        }
+    return results
+
+def check_budget(results: dict, budget: dict, tolerance: float) -> list:
+    """Return a description of every metric that exceeds its budget"""
+    failures = []
+    for name, metrics in results.items():
+        limits = budget.get(name, {})
+        for metric in ("import_ms", "ready_ms", "rss_mb"):
+            limit = limits.get(metric)
+            if limit is not None and metrics[metric] > limit * (1 + tolerance):
+                failures.append(f"{name} {metric}: {metrics[metric]} > budget {limit}")
+    return failures
+
+def print_report(results: dict):
+    print(f"{'service':<22}{'import ms':>12}{'ready ms':>12}{'rss MiB':>10}")
+    for name, metrics in results.items():
+        print(f"{name:<22}{metrics['import_ms']:>12}{metrics['ready_ms']:>12}{metrics['rss_mb']:>10}")
+        for module in metrics["slowest_imports"]:
+            print(f"    {module['self_ms']:>8} ms  {module['module']}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--service", action="append", choices=list(SERVICES), help="Limit to one or more services")
+    parser.add_argument("--runs", type=int, default=3, help="Cold starts per service (median is reported)")
+    parser.add_argument("--mongo-uri", help="Use an existing MongoDB instead of starting mongod")
+    parser.add_argument("--check", action="store_true", help="Exit non-zero when a budget is exceeded")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="Allowed overshoot as a fraction of the budget")
+    parser.add_argument("--json", dest="json_path", help="Also write results to this file")
+    args = parser.parse_args()
+
+    with LocalMongo(args.mongo_uri) as mongo:
+        results = run(args.service or list(SERVICES), args.runs, mongo.uri)
+
+    print_report(results)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2))
+
+    if args.check:
+        failures = check_budget(results, json.loads(BUDGET_FILE.read_text()), args.tolerance)
+        if failures:
+            print("\n❌ Startup budget exceeded:")
+            for failure in failures:
+                print(f"   {failure}")
+            sys.exit(1)
+        print("\n✅ Startup within budget")
+
+if __name__ == "__main__":
+    main()
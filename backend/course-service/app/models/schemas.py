@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Literal, Optional
 from datetime import datetime
 
 class CourseCreate(BaseModel):
@@ -35,3 +35,25 @@ class CourseListResponse(BaseModel):
     total: int
     skip: int
     limit: int
+
+class CatalogCourse(CourseResponse):
+    seats_left: Optional[int] = None  # None when the course has no cap
+    enrollment_status: Optional[str] = None  # The caller's enrolled/completed status, if any
+
+class CatalogResponse(BaseModel):
+    courses: list[CatalogCourse]
+    total: int
+    skip: int
+    limit: int
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    progress: float = 0.0  # 0 to 1
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
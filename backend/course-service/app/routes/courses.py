@@ -1,21 +1,51 @@
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, HTTPException, status, Header, BackgroundTasks, Response
 from bson import ObjectId
 from datetime import datetime
 from typing import Optional
-import httpx
+import os
 
 from app.models.schemas import (
     CourseCreate,
     CourseUpdate,
     CourseResponse,
-    CourseListResponse
+    CourseListResponse,
+    CatalogCourse,
+    CatalogResponse,
+    JobResponse
 )
-from app.utils.database import courses_collection, db
+from app.utils.database import (
+    courses_collection, courses_durable, courses_replica, enrollments_replica, db, TITLE_COLLATION
+)
+from app.utils.consistency import causal_session
 from app.utils.jwt_handler import verify_token, get_token_from_header
+from app.utils.http_client import get_http_client
+from app.utils.cache_bus import cache_bus
+from app.utils.jobs import Job, JobFailed, job_queue
+from app.routes.jobs import job_response
 
 router = APIRouter(prefix="/courses", tags=["Courses"])
 
-ENROLLMENT_SERVICE_URL = "http://localhost:8002"
+ENROLLMENT_SERVICE_URL = os.getenv("ENROLLMENT_SERVICE_URL", "http://localhost:8002")
+
+# Invalidated by the change stream when any replica of any service writes
+courses_cache = cache_bus.cache("courses")
+enrollment_counts_cache = cache_bus.cache("enrollment_counts", maxsize=1)
+cache_bus.invalidate_on("courses", courses_cache)
+cache_bus.invalidate_on("enrollments", enrollment_counts_cache, by_id=False)
+
+MAX_SEARCH_LIMIT = 100
+
+# Enrollment statuses that hold a seat, as the enrollment service counts them
+ACTIVE_STATUSES = ["enrolled", "completed"]
+
+# Sort options for search; ties break on _id so pages don't overlap
+SEARCH_SORTS = {
+    "relevance": [("score", {"$meta": "textScore"}), ("_id", 1)],
+    "newest": [("created_at", -1), ("_id", 1)],
+    "title": [("title", 1), ("_id", 1)],
+    "credits": [("credits", 1), ("title", 1), ("_id", 1)],
+    "duration": [("duration_weeks", 1), ("title", 1), ("_id", 1)],
+}
 
 def verify_admin(authorization: str):
     """Verify that the user is an admin"""
@@ -29,6 +59,114 @@ def verify_admin(authorization: str):
         )
     return decoded
 
+async def propagate_course_snapshot(course_id: str, changes: dict, authorization: str):
+    """Push a new title or credits to the copies stored on enrollments"""
+    try:
+        response = await get_http_client().put(
+            f"{ENROLLMENT_SERVICE_URL}/enrollments/snapshots/course/{course_id}",
+            json=changes,
+            headers={"Authorization": authorization}
+        )
+        response.raise_for_status()
+        print(f"✓ Updated course snapshot on {response.json().get('updated', 0)} enrollments")
+    except Exception as e:
+        # Enrollments keep the old values until the next update or a backfill
+        print(f"⚠️  Could not propagate course {course_id} changes: {e}")
+
+async def get_enrollment_counts() -> dict:
+    """Active enrollments per course id, empty if the enrollment service is unavailable"""
+    enrollment_counts = enrollment_counts_cache.get("all")
+    if enrollment_counts is None:
+        enrollment_counts = {}
+        generation = enrollment_counts_cache.generation()
+        try:
+            response = await get_http_client().get(f"{ENROLLMENT_SERVICE_URL}/enrollments/counts")
+            if response.status_code == 200:
+                enrollment_counts = response.json()
+                enrollment_counts_cache.set("all", enrollment_counts, generation)
+        except:
+            pass  # Continue with empty counts if service unavailable
+    return enrollment_counts
+
+def course_response(course: dict, enrollment_count: int) -> CourseResponse:
+    return CourseResponse(
+        id=str(course["_id"]),
+        title=course["title"],
+        description=course.get("description"),
+        credits=course["credits"],
+        instructor=course.get("instructor"),
+        duration_weeks=course.get("duration_weeks"),
+        max_students=course.get("max_students"),
+        current_enrollments=enrollment_count,
+        created_at=course.get("created_at"),
+        updated_at=course.get("updated_at")
+    )
+
+def range_filter(low: Optional[int], high: Optional[int]) -> dict:
+    bounds = {}
+    if low is not None:
+        bounds["$gte"] = low
+    if high is not None:
+        bounds["$lte"] = high
+    return bounds
+
+# ========== SEARCH HELPERS ==========
+
+def resolve_sort(q: Optional[str], sort: Optional[str]) -> str:
+    """The requested sort, or relevance for text queries and newest otherwise"""
+    q = (q or "").strip()
+    sort = sort or ("relevance" if q else "newest")
+    if sort not in SEARCH_SORTS or (sort == "relevance" and not q):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of: {', '.join(SEARCH_SORTS)} (relevance needs q)"
+        )
+    return sort
+
+def search_query(q: str, min_credits, max_credits, min_weeks, max_weeks) -> dict:
+    query = {}
+    if q:
+        # Served by the text index; matches whole words in any case, title hits ranking first
+        query["$text"] = {"$search": q}
+    if min_credits is not None or max_credits is not None:
+        query["credits"] = range_filter(min_credits, max_credits)
+    if min_weeks is not None or max_weeks is not None:
+        query["duration_weeks"] = range_filter(min_weeks, max_weeks)
+    return query
+
+def exclude_full_courses(query: dict, counts_for):
+    """Add the ids of capped courses that are full to query; counts_for(ids) returns their counts"""
+    capped = list(courses_replica.find({**query, "max_students": {"$ne": None}}, {"max_students": 1}))
+    counts = counts_for([str(c["_id"]) for c in capped]) if capped else {}
+    # Filtering by id leaves counting and paging to Mongo
+    full_ids = [c["_id"] for c in capped if counts.get(str(c["_id"]), 0) >= c["max_students"]]
+    if full_ids:
+        query["_id"] = {"$nin": full_ids}
+
+def find_page(query: dict, q: str, sort: str, skip: int, limit: int) -> tuple:
+    """(total matches, one page of course documents)"""
+    total = courses_replica.count_documents(query)
+    # Title order walks the case-insensitive index; text queries can't take a collation,
+    # so their (already small) results sort case-sensitively
+    collation = TITLE_COLLATION if sort == "title" and not q else None
+    courses = list(
+        courses_replica.find(query, collation=collation)
+        .sort(SEARCH_SORTS[sort])
+        .skip(skip)
+        .limit(limit)
+    )
+    return total, courses
+
+def active_enrollment_counts(course_ids: list) -> dict:
+    """Enrolled and completed students per course, in one aggregation over the course_id/status index"""
+    if not course_ids:
+        return {}
+    pipeline = [
+        {"$match": {"course_id": {"$in": course_ids}, "status": {"$in": ACTIVE_STATUSES}}},
+        {"$group": {"_id": "$course_id", "count": {"$sum": 1}}}
+    ]
+    return {item["_id"]: item["count"] for item in enrollments_replica.aggregate(pipeline)}
+
 # ========== COURSE CRUD OPERATIONS ==========
 
 @router.post("", response_model=CourseResponse, status_code=status.HTTP_201_CREATED)
@@ -53,7 +191,7 @@ async def create_course(course: CourseCreate, authorization: str = Header(...)):
     }
     
     try:
-        result = courses_collection.insert_one(course_doc)
+        result = courses_durable.insert_one(course_doc)
         created_course = courses_collection.find_one({"_id": result.inserted_id})
     except Exception as e:
         # Handle duplicate key errors gracefully
@@ -85,42 +223,125 @@ async def create_course(course: CourseCreate, authorization: str = Header(...)):
 @router.get("", response_model=CourseListResponse)
 async def get_all_courses(skip: int = 0, limit: int = 100):
     """Get all courses (paginated)"""
-    total = courses_collection.count_documents({})
+    total = courses_replica.count_documents({})
     
     courses = list(
-        courses_collection.find()
+        courses_replica.find()
         .skip(skip)
         .limit(limit)
         .sort("created_at", -1)
     )
     
     # Get enrollment counts from enrollment service
-    enrollment_counts = {}
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(f"{ENROLLMENT_SERVICE_URL}/enrollments/counts")
-            if response.status_code == 200:
-                enrollment_counts = response.json()
-    except:
-        pass  # Continue with empty counts if service unavailable
+    enrollment_counts = await get_enrollment_counts()
+    
+    course_list = [
+        course_response(course, enrollment_counts.get(str(course["_id"]), 0))
+        for course in courses
+    ]
+    
+    return CourseListResponse(
+        courses=course_list,
+        total=total,
+        skip=skip,
+        limit=limit
+    )
+
+@router.get("/search", response_model=CourseListResponse)
+async def search_courses(
+    q: Optional[str] = None,
+    min_credits: Optional[int] = None,
+    max_credits: Optional[int] = None,
+    min_weeks: Optional[int] = None,
+    max_weeks: Optional[int] = None,
+    has_seats: bool = False,
+    sort: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+):
+    """Search courses by title and instructor, with filters and sorting (public)"""
+    q, sort = (q or "").strip(), resolve_sort(q, sort)
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    query = search_query(q, min_credits, max_credits, min_weeks, max_weeks)
+    
+    enrollment_counts = await get_enrollment_counts()
+    if has_seats:
+        exclude_full_courses(query, lambda course_ids: enrollment_counts)
+    
+    total, courses = find_page(query, q, sort, skip, limit)
+    
+    course_list = [
+        course_response(course, enrollment_counts.get(str(course["_id"]), 0))
+        for course in courses
+    ]
+    
+    return CourseListResponse(
+        courses=course_list,
+        total=total,
+        skip=skip,
+        limit=limit
+    )
+
+@router.get("/catalog", response_model=CatalogResponse)
+async def get_catalog(
+    authorization: Optional[str] = Header(None),
+    x_causal_token: Optional[str] = Header(None),
+    q: Optional[str] = None,
+    min_credits: Optional[int] = None,
+    max_credits: Optional[int] = None,
+    min_weeks: Optional[int] = None,
+    max_weeks: Optional[int] = None,
+    has_seats: bool = False,
+    sort: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20
+):
+    """Everything the course browser shows in one call: a search page, seat counts and the caller's enrollments"""
+    student_id = None
+    if authorization:
+        decoded = verify_token(get_token_from_header(authorization))
+        if decoded.get("role") == "student":
+            student_id = decoded.get("id")
+    
+    q, sort = (q or "").strip(), resolve_sort(q, sort)
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    query = search_query(q, min_credits, max_credits, min_weeks, max_weeks)
+    
+    # Counts come straight from the enrollments collection, only for the courses involved
+    seat_counts = {}
+    if has_seats:
+        def count_seats(course_ids):
+            seat_counts.update(active_enrollment_counts(course_ids))
+            return seat_counts
+        exclude_full_courses(query, count_seats)
+    
+    total, courses = find_page(query, q, sort, skip, limit)
+    page_ids = [str(course["_id"]) for course in courses]
+    seat_counts.update(active_enrollment_counts([i for i in page_ids if i not in seat_counts]))
+    
+    statuses = {}
+    if student_id and page_ids:
+        # The token from the student's last enroll or drop keeps a lagging secondary from undoing it here
+        with causal_session(x_causal_token) as session:
+            for enrollment in enrollments_replica.find(
+                {"student_id": student_id, "course_id": {"$in": page_ids}, "status": {"$in": ACTIVE_STATUSES}},
+                {"course_id": 1, "status": 1},
+                session=session
+            ):
+                statuses[enrollment["course_id"]] = enrollment["status"]
     
     course_list = []
     for course in courses:
         course_id = str(course["_id"])
-        course_list.append(CourseResponse(
-            id=course_id,
-            title=course["title"],
-            description=course.get("description"),
-            credits=course["credits"],
-            instructor=course.get("instructor"),
-            duration_weeks=course.get("duration_weeks"),
-            max_students=course.get("max_students"),
-            current_enrollments=enrollment_counts.get(course_id, 0),
-            created_at=course.get("created_at"),
-            updated_at=course.get("updated_at")
+        count = seat_counts.get(course_id, 0)
+        max_students = course.get("max_students")
+        course_list.append(CatalogCourse(
+            **course_response(course, count).dict(),
+            seats_left=max(0, max_students - count) if max_students else None,
+            enrollment_status=statuses.get(course_id)
         ))
     
-    return CourseListResponse(
+    return CatalogResponse(
         courses=course_list,
         total=total,
         skip=skip,
@@ -136,7 +357,13 @@ async def get_course(course_id: str):
             detail="Invalid course ID format"
         )
     
-    course = courses_collection.find_one({"_id": ObjectId(course_id)})
+    course = courses_cache.get(course_id)
+    if course is None:
+        generation = courses_cache.generation()
+        # Cached until the change stream reports a write, so it must not come from a lagging secondary
+        course = courses_collection.find_one({"_id": ObjectId(course_id)})
+        if course:
+            courses_cache.set(course_id, course, generation)
     
     if not course:
         raise HTTPException(
@@ -144,17 +371,20 @@ async def get_course(course_id: str):
             detail="Course not found"
         )
     
-    # Get enrollment count
-    enrollment_count = 0
-    try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
+    # Get enrollment count, from the cached counts when the catalog has loaded them
+    cached_counts = enrollment_counts_cache.get("all")
+    if cached_counts is not None:
+        enrollment_count = cached_counts.get(course_id, 0)
+    else:
+        enrollment_count = 0
+        try:
+            response = await get_http_client().get(
                 f"{ENROLLMENT_SERVICE_URL}/enrollments/course/{course_id}/count"
             )
             if response.status_code == 200:
                 enrollment_count = response.json().get("count", 0)
-    except:
-        pass  # Continue with 0 if service unavailable
+        except:
+            pass  # Continue with 0 if service unavailable
     
     return CourseResponse(
         id=str(course["_id"]),
@@ -173,6 +403,7 @@ async def get_course(course_id: str):
 async def update_course(
     course_id: str,
     course_update: CourseUpdate,
+    background_tasks: BackgroundTasks,
     authorization: str = Header(...)
 ):
     """Update a course (admin only)"""
@@ -219,7 +450,7 @@ async def update_course(
     update_fields["updated_at"] = datetime.utcnow().isoformat()
     
     # Update course
-    courses_collection.update_one(
+    courses_durable.update_one(
         {"_id": ObjectId(course_id)},
         {"$set": update_fields}
     )
@@ -227,15 +458,23 @@ async def update_course(
     # Get updated course
     updated_course = courses_collection.find_one({"_id": ObjectId(course_id)})
     
+    # Enrollments store the title and credits, so send them the changes after responding
+    snapshot_changes = {
+        field: updated_course[field]
+        for field in ("title", "credits")
+        if updated_course.get(field) != existing_course.get(field)
+    }
+    if snapshot_changes:
+        background_tasks.add_task(propagate_course_snapshot, course_id, snapshot_changes, authorization)
+    
     # Get enrollment count
     enrollment_count = 0
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                f"{ENROLLMENT_SERVICE_URL}/enrollments/course/{course_id}/count"
-            )
-            if response.status_code == 200:
-                enrollment_count = response.json().get("count", 0)
+        response = await get_http_client().get(
+            f"{ENROLLMENT_SERVICE_URL}/enrollments/course/{course_id}/count"
+        )
+        if response.status_code == 200:
+            enrollment_count = response.json().get("count", 0)
     except:
         pass
     
@@ -252,47 +491,55 @@ async def update_course(
         updated_at=updated_course.get("updated_at")
     )
 
-@router.delete("/{course_id}")
-async def delete_course(course_id: str, authorization: str = Header(...)):
-    """Delete a course (admin only)"""
-    verify_admin(authorization)
-    
-    if not ObjectId.is_valid(course_id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid course ID format"
-        )
-    
-    # Check if course has enrollments
+@job_queue.handler("delete_course")
+async def run_delete_course(job: Job):
+    """Delete a course once the enrollment service confirms it has no active enrollments"""
+    course_id = job.params["course_id"]
+
+    job.report(0.1, "Checking enrollments")
     try:
-        async with httpx.AsyncClient(timeout=5.0) as client:
-            response = await client.get(
-                f"{ENROLLMENT_SERVICE_URL}/enrollments/course/{course_id}/count"
-            )
-            if response.status_code == 200:
-                enrollment_count = response.json().get("count", 0)
-                
-                if enrollment_count > 0:
-                    raise HTTPException(
-                        status_code=status.HTTP_400_BAD_REQUEST,
-                        detail=f"Cannot delete course with {enrollment_count} active enrollments. "
-                               "Please remove all enrollments first."
-                    )
-    except HTTPException:
+        response = await get_http_client().get(
+            f"{ENROLLMENT_SERVICE_URL}/enrollments/course/{course_id}/count"
+        )
+        if response.status_code == 200:
+            enrollment_count = response.json().get("count", 0)
+            
+            if enrollment_count > 0:
+                raise JobFailed(
+                    f"Cannot delete course with {enrollment_count} active enrollments. "
+                    "Please remove all enrollments first."
+                )
+    except JobFailed:
         raise
     except:
         pass  # If service unavailable, allow deletion
     
-    # Delete course
-    result = courses_collection.delete_one({"_id": ObjectId(course_id)})
+    job.report(0.5, "Deleting course")
+    result = courses_durable.delete_one({"_id": ObjectId(course_id)})
     
     if result.deleted_count == 0:
+        raise JobFailed("Course not found")
+    
+    return {"course_id": course_id}
+
+@router.delete("/{course_id}", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def delete_course(course_id: str, response: Response, authorization: str = Header(...)):
+    """Start deleting a course (admin only); poll the returned job for the outcome"""
+    decoded = verify_admin(authorization)
+    
+    if not ObjectId.is_valid(course_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid course ID format"
+        )
+    
+    if not courses_collection.find_one({"_id": ObjectId(course_id)}, {"_id": 1}):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Course not found"
         )
     
-    return {
-        "message": "Course deleted successfully",
-        "course_id": course_id
-    }
\ No newline at end of file
+    # The enrollment check waits on another service; don't hold the admin's connection for it
+    job = job_queue.submit("delete_course", {"course_id": course_id}, created_by=decoded.get("id"))
+    response.headers["Location"] = f"/jobs/{job['_id']}"
+    return job_response(job)
\ No newline at end of file
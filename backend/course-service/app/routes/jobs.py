@@ -0,0 +1,54 @@
+from fastapi import APIRouter, HTTPException, status, Header
+
+from app.models.schemas import JobResponse
+from app.utils.jwt_handler import verify_token, get_token_from_header
+from app.utils.jobs import job_queue
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+MAX_JOBS_LIMIT = 100
+
+def verify_admin(authorization: str):
+    """Verify that the user is an admin"""
+    token = get_token_from_header(authorization)
+    decoded = verify_token(token)
+
+    if decoded.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    return decoded
+
+def job_response(job: dict) -> JobResponse:
+    return JobResponse(
+        id=job["_id"],
+        kind=job["kind"],
+        status=job["status"],
+        progress=job.get("progress", 0.0),
+        message=job.get("message"),
+        result=job.get("result"),
+        error=job.get("error"),
+        created_at=job["created_at"],
+        started_at=job.get("started_at"),
+        finished_at=job.get("finished_at")
+    )
+
+@router.get("", response_model=list[JobResponse])
+async def list_jobs(authorization: str = Header(...), limit: int = 20):
+    """Recent jobs of the kinds this service runs, newest first (admin only)"""
+    verify_admin(authorization)
+    return [job_response(job) for job in job_queue.recent(min(max(limit, 1), MAX_JOBS_LIMIT))]
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str, authorization: str = Header(...)):
+    """Status, progress and, once finished, the result or error of a job (admin only)"""
+    verify_admin(authorization)
+
+    job = job_queue.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found"
+        )
+    return job_response(job)
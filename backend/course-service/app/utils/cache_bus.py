@@ -0,0 +1,193 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from pymongo.errors import OperationFailure, PyMongoError
+
+from app.utils.database import db
+
+# Entries live this long while the change stream is delivering invalidations...
+CACHE_STREAM_TTL_SECONDS = float(os.getenv("CACHE_STREAM_TTL_SECONDS", "300"))
+# ...and only this long when it isn't (standalone mongod, stream down), bounding staleness
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", "5"))
+CACHE_BUS_ENABLED = os.getenv("CACHE_BUS_ENABLED", "true").lower() in ("1", "true", "yes")
+CACHE_BUS_RETRY_SECONDS = float(os.getenv("CACHE_BUS_RETRY_SECONDS", "30"))
+
+# Change streams need a replica set or sharded cluster
+NOT_A_REPLICA_SET = 40573
+# The oplog rolled past our resume token, so events were lost
+CHANGE_STREAM_HISTORY_LOST = (136, 280, 286)
+
+_MISSING = object()
+
+class TTLCache:
+    """Thread-safe in-process LRU cache whose entries expire after ttl() seconds"""
+
+    def __init__(self, name: str, ttl, maxsize: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def generation(self) -> int:
+        """Take this before reading from MongoDB and pass it to set()"""
+        return self._generation
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                return default
+            value, stored_at = entry
+            if time.monotonic() - stored_at > self.ttl():
+                del self._entries[key]
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, generation: int = None):
+        with self._lock:
+            # An invalidation that arrived while the value was being read means it may already be stale
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+class CacheBus:
+    """
+    Watches collections with a change stream and tells subscribed caches which
+    documents changed, so every replica drops stale entries within milliseconds
+    of a write made anywhere
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self.handlers = {}
+        self.streaming = False
+        self.resume_token = None
+        self._fallback_logged = False
+        self._stop = threading.Event()
+        self._thread = None
+
+    def cache(self, name: str, maxsize: int = 1024) -> TTLCache:
+        """A cache whose TTL is long while the stream runs and short while it doesn't"""
+        return TTLCache(name, self.ttl, maxsize)
+
+    def subscribe(self, collection: str, handler):
+        """handler(document_id) is called per change; document_id is None when everything should go"""
+        self.handlers.setdefault(collection, []).append(handler)
+
+    def invalidate_on(self, collection: str, cache: TTLCache, by_id: bool = True):
+        """Drop the changed document's entry (keyed by its id), or the whole cache if by_id is False"""
+        def handler(document_id):
+            if by_id and document_id is not None:
+                cache.invalidate(document_id)
+            else:
+                cache.clear()
+        self.subscribe(collection, handler)
+
+    def ttl(self) -> float:
+        return CACHE_STREAM_TTL_SECONDS if self.streaming else CACHE_TTL_SECONDS
+
+    def status(self) -> dict:
+        return {"mode": "stream" if self.streaming else "ttl", "ttl_seconds": self.ttl()}
+
+    def start(self):
+        if not CACHE_BUS_ENABLED or not self.handlers or self._thread:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.streaming = False
+
+    def publish(self, collection: str, document_id):
+        for handler in self.handlers.get(collection, []):
+            handler(document_id)
+
+    def flush_all(self):
+        for collection in self.handlers:
+            self.publish(collection, None)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._watch()
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAM_HISTORY_LOST:
+                    print("⚠️  Cache bus resume token expired; flushing caches and starting fresh")
+                    self.resume_token = None
+                    self.flush_all()
+                    continue
+                if e.code == NOT_A_REPLICA_SET:
+                    error = "change streams need a replica set"
+                else:
+                    error = e
+                self._fall_back(error)
+            except PyMongoError as e:
+                self._fall_back(e)
+
+    def _fall_back(self, error):
+        if self.streaming or not self._fallback_logged:
+            print(f"⚠️  Cache bus unavailable, caching with a {CACHE_TTL_SECONDS}s TTL: {str(error)[:200]}")
+            self._fallback_logged = True
+        self.streaming = False
+        # Anything cached under the long TTL may have missed invalidations
+        self.flush_all()
+        self._stop.wait(CACHE_BUS_RETRY_SECONDS)
+
+    def _watch(self):
+        pipeline = [
+            {"$match": {"ns.coll": {"$in": list(self.handlers)}}},
+            # Only the key is needed; _id stays so the stream stays resumable
+            {"$project": {"operationType": 1, "ns": 1, "documentKey": 1}}
+        ]
+        with self.database.watch(pipeline, resume_after=self.resume_token, max_await_time_ms=1000) as stream:
+            if not self.streaming:
+                # Events may have been missed while we were down without a token
+                if self.resume_token is None:
+                    self.flush_all()
+                self.streaming = True
+                self._fallback_logged = False
+                print(f"✓ Cache bus watching {', '.join(self.handlers)}")
+
+            while not self._stop.is_set() and stream.alive:
+                change = stream.try_next()
+                if change is not None and change["operationType"] in ("dropDatabase", "invalidate"):
+                    # The stream can't be resumed past these; open a new one
+                    self.resume_token = None
+                    self.flush_all()
+                    return
+                if change is not None:
+                    self._dispatch(change)
+                # Advances on idle batches too, so a restart resumes from here
+                self.resume_token = stream.resume_token
+
+    def _dispatch(self, change: dict):
+        if change["operationType"] in ("drop", "rename"):
+            self.publish(change.get("ns", {}).get("coll"), None)
+            return
+        collection = change.get("ns", {}).get("coll")
+        document_id = change.get("documentKey", {}).get("_id")
+        self.publish(collection, str(document_id) if document_id is not None else None)
+
+cache_bus = CacheBus(db)
@@ -0,0 +1,27 @@
+import httpx
+
+from app.utils.metrics import InstrumentedTransport
+from app.utils.tracing import TracingTransport, tracing_enabled
+
+# One client per process so upstream connections are pooled and kept alive
+# between requests instead of being re-established for every call
+_client = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client for calls to other services"""
+    global _client
+    if _client is None:
+        transport = InstrumentedTransport(httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        ))
+        if tracing_enabled():
+            transport = TracingTransport(transport)
+        _client = httpx.AsyncClient(timeout=5.0, transport=transport)
+    return _client
+
+async def close_http_client():
+    """Close the shared client on shutdown"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
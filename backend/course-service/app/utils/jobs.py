@@ -0,0 +1,202 @@
+import asyncio
+import os
+import time
+import traceback
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from fastapi import HTTPException, status
+
+from app.utils.database import db
+from app.utils.metrics import JOB_DURATION
+
+# "memory" keeps job status in this process; "mongo" stores it in the jobs collection, so any
+# worker or replica can answer a status poll. Jobs always run in the process that accepted them
+JOBS_BACKEND = os.getenv("JOBS_BACKEND", "memory").lower()
+# Jobs run at once per process; the rest wait in a queue of JOB_QUEUE_SIZE
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+# Finished jobs can be polled for this long
+JOB_RETENTION_SECONDS = int(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+
+# Shared by every service, each seeing only the kinds it registers; finished jobs are removed
+# by a TTL index on expires_at
+jobs_collection = db["jobs"]
+
+class MemoryJobStore:
+    """Jobs in this process; the oldest are evicted past maxsize"""
+
+    def __init__(self, maxsize: int = 1000):
+        self.maxsize = maxsize
+        self._jobs = OrderedDict()
+
+    def insert(self, job: dict):
+        self._jobs[job["_id"]] = dict(job)
+        while len(self._jobs) > self.maxsize:
+            self._jobs.popitem(last=False)
+
+    def update(self, job_id: str, changes: dict):
+        if job_id in self._jobs:
+            self._jobs[job_id].update(changes)
+
+    def get(self, job_id: str) -> dict:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def recent(self, kinds: list, limit: int) -> list:
+        return [dict(job) for job in reversed(self._jobs.values()) if job["kind"] in kinds][:limit]
+
+class MongoJobStore:
+    """Jobs in the shared collection, so status survives whichever process answers"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def insert(self, job: dict):
+        self.collection.insert_one(job)
+
+    def update(self, job_id: str, changes: dict):
+        self.collection.update_one({"_id": job_id}, {"$set": changes})
+
+    def get(self, job_id: str) -> dict:
+        return self.collection.find_one({"_id": job_id})
+
+    def recent(self, kinds: list, limit: int) -> list:
+        return list(self.collection.find({"kind": {"$in": kinds}}).sort("created_at", -1).limit(limit))
+
+class JobFailed(Exception):
+    """Raised by a handler to fail its job with a message meant for the admin who started it"""
+
+class Job:
+    """What a handler gets: its parameters and a way to report progress"""
+
+    def __init__(self, queue, job_id: str, params: dict):
+        self.queue = queue
+        self.id = job_id
+        self.params = params
+
+    def report(self, progress: float, message: str = None):
+        """Record progress between 0 and 1; safe to call from a handler running in a thread"""
+        changes = {"progress": round(min(max(progress, 0.0), 1.0), 3)}
+        if message:
+            changes["message"] = message
+        self.queue.store.update(self.id, changes)
+
+class JobQueue:
+    """
+    Runs slow admin operations on worker tasks in this process, so the request that
+    starts one can return 202 with a job id instead of holding its connection open.
+    Handlers are async functions registered per kind; they receive a Job and return a
+    JSON-serializable result, or raise JobFailed.
+    """
+
+    def __init__(self):
+        self.store = MongoJobStore(jobs_collection) if JOBS_BACKEND == "mongo" else MemoryJobStore()
+        self.handlers = {}
+        self.queue = None
+        self.workers = []
+
+    def handler(self, kind: str):
+        """Decorator registering the function that runs jobs of this kind"""
+        def register(function):
+            self.handlers[kind] = function
+            return function
+        return register
+
+    def submit(self, kind: str, params: dict, created_by: str = None) -> dict:
+        """Queue a job and return it; 503 if the queue is full"""
+        if self.queue is None:
+            raise RuntimeError("Job queue is not running")
+        now = datetime.utcnow()
+        job = {
+            "_id": uuid.uuid4().hex,
+            "kind": kind,
+            "params": params,
+            "status": "queued",
+            "progress": 0.0,
+            "message": None,
+            "result": None,
+            "error": None,
+            "created_by": created_by,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            # Replaced when the job finishes; covers a job lost with its process
+            "expires_at": now + timedelta(seconds=JOB_RETENTION_SECONDS)
+        }
+        if self.queue.full():
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many jobs queued, please retry shortly"
+            )
+        self.store.insert(job)
+        self.queue.put_nowait(job["_id"])
+        return job
+
+    def get(self, job_id: str) -> dict:
+        """The job, or None if there is none or it belongs to another service"""
+        job = self.store.get(job_id)
+        return job if job and job["kind"] in self.handlers else None
+
+    def recent(self, limit: int = 50) -> list:
+        return self.store.recent(list(self.handlers), limit)
+
+    def start(self):
+        self.queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+        self.workers = [asyncio.create_task(self._work()) for _ in range(JOB_WORKERS)]
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        # Whatever never started is reported as failed rather than left queued forever
+        while self.queue and not self.queue.empty():
+            self._finish(self.queue.get_nowait(), "failed", error="Service shut down before the job started")
+
+    async def _work(self):
+        while True:
+            job_id = await self.queue.get()
+            job = self.store.get(job_id)
+            if job:
+                await self._run(job)
+
+    async def _run(self, job: dict):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            self._finish(job["_id"], "failed", error=f"No handler for job kind {job['kind']}")
+            return
+
+        self.store.update(job["_id"], {"status": "running", "started_at": datetime.utcnow()})
+        started = time.perf_counter()
+        outcome = "failed"
+        try:
+            result = await handler(Job(self, job["_id"], job["params"]))
+            outcome = "succeeded"
+            self._finish(job["_id"], outcome, result=result)
+        except asyncio.CancelledError:
+            self._finish(job["_id"], outcome, error="Service shut down while the job was running")
+            raise
+        except JobFailed as e:
+            self._finish(job["_id"], outcome, error=str(e))
+        except Exception as e:
+            print(f"❌ Job {job['_id']} ({job['kind']}) failed: {e}")
+            traceback.print_exc()
+            self._finish(job["_id"], outcome, error="Unexpected error; see the service logs")
+        finally:
+            JOB_DURATION.labels(job["kind"], outcome).observe(time.perf_counter() - started)
+
+    def _finish(self, job_id: str, outcome: str, result=None, error: str = None):
+        now = datetime.utcnow()
+        changes = {
+            "status": outcome,
+            "finished_at": now,
+            "expires_at": now + timedelta(seconds=JOB_RETENTION_SECONDS),
+            "result": result,
+            "error": error
+        }
+        if outcome == "succeeded":
+            changes["progress"] = 1.0
+        self.store.update(job_id, changes)
+
+job_queue = JobQueue()
@@ -0,0 +1,152 @@
+from pymongo import ASCENDING, TEXT
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from datetime import datetime, timedelta
+
+from app.utils.database import db, courses_collection, courses_relaxed, TITLE_COLLATION
+from app.utils.rate_limit import rate_limits_collection
+from app.utils.jobs import jobs_collection
+
+SERVICE_NAME = "course-service"
+LOCK_TIMEOUT_MINUTES = 10
+
+# Shared by every service; each record is keyed by "<service>:<version>"
+migrations_collection = db["schema_migrations"]
+
+# MongoDB error codes for indexes that are missing or already defined differently
+INDEX_NOT_FOUND = 27
+INDEX_CONFLICT_CODES = (85, 86)
+
+def drop_index_if_exists(collection, name: str):
+    """Drop an index by name, ignoring indexes that don't exist"""
+    try:
+        collection.drop_index(name)
+        print(f"✓ Dropped index: {collection.name}.{name}")
+    except OperationFailure as e:
+        if e.code != INDEX_NOT_FOUND and "index not found" not in str(e).lower():
+            raise
+
+def create_index(collection, keys, **kwargs):
+    """Create an index, tolerating an equivalent index under another name"""
+    try:
+        name = collection.create_index(keys, **kwargs)
+        print(f"✓ Ensured index: {collection.name}.{name}")
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        print(f"⚠️  Skipped conflicting index on {collection.name}: {e}")
+
+# ========== MIGRATIONS ==========
+
+def drop_legacy_course_index():
+    drop_index_if_exists(courses_collection, "course_name_1_department_1")
+
+def create_title_index():
+    create_index(courses_collection, [("title", ASCENDING)], unique=True, name="title_1_unique")
+
+def create_created_at_index():
+    create_index(courses_collection, [("created_at", ASCENDING)], name="created_at_1")
+
+def unset_legacy_course_fields():
+    result = courses_relaxed.update_many(
+        {
+            "$or": [
+                {"course_name": {"$exists": True}},
+                {"department": {"$exists": True}}
+            ]
+        },
+        {
+            "$unset": {
+                "course_name": "",
+                "department": ""
+            }
+        }
+    )
+    print(f"✓ Cleaned up {result.modified_count} documents with legacy fields")
+
+def create_search_indexes():
+    # Word search over titles and instructors, title matches ranking higher
+    create_index(
+        courses_collection,
+        [("title", TEXT), ("instructor", TEXT)],
+        weights={"title": 10, "instructor": 5},
+        name="title_instructor_text"
+    )
+    # Alphabetical browsing that ignores case
+    create_index(courses_collection, [("title", ASCENDING)], collation=TITLE_COLLATION, name="title_1_ci")
+
+def create_rate_limit_ttl_index():
+    # Buckets are shared by all services (keys are per route), so each one ensures this
+    create_index(rate_limits_collection, "expires_at", expireAfterSeconds=0)
+
+def create_job_indexes():
+    # Finished jobs expire on their own; the compound index serves the recent-jobs listing
+    create_index(jobs_collection, "expires_at", expireAfterSeconds=0)
+    create_index(jobs_collection, [("kind", 1), ("created_at", -1)])
+
+# Append new migrations with the next version number; never renumber applied ones
+MIGRATIONS = [
+    (1, "Drop legacy course_name/department index", drop_legacy_course_index),
+    (2, "Create unique index on title", create_title_index),
+    (3, "Create index on created_at", create_created_at_index),
+    (4, "Unset legacy course_name/department fields", unset_legacy_course_fields),
+    (5, "Create text and case-insensitive title indexes for search", create_search_indexes),
+    (6, "Expire shared rate-limit buckets", create_rate_limit_ttl_index),
+    (7, "Expire finished jobs and index them by kind", create_job_indexes),
+]
+
+# ========== RUNNER ==========
+
+def get_applied_versions() -> set:
+    """Return the migration versions already recorded for this service"""
+    records = migrations_collection.find(
+        {"service": SERVICE_NAME, "version": {"$exists": True}},
+        {"version": 1}
+    )
+    return {record["version"] for record in records}
+
+def get_pending_migrations() -> list:
+    applied = get_applied_versions()
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+def acquire_lock() -> bool:
+    """Take the per-service migration lock, breaking it if it has gone stale"""
+    lock_id = f"{SERVICE_NAME}:lock"
+    now = datetime.utcnow()
+    migrations_collection.delete_one({
+        "_id": lock_id,
+        "locked_at": {"$lt": now - timedelta(minutes=LOCK_TIMEOUT_MINUTES)}
+    })
+    try:
+        migrations_collection.insert_one({
+            "_id": lock_id,
+            "service": SERVICE_NAME,
+            "locked_at": now
+        })
+        return True
+    except DuplicateKeyError:
+        return False
+
+def release_lock():
+    migrations_collection.delete_one({"_id": f"{SERVICE_NAME}:lock"})
+
+def run_migrations() -> int:
+    """Apply pending migrations in version order and record each one"""
+    if not acquire_lock():
+        raise RuntimeError(f"Migrations for {SERVICE_NAME} are already running")
+
+    try:
+        applied_count = 0
+        for version, description, migrate in get_pending_migrations():
+            print(f"→ Applying {SERVICE_NAME} migration {version}: {description}")
+            migrate()
+            migrations_collection.insert_one({
+                "_id": f"{SERVICE_NAME}:{version}",
+                "service": SERVICE_NAME,
+                "version": version,
+                "description": description,
+                "applied_at": datetime.utcnow().isoformat()
+            })
+            applied_count += 1
+        return applied_count
+    finally:
+        release_lock()
@@ -0,0 +1,166 @@
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import time
+import uuid
+from datetime import datetime
+from fastapi import HTTPException
+
+from app.utils.jwt_handler import verify_token, get_token_from_header
+
+try:
+    from pyinstrument import Profiler
+except ImportError:  # cProfile fallback; sees the whole event loop thread, not just this request
+    Profiler = None
+
+# The middleware is only installed when this is on, so requests pay nothing otherwise
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() in ("1", "true", "yes")
+PROFILING_MIN_INTERVAL_SECONDS = float(os.getenv("PROFILING_MIN_INTERVAL_SECONDS", "10"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "/tmp/profiles")
+
+PROFILE_HEADER = b"x-profile"
+
+_profile_lock = asyncio.Lock()
+_last_profile_at = 0.0
+
+def is_admin(authorization: bytes) -> bool:
+    if not authorization:
+        return False
+    try:
+        decoded = verify_token(get_token_from_header(authorization.decode("latin-1")))
+    except HTTPException:
+        return False
+    return decoded.get("role") == "admin"
+
+def try_reserve_slot() -> bool:
+    """Allow one profiled request at a time and at most one per interval"""
+    global _last_profile_at
+    now = time.monotonic()
+    if _profile_lock.locked() or now - _last_profile_at < PROFILING_MIN_INTERVAL_SECONDS:
+        return False
+    _last_profile_at = now
+    return True
+
+class RequestProfiler:
+    """pyinstrument when installed (async-aware), otherwise cProfile"""
+
+    def __init__(self):
+        self._profiler = Profiler(async_mode="enabled") if Profiler else cProfile.Profile()
+
+    def start(self):
+        if Profiler:
+            self._profiler.start()
+        else:
+            self._profiler.enable()
+
+    def stop(self):
+        if Profiler:
+            self._profiler.stop()
+        else:
+            self._profiler.disable()
+
+    def render(self) -> tuple:
+        """Return (body, content type, file extension)"""
+        if Profiler:
+            return self._profiler.output_html().encode(), "text/html; charset=utf-8", "html"
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(60)
+        return output.getvalue().encode(), "text/plain; charset=utf-8", "txt"
+
+def store_profile(body: bytes, extension: str, method: str, path: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = path.strip("/").replace("/", "_") or "root"
+    profile_id = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{method.lower()}-{slug}-{uuid.uuid4().hex[:8]}.{extension}"
+    with open(os.path.join(PROFILE_DIR, profile_id), "wb") as f:
+        f.write(body)
+    return profile_id
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request when an admin sends "X-Profile: 1" (profile returned
+    instead of the normal body) or "X-Profile: store" (profile written to PROFILE_DIR,
+    normal body returned with an X-Profile-Id header)
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        mode = headers.get(PROFILE_HEADER, b"").decode("latin-1").lower()
+        if mode not in ("1", "true", "store") or not is_admin(headers.get(b"authorization")):
+            await self.app(scope, receive, send)
+            return
+
+        if not try_reserve_slot():
+            await self.app(scope, receive, with_headers(send, [(b"x-profile-status", b"rate-limited")]))
+            return
+
+        async with _profile_lock:
+            if mode == "store":
+                await self.profile_and_store(scope, receive, send)
+            else:
+                await self.profile_and_return(scope, receive, send)
+
+    async def profile_and_store(self, scope, receive, send):
+        messages = []
+
+        async def buffer(message):
+            messages.append(message)
+
+        profiler = RequestProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, buffer)
+        finally:
+            profiler.stop()
+
+        body, _, extension = profiler.render()
+        profile_id = store_profile(body, extension, scope["method"], scope["path"])
+        print(f"✓ Stored profile {profile_id}")
+
+        # Release the buffered response with the profile id attached
+        send_with_id = with_headers(send, [(b"x-profile-id", profile_id.encode())])
+        for message in messages:
+            await send_with_id(message)
+
+    async def profile_and_return(self, scope, receive, send):
+        original_status = 500
+
+        async def discard(message):
+            nonlocal original_status
+            if message["type"] == "http.response.start":
+                original_status = message["status"]
+
+        profiler = RequestProfiler()
+        profiler.start()
+        try:
+            await self.app(scope, receive, discard)
+        finally:
+            profiler.stop()
+
+        body, content_type, _ = profiler.render()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", content_type.encode()),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profiled-status", str(original_status).encode()),
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def with_headers(send, extra_headers: list):
+    """Wrap send so the response start message carries extra headers"""
+    async def wrapped(message):
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": [*message.get("headers", []), *extra_headers]}
+        await send(message)
+    return wrapped
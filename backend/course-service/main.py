@@ -1,13 +1,48 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import courses
+from fastapi.responses import JSONResponse, Response
+from app.routes import courses, jobs
+from app.utils.health import warm_up, check_readiness
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.utils.compression import CompressionMiddleware
+from app.utils.rate_limit import AdmissionMiddleware, RateRule
+from app.utils.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from app.utils.tracing import setup_tracing, shutdown_tracing
+from app.utils.http_client import close_http_client
+from app.utils.cache_bus import cache_bus
+from app.utils.jobs import job_queue
+
+# The catalog is public, so it is limited per client rather than per user
+RATE_RULES = [
+    RateRule("catalog", "GET", r"/courses(/search|/catalog)?", "RATE_LIMIT_CATALOG", "20/second"),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm connections in the background; /ready reports once this has succeeded
+    warm_up_task = asyncio.create_task(warm_up())
+    cache_bus.start()
+    job_queue.start()
+    yield
+    # Running jobs are cancelled and marked failed; their records say so to whoever polls
+    await job_queue.stop()
+    warm_up_task.cancel()
+    cache_bus.stop()
+    await close_http_client()
+    shutdown_tracing()
 
 app = FastAPI(
     title="Course Service",
     description="Handles course management and operations",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Inside CORS so rejections still carry the headers browsers need to read them
+app.add_middleware(AdmissionMiddleware, rules=RATE_RULES)
+
 # Configure CORS - Allow all origins in development
 app.add_middleware(
     CORSMiddleware,
@@ -18,7 +53,20 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Opt-in per-request profiling for admins; not installed at all unless enabled
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outside CORS and profiling so their headers and bodies are final when it compresses
+app.add_middleware(CompressionMiddleware)
+
+# Added last so it wraps everything, including CORS preflights
+app.add_middleware(MetricsMiddleware)
+
+setup_tracing(app)
+
 app.include_router(courses.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 def root():
@@ -28,6 +76,24 @@ def root():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/live")
+def liveness_check():
+    """Process is up and serving; never touches dependencies"""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Dependencies are reachable and connection pools are warm"""
+    ready, report = await check_readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=report)
+
 @app.get("/health")
 def health_check():
+    """Kept for existing callers; equivalent to /live"""
     return {"status": "healthy"}
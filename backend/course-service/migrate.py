@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+Apply versioned schema migrations (indexes and data cleanups) for the course service
+Run this once per deploy, before rolling out new pods; use --status to list pending versions
+"""
+
+import sys
+
+from app.utils.migrations import SERVICE_NAME, MIGRATIONS, get_applied_versions, run_migrations
+
+def print_status():
+    """Show which migrations have been applied"""
+    applied = get_applied_versions()
+    for version, description, _ in MIGRATIONS:
+        marker = "✅" if version in applied else "⏳"
+        print(f"{marker} {SERVICE_NAME} {version}: {description}")
+
+if __name__ == "__main__":
+    try:
+        if "--status" in sys.argv[1:]:
+            print_status()
+        else:
+            print(f"Running {SERVICE_NAME} migrations...")
+            count = run_migrations()
+            print(f"✅ Applied {count} migration(s)")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal
+from typing import Any, Optional, Literal
 from datetime import datetime
 
 class EnrollmentCreate(BaseModel):
@@ -48,6 +48,15 @@ class StudentProgress(BaseModel):
     total_credits_completed: int
     enrollments: list[EnrollmentWithDetails]
 
+class StudentSummary(BaseModel):
+    student_id: str
+    total_enrolled: int
+    total_completed: int
+    total_dropped: int
+    total_credits_enrolled: int
+    total_credits_completed: int
+    updated_at: Optional[str] = None
+
 class CourseEnrollments(BaseModel):
     course_id: str
     course_title: str
@@ -57,6 +66,22 @@ class CourseEnrollments(BaseModel):
     dropped_enrollments: int
     students: list[dict]
 
+class CourseSnapshotUpdate(BaseModel):
+    title: Optional[str] = None
+    credits: Optional[int] = Field(None, ge=1, le=10)
+
 class CompleteRequest(BaseModel):
     student_id: str
     course_id: str
+
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: Literal["queued", "running", "succeeded", "failed"]
+    progress: float = 0.0  # 0 to 1
+    message: Optional[str] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
@@ -1,9 +1,11 @@
 import os
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, HTTPException, status, Header, Response
+from starlette.concurrency import run_in_threadpool
 from bson import ObjectId
 from datetime import datetime
 from typing import Optional
 import httpx
+from pymongo.errors import DuplicateKeyError
 
 from app.models.schemas import (
     EnrollmentCreate,
@@ -12,11 +14,29 @@ from app.models.schemas import (
     EnrollmentResponse,
     EnrollmentWithDetails,
     StudentProgress,
+    StudentSummary,
     CourseEnrollments,
-    CompleteRequest
+    CompleteRequest,
+    CourseSnapshotUpdate,
+    JobResponse
 )
-from app.utils.database import enrollments_collection
+from app.utils.database import enrollments_collection, enrollments_durable, enrollments_primary, enrollments_replica
+from app.utils.consistency import CAUSAL_TOKEN_HEADER, causal_session, causal_token
 from app.utils.jwt_handler import verify_token, get_token_from_header
+from app.utils.http_client import get_http_client
+from app.utils.cache_bus import cache_bus
+from app.utils.summaries import record_transition, get_summary, rebuild_all_summaries, find_drift
+from app.utils.jobs import Job, job_queue
+from app.routes.jobs import job_response
+from app.utils.write_buffer import progress_writes
+from app.utils.snapshots import (
+    course_snapshot,
+    student_snapshot,
+    has_course_snapshot,
+    has_student_snapshot,
+    propagate_course_snapshot,
+    propagate_student_snapshot
+)
 
 router = APIRouter(prefix="/enrollments", tags=["Enrollments"])
 
@@ -27,6 +47,26 @@ def service_status():
 STUDENT_SERVICE_URL = os.getenv("STUDENT_SERVICE_URL", "http://localhost:8001")
 COURSE_SERVICE_URL = os.getenv("COURSE_SERVICE_URL", "http://localhost:8000")
 
+# Invalidated by the change stream when any replica of any service writes
+students_cache = cache_bus.cache("students", maxsize=4096)
+courses_cache = cache_bus.cache("courses")
+enrollment_counts_cache = cache_bus.cache("enrollment_counts", maxsize=1)
+cache_bus.invalidate_on("students", students_cache)
+cache_bus.invalidate_on("courses", courses_cache)
+cache_bus.invalidate_on("enrollments", enrollment_counts_cache, by_id=False)
+
+async def fetch_cached(cache, key: str, url: str) -> Optional[dict]:
+    """GET an upstream document through the cache; None if the upstream says it doesn't exist"""
+    data = cache.get(key)
+    if data is None:
+        generation = cache.generation()
+        response = await get_http_client().get(url)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        cache.set(key, data, generation)
+    return data
+
 def get_current_user(authorization: str):
     """Extract and verify user from token"""
     token = get_token_from_header(authorization)
@@ -57,10 +97,16 @@ def verify_student_or_admin(authorization: str, student_id: str):
     
     return decoded
 
+def set_causal_token(response: Response, session):
+    """Hand the client a token for its next read, so that read sees this write even on a secondary"""
+    token = causal_token(session)
+    if token:
+        response.headers[CAUSAL_TOKEN_HEADER] = token
+
 # ========== ENROLLMENT OPERATIONS ==========
 
 @router.post("", response_model=EnrollmentResponse, status_code=status.HTTP_201_CREATED)
-async def enroll_in_course(enrollment: EnrollmentCreate, authorization: str = Header(...)):
+async def enroll_in_course(enrollment: EnrollmentCreate, response: Response, authorization: str = Header(...)):
     """Enroll a student in a course"""
     decoded = get_current_user(authorization)
     
@@ -72,42 +118,43 @@ async def enroll_in_course(enrollment: EnrollmentCreate, authorization: str = He
         )
     
     # Verify student exists
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            student_response = await client.get(
-                f"{STUDENT_SERVICE_URL}/students/{enrollment.student_id}"
-            )
-            if student_response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Student not found"
-                )
-        except httpx.RequestError:
+    try:
+        student_data = await fetch_cached(
+            students_cache,
+            enrollment.student_id,
+            f"{STUDENT_SERVICE_URL}/students/{enrollment.student_id}"
+        )
+        if student_data is None:
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Student service unavailable"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Student not found"
             )
+    except httpx.RequestError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Student service unavailable"
+        )
     
     # Verify course exists
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        try:
-            course_response = await client.get(
-                f"{COURSE_SERVICE_URL}/courses/{enrollment.course_id}"
-            )
-            if course_response.status_code != 200:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Course not found"
-                )
-            course_data = course_response.json()
-        except httpx.RequestError:
+    try:
+        course_data = await fetch_cached(
+            courses_cache,
+            enrollment.course_id,
+            f"{COURSE_SERVICE_URL}/courses/{enrollment.course_id}"
+        )
+        if course_data is None:
             raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Course service unavailable"
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Course not found"
             )
+    except httpx.RequestError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Course service unavailable"
+        )
     
     # Check if already enrolled
-    existing = enrollments_collection.find_one({
+    existing = enrollments_primary.find_one({
         "student_id": enrollment.student_id,
         "course_id": enrollment.course_id,
         "status": {"$in": ["enrolled", "completed"]}
@@ -127,7 +174,7 @@ async def enroll_in_course(enrollment: EnrollmentCreate, authorization: str = He
     
     # Check if course is full
     if course_data.get("max_students"):
-        current_enrollments = enrollments_collection.count_documents({
+        current_enrollments = enrollments_primary.count_documents({
             "course_id": enrollment.course_id,
             "status": "enrolled"
         })
@@ -143,14 +190,28 @@ async def enroll_in_course(enrollment: EnrollmentCreate, authorization: str = He
         "course_id": enrollment.course_id,
         "status": "enrolled",
         "progress": 0,
+        # Snapshots let views and summaries answer without calling the other services;
+        # course and profile updates are propagated through the snapshot endpoints
+        **course_snapshot(course_data),
+        **student_snapshot(student_data),
         "enrollment_date": datetime.utcnow().isoformat(),
         "completion_date": None,
         "drop_date": None,
         "drop_reason": None
     }
     
-    result = enrollments_collection.insert_one(enrollment_doc)
-    created_enrollment = enrollments_collection.find_one({"_id": result.inserted_id})
+    with causal_session() as session:
+        try:
+            result = enrollments_durable.insert_one(enrollment_doc, session=session)
+        except DuplicateKeyError:
+            # A concurrent request enrolled the same student first; the partial unique index caught it
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Already enrolled in this course"
+            )
+        record_transition(enrollment_doc, None, "enrolled", session)
+        created_enrollment = enrollments_collection.find_one({"_id": result.inserted_id}, session=session)
+        set_causal_token(response, session)
     
     return EnrollmentResponse(
         id=str(created_enrollment["_id"]),
@@ -165,7 +226,7 @@ async def enroll_in_course(enrollment: EnrollmentCreate, authorization: str = He
     )
 
 @router.post("/drop", response_model=EnrollmentResponse)
-async def drop_course(drop_request: EnrollmentDrop, authorization: str = Header(...)):
+async def drop_course(drop_request: EnrollmentDrop, response: Response, authorization: str = Header(...)):
     """Drop a course with reason"""
     decoded = get_current_user(authorization)
     
@@ -177,7 +238,7 @@ async def drop_course(drop_request: EnrollmentDrop, authorization: str = Header(
         )
     
     # Find enrollment
-    enrollment = enrollments_collection.find_one({
+    enrollment = enrollments_primary.find_one({
         "student_id": drop_request.student_id,
         "course_id": drop_request.course_id,
         "status": "enrolled"
@@ -196,12 +257,18 @@ async def drop_course(drop_request: EnrollmentDrop, authorization: str = Header(
         "drop_reason": drop_request.drop_reason
     }
     
-    enrollments_collection.update_one(
-        {"_id": enrollment["_id"]},
-        {"$set": update_data}
-    )
-    
-    updated_enrollment = enrollments_collection.find_one({"_id": enrollment["_id"]})
+    with causal_session() as session:
+        # Matching on status too means a concurrent drop can't be counted twice in the summary
+        result = enrollments_durable.update_one(
+            {"_id": enrollment["_id"], "status": "enrolled"},
+            {"$set": update_data},
+            session=session
+        )
+        if result.modified_count:
+            record_transition(enrollment, "enrolled", "dropped", session)
+        
+        updated_enrollment = enrollments_collection.find_one({"_id": enrollment["_id"]}, session=session)
+        set_causal_token(response, session)
     
     return EnrollmentResponse(
         id=str(updated_enrollment["_id"]),
@@ -248,10 +315,21 @@ async def update_progress(enrollment_id: str, progress_update: ProgressUpdate, a
         update_data["completion_date"] = datetime.utcnow().isoformat()
         update_data["progress"] = 100
     
-    enrollments_collection.update_one(
-        {"_id": ObjectId(enrollment_id)},
-        {"$set": update_data}
-    )
+    if update_data.get("status") == "completed":
+        # Completion moves the student's summary too, so it is written on its own and durably
+        result = enrollments_durable.update_one(
+            {"_id": ObjectId(enrollment_id), "status": "enrolled"},
+            {"$set": update_data}
+        )
+        if result.modified_count:
+            record_transition(enrollment, "enrolled", "completed")
+    else:
+        # Batched with other progress updates arriving within a few ms; returns once acknowledged
+        await progress_writes.update_one(
+            enrollment_id,
+            {"_id": ObjectId(enrollment_id), "status": "enrolled"},
+            {"$set": update_data}
+        )
     
     updated_enrollment = enrollments_collection.find_one({"_id": ObjectId(enrollment_id)})
     
@@ -268,11 +346,11 @@ async def update_progress(enrollment_id: str, progress_update: ProgressUpdate, a
     )
 
 @router.post("/complete")
-async def mark_complete(data: CompleteRequest, authorization: str = Header(...)):
+async def mark_complete(data: CompleteRequest, response: Response, authorization: str = Header(...)):
     """Mark a course as completed (admin only)"""
     verify_admin(authorization)
     
-    enrollment = enrollments_collection.find_one({
+    enrollment = enrollments_primary.find_one({
         "student_id": data.student_id,
         "course_id": data.course_id,
         "status": "enrolled"
@@ -285,14 +363,19 @@ async def mark_complete(data: CompleteRequest, authorization: str = Header(...))
         )
     
     # Update to completed
-    enrollments_collection.update_one(
-        {"_id": enrollment["_id"]},
-        {"$set": {
-            "status": "completed",
-            "progress": 100,
-            "completion_date": datetime.utcnow().isoformat()
-        }}
-    )
+    with causal_session() as session:
+        result = enrollments_durable.update_one(
+            {"_id": enrollment["_id"], "status": "enrolled"},
+            {"$set": {
+                "status": "completed",
+                "progress": 100,
+                "completion_date": datetime.utcnow().isoformat()
+            }},
+            session=session
+        )
+        if result.modified_count:
+            record_transition(enrollment, "enrolled", "completed", session)
+        set_causal_token(response, session)
     
     return {
         "message": "Course marked as completed",
@@ -302,13 +385,50 @@ async def mark_complete(data: CompleteRequest, authorization: str = Header(...))
 
 # ========== STUDENT ENROLLMENTS ==========
 
+@router.get("/student/{student_id}/summary", response_model=StudentSummary)
+async def get_student_summary(
+    student_id: str,
+    authorization: str = Header(...),
+    x_causal_token: Optional[str] = Header(None)
+):
+    """Get a student's enrollment and credit totals from their precomputed summary"""
+    verify_student_or_admin(authorization, student_id)
+    
+    with causal_session(x_causal_token) as session:
+        summary = get_summary(student_id, session)
+    return StudentSummary(
+        student_id=student_id,
+        total_enrolled=summary["total_enrolled"],
+        total_completed=summary["total_completed"],
+        total_dropped=summary["total_dropped"],
+        total_credits_enrolled=summary["total_credits_enrolled"],
+        total_credits_completed=summary["total_credits_completed"],
+        updated_at=summary.get("updated_at")
+    )
+
 @router.get("/student/{student_id}", response_model=StudentProgress)
-async def get_student_enrollments(student_id: str, authorization: str = Header(...)):
-    """Get all enrollments for a student with progress"""
+async def get_student_enrollments(
+    student_id: str,
+    authorization: str = Header(...),
+    x_causal_token: Optional[str] = Header(None),
+    limit: Optional[int] = None
+):
+    """Get enrollments for a student with progress; with limit, only the most recent ones"""
     verify_student_or_admin(authorization, student_id)
     
-    # Get all enrollments
-    enrollments = list(enrollments_collection.find({"student_id": student_id}))
+    # May be served by a secondary; the token from the student's last enroll or drop makes it wait for that write
+    with causal_session(x_causal_token) as session:
+        # Totals come from the summary, so a limited page still reports the full picture
+        summary = get_summary(student_id, session)
+        
+        if limit:
+            enrollments = list(
+                enrollments_replica.find({"student_id": student_id}, session=session)
+                .sort("enrollment_date", -1)
+                .limit(limit)
+            )
+        else:
+            enrollments = list(enrollments_replica.find({"student_id": student_id}, session=session))
     
     if not enrollments:
         return StudentProgress(
@@ -320,56 +440,44 @@ async def get_student_enrollments(student_id: str, authorization: str = Header(.
             enrollments=[]
         )
     
-    # Fetch student details
+    # Enrollments created before snapshots were stored fall back to the other services
     student_data = {}
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            student_response = await client.get(
+    if not all(has_student_snapshot(e) for e in enrollments):
+        try:
+            student_response = await get_http_client().get(
                 f"{STUDENT_SERVICE_URL}/students/{student_id}"
             )
             if student_response.status_code == 200:
                 student_data = student_response.json()
-    except:
-        pass
+        except:
+            pass
     
-    # Fetch course details
-    course_ids = [e["course_id"] for e in enrollments]
     courses_map = {}
-    
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for course_id in course_ids:
-            try:
-                course_response = await client.get(
-                    f"{COURSE_SERVICE_URL}/courses/{course_id}"
-                )
-                if course_response.status_code == 200:
-                    course_data = course_response.json()
-                    courses_map[course_id] = course_data
-            except:
-                continue
+    client = get_http_client()
+    for course_id in {e["course_id"] for e in enrollments if not has_course_snapshot(e)}:
+        try:
+            course_response = await client.get(
+                f"{COURSE_SERVICE_URL}/courses/{course_id}"
+            )
+            if course_response.status_code == 200:
+                courses_map[course_id] = course_response.json()
+        except:
+            continue
     
     # Build detailed enrollments
     detailed_enrollments = []
-    total_credits_enrolled = 0
-    total_credits_completed = 0
     
     for enrollment in enrollments:
         course_data = courses_map.get(enrollment["course_id"], {})
         
-        if enrollment["status"] in ["enrolled", "completed"]:
-            total_credits_enrolled += course_data.get("credits", 0)
-        
-        if enrollment["status"] == "completed":
-            total_credits_completed += course_data.get("credits", 0)
-        
         detailed_enrollments.append(EnrollmentWithDetails(
             id=str(enrollment["_id"]),
             student_id=enrollment["student_id"],
             course_id=enrollment["course_id"],
-            student_name=student_data.get("name", "Unknown"),
-            student_email=student_data.get("email", "Unknown"),
-            course_title=course_data.get("title", "Unknown Course"),
-            course_credits=course_data.get("credits", 0),
+            student_name=enrollment.get("student_name") or student_data.get("name", "Unknown"),
+            student_email=enrollment.get("student_email") or student_data.get("email", "Unknown"),
+            course_title=enrollment.get("course_title") or course_data.get("title", "Unknown Course"),
+            course_credits=enrollment.get("course_credits", course_data.get("credits", 0)),
             status=enrollment["status"],
             progress=enrollment["progress"],
             enrollment_date=enrollment["enrollment_date"],
@@ -379,11 +487,11 @@ async def get_student_enrollments(student_id: str, authorization: str = Header(.
         ))
     
     return StudentProgress(
-        total_enrolled=len([e for e in enrollments if e["status"] == "enrolled"]),
-        total_completed=len([e for e in enrollments if e["status"] == "completed"]),
-        total_dropped=len([e for e in enrollments if e["status"] == "dropped"]),
-        total_credits_enrolled=total_credits_enrolled,
-        total_credits_completed=total_credits_completed,
+        total_enrolled=summary["total_enrolled"],
+        total_completed=summary["total_completed"],
+        total_dropped=summary["total_dropped"],
+        total_credits_enrolled=summary["total_credits_enrolled"],
+        total_credits_completed=summary["total_credits_completed"],
         enrollments=detailed_enrollments
     )
 
@@ -394,8 +502,14 @@ async def get_course_enrollments(course_id: str, authorization: str = Header(...
     """Get all enrollments for a course (admin only)"""
     verify_admin(authorization)
     
-    # Get course details
-    async with httpx.AsyncClient(timeout=10.0) as client:
+    # Get enrollments
+    enrollments = list(enrollments_collection.find({"course_id": course_id}))
+    
+    # The title comes from the snapshot; the course service is only asked when no
+    # enrollment has one, which also reports unknown courses
+    course_title = next((e["course_title"] for e in enrollments if has_course_snapshot(e)), None)
+    client = get_http_client()
+    if course_title is None:
         try:
             course_response = await client.get(
                 f"{COURSE_SERVICE_URL}/courses/{course_id}"
@@ -405,40 +519,45 @@ async def get_course_enrollments(course_id: str, authorization: str = Header(...
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Course not found"
                 )
-            course_data = course_response.json()
+            course_title = course_response.json()["title"]
         except httpx.RequestError:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Course service unavailable"
             )
     
-    # Get enrollments
-    enrollments = list(enrollments_collection.find({"course_id": course_id}))
-    
     # Get student details
     students = []
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for enrollment in enrollments:
+    for enrollment in enrollments:
+        if has_student_snapshot(enrollment):
+            student_data = {
+                "id": enrollment["student_id"],
+                "name": enrollment["student_name"],
+                "email": enrollment["student_email"]
+            }
+        else:
             try:
                 student_response = await client.get(
                     f"{STUDENT_SERVICE_URL}/students/{enrollment['student_id']}"
                 )
-                if student_response.status_code == 200:
-                    student_data = student_response.json()
-                    students.append({
-                        "id": student_data["id"],
-                        "name": student_data["name"],
-                        "email": student_data["email"],
-                        "status": enrollment["status"],
-                        "progress": enrollment["progress"],
-                        "enrollment_date": enrollment["enrollment_date"]
-                    })
+                if student_response.status_code != 200:
+                    continue
+                student_data = student_response.json()
             except:
                 continue
+        
+        students.append({
+            "id": student_data["id"],
+            "name": student_data["name"],
+            "email": student_data["email"],
+            "status": enrollment["status"],
+            "progress": enrollment["progress"],
+            "enrollment_date": enrollment["enrollment_date"]
+        })
     
     return CourseEnrollments(
         course_id=course_id,
-        course_title=course_data["title"],
+        course_title=course_title,
         total_enrollments=len(enrollments),
         active_enrollments=len([e for e in enrollments if e["status"] == "enrolled"]),
         completed_enrollments=len([e for e in enrollments if e["status"] == "completed"]),
@@ -446,6 +565,57 @@ async def get_course_enrollments(course_id: str, authorization: str = Header(...
         students=students
     )
 
+# ========== SNAPSHOT PROPAGATION ==========
+
+@router.put("/snapshots/course/{course_id}")
+async def update_course_snapshots(course_id: str, update: CourseSnapshotUpdate, authorization: str = Header(...)):
+    """Copy a course's new title or credits onto its enrollments (called by course-service, admin only)"""
+    verify_admin(authorization)
+    
+    updated = propagate_course_snapshot(course_id, title=update.title, credits=update.credits)
+    return {"course_id": course_id, "updated": updated}
+
+@router.put("/snapshots/student/{student_id}")
+async def update_student_snapshots(student_id: str, authorization: str = Header(...)):
+    """Refresh a student's name and email on their enrollments from the student record (called by student-service)"""
+    verify_student_or_admin(authorization, student_id)
+    
+    updated = propagate_student_snapshot(student_id)
+    return {"student_id": student_id, "updated": updated}
+
+# ========== SUMMARY MAINTENANCE ==========
+
+@job_queue.handler("rebuild_summaries")
+async def run_rebuild_summaries(job: Job):
+    """Recompute every student summary; one aggregation over all enrollments"""
+    count = await run_in_threadpool(rebuild_all_summaries, job.report)
+    return {"summaries": count}
+
+@job_queue.handler("check_summaries")
+async def run_check_summaries(job: Job):
+    """Report drifted summaries without writing anything"""
+    job.report(0.1, "Aggregating enrollments")
+    drifted = await run_in_threadpool(find_drift, job.params["limit"])
+    return {"drifted": drifted}
+
+@router.post("/summaries/rebuild", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def rebuild_summaries(response: Response, authorization: str = Header(...)):
+    """Start rebuilding all student summaries (admin only); poll the returned job for the outcome"""
+    decoded = verify_admin(authorization)
+    
+    job = job_queue.submit("rebuild_summaries", {}, created_by=decoded.get("id"))
+    response.headers["Location"] = f"/jobs/{job['_id']}"
+    return job_response(job)
+
+@router.post("/summaries/check", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def check_summaries(response: Response, authorization: str = Header(...), limit: int = 20):
+    """Start comparing stored summaries with the enrollments (admin only); the job's result lists drift"""
+    decoded = verify_admin(authorization)
+    
+    job = job_queue.submit("check_summaries", {"limit": min(max(limit, 1), 100)}, created_by=decoded.get("id"))
+    response.headers["Location"] = f"/jobs/{job['_id']}"
+    return job_response(job)
+
 # ========== UTILITY ENDPOINTS ==========
 
 @router.get("/course/{course_id}/count")
@@ -460,23 +630,30 @@ async def get_course_enrollment_count(course_id: str):
 @router.get("/counts")
 async def get_all_enrollment_counts():
     """Get enrollment counts for all courses (public)"""
+    counts = enrollment_counts_cache.get("all")
+    if counts is not None:
+        return counts
+    
+    generation = enrollment_counts_cache.generation()
     pipeline = [
         {"$match": {"status": {"$in": ["enrolled", "completed"]}}},
         {"$group": {"_id": "$course_id", "count": {"$sum": 1}}}
     ]
     
-    results = list(enrollments_collection.aggregate(pipeline))
-    return {item["_id"]: item["count"] for item in results}
+    results = list(enrollments_replica.aggregate(pipeline))
+    counts = {item["_id"]: item["count"] for item in results}
+    enrollment_counts_cache.set("all", counts, generation)
+    return counts
 
 @router.get("/stats")
 async def get_enrollment_stats(authorization: str = Header(...)):
     """Get overall enrollment statistics (admin only)"""
     verify_admin(authorization)
     
-    total = enrollments_collection.count_documents({})
-    enrolled = enrollments_collection.count_documents({"status": "enrolled"})
-    completed = enrollments_collection.count_documents({"status": "completed"})
-    dropped = enrollments_collection.count_documents({"status": "dropped"})
+    total = enrollments_replica.count_documents({})
+    enrolled = enrollments_replica.count_documents({"status": "enrolled"})
+    completed = enrollments_replica.count_documents({"status": "completed"})
+    dropped = enrollments_replica.count_documents({"status": "dropped"})
     
     return {
         "total": total,
@@ -0,0 +1,45 @@
+import base64
+import hashlib
+import hmac
+from contextlib import contextmanager
+from typing import Optional
+
+import bson
+
+from app.utils.database import client
+from app.utils.jwt_handler import SECRET_KEY
+
+# Returned after a write and sent back on the next read, so that read sees the write
+# even when it is served by a secondary that is still catching up
+CAUSAL_TOKEN_HEADER = "X-Causal-Token"
+
+def _signature(raw: bytes) -> bytes:
+    return hmac.new(SECRET_KEY.encode("utf-8"), raw, hashlib.sha256).digest()
+
+def causal_token(session) -> Optional[str]:
+    """The session's position in the oplog, signed; None on a standalone mongod, where every read is current"""
+    if session.operation_time is None or session.cluster_time is None:
+        return None
+    raw = bson.encode({"operationTime": session.operation_time, "clusterTime": session.cluster_time})
+    return base64.urlsafe_b64encode(raw + _signature(raw)).decode("ascii")
+
+def read_token(token: str) -> Optional[dict]:
+    """Inverse of causal_token; None for anything we didn't sign, which only costs read-your-writes"""
+    try:
+        data = base64.urlsafe_b64decode(token.encode("ascii"))
+    except (ValueError, UnicodeEncodeError):
+        return None
+    raw, signature = data[:-32], data[-32:]
+    if not raw or not hmac.compare_digest(signature, _signature(raw)):
+        return None
+    return bson.decode(raw)
+
+@contextmanager
+def causal_session(token: Optional[str] = None):
+    """A causally consistent session; reads in it wait until they can see whatever token was issued after"""
+    with client.start_session(causal_consistency=True) as session:
+        state = read_token(token) if token else None
+        if state:
+            session.advance_cluster_time(state["clusterTime"])
+            session.advance_operation_time(state["operationTime"])
+        yield session
@@ -1,26 +1,93 @@
-from pymongo import MongoClient
+from pymongo import MongoClient, ReadPreference
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import SecondaryPreferred
+from pymongo.write_concern import WriteConcern
 from dotenv import load_dotenv
 import os
 
+from app.utils.metrics import MongoCommandMetrics, MongoPoolMetrics
+from app.utils.tracing import mongo_listeners
+
 load_dotenv()
 
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 
+# Per process: pods x workers x this is what mongod has to hold open, so keep it small
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "20"))
+# Kept open while idle so the first requests after a quiet spell don't pay for a handshake
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "2"))
+# A request waiting longer than this for a free connection fails instead of hanging
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGO_WAIT_QUEUE_TIMEOUT_MS", "2000"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+# Comma-separated, e.g. "zstd,zlib"; off by default since in-cluster bandwidth is cheaper than the CPU
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+# Catalog, dashboard and stats reads may lag the primary by this much (90 is MongoDB's minimum)
+MONGO_MAX_STALENESS_SECONDS = int(os.getenv("MONGO_MAX_STALENESS_SECONDS", "90"))
+# "false" leaves those reads on MONGO_READ_PREFERENCE like everything else
+MONGO_SECONDARY_READS = os.getenv("MONGO_SECONDARY_READS", "true").lower() in ("1", "true", "yes")
+# A durable write not replicated to a majority within this long fails rather than hanging the request
+MONGO_MAJORITY_TIMEOUT_MS = int(os.getenv("MONGO_MAJORITY_TIMEOUT_MS", "5000"))
+
 # Create MongoDB client
-client = MongoClient(MONGO_URI)
+client = MongoClient(
+    MONGO_URI,
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+    readPreference=MONGO_READ_PREFERENCE,
+    **({"compressors": MONGO_COMPRESSORS} if MONGO_COMPRESSORS else {}),
+    event_listeners=[MongoCommandMetrics(), MongoPoolMetrics(), *mongo_listeners()]
+)
+
+def replica_reads(collection):
+    """The collection for reads that tolerate bounded staleness: a fresh enough secondary if there is one"""
+    if not MONGO_SECONDARY_READS:
+        return collection
+    return collection.with_options(
+        read_preference=SecondaryPreferred(max_staleness=MONGO_MAX_STALENESS_SECONDS),
+        # Majority reads are what let a causal session see its own writes on a secondary
+        read_concern=ReadConcern("majority")
+    )
+
+def primary_reads(collection):
+    """The collection for reads that guard a write: always the primary"""
+    return collection.with_options(read_preference=ReadPreference.PRIMARY)
+
+# Durability profiles: each write picks one by what losing it in a failover would cost
+DURABLE = WriteConcern(w="majority", j=True, wtimeout=MONGO_MAJORITY_TIMEOUT_MS)
+RELAXED = WriteConcern(w=1, j=True)
+
+def durable_writes(collection):
+    """The collection for writes that must survive a failover: acknowledged once a majority has journaled them"""
+    return collection.with_options(write_concern=DURABLE)
+
+def relaxed_writes(collection):
+    """The collection for high-volume writes that can be redone: acknowledged once the primary has journaled them"""
+    return collection.with_options(write_concern=RELAXED)
 
 # Database
 db = client["student_portal"]
 
 # Collections
 enrollments_collection = db["enrollments"]
+summaries_collection = db["student_summaries"]
+
+# Owned by course-service; only read here to backfill credits when rebuilding summaries
+courses_collection = db["courses"]
+
+# Per-route read policy: enroll, drop and complete check the primary whatever
+# MONGO_READ_PREFERENCE says; the dashboard, counts and stats accept bounded staleness
+enrollments_primary = primary_reads(enrollments_collection)
+enrollments_replica = replica_reads(enrollments_collection)
+summaries_replica = replica_reads(summaries_collection)
+
+# Durability: enrollment state and the summary counts moved with it wait for a majority;
+# progress, snapshot fan-outs and rebuilds can be redone and only wait for the primary's journal
+enrollments_durable = durable_writes(enrollments_collection)
+summaries_durable = durable_writes(summaries_collection)
+enrollments_relaxed = relaxed_writes(enrollments_collection)
+summaries_relaxed = relaxed_writes(summaries_collection)
 
-# Create indexes for better performance
-try:
-    enrollments_collection.create_index([("student_id", 1), ("course_id", 1)], unique=True)
-    enrollments_collection.create_index("student_id")
-    enrollments_collection.create_index("course_id")
-    enrollments_collection.create_index("status")
-    enrollments_collection.create_index("enrollment_date")
-except:
-    pass  # Indexes might already exist
+# Indexes and data cleanups are applied by migrate.py, not at import time
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.database import db
+from app.utils.jwt_handler import verify_token, get_token_from_header
+from app.utils.metrics import IDEMPOTENT_REQUESTS
+
+# "memory" remembers keys per process; "mongo" shares them between replicas, so a retry
+# that lands on another pod is still recognised
+IDEMPOTENCY_BACKEND = os.getenv("IDEMPOTENCY_BACKEND", "memory").lower()
+# How long a stored response is replayed for; well past any client's retry schedule
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+# A claim whose request never finished (the worker died) is given up after this long
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+# Worker processes serving this service; gunicorn.conf.py exports the count it starts
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+IDEMPOTENCY_KEY_HEADER = b"idempotency-key"
+MAX_KEY_LENGTH = 255
+
+# Stored responses; expired documents are removed by a TTL index on expires_at
+idempotency_collection = db["idempotency_keys"]
+
+class MemoryStore:
+    """Keys in this process; the oldest are evicted past maxsize"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+
+    async def claim(self, key: str, fingerprint: str) -> dict:
+        """Claim key for a new request; returns None if claimed, else the entry already holding it"""
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry and entry["expires_at"] > now:
+            return entry
+        self._entries[key] = {"fingerprint": fingerprint, "state": "processing", "expires_at": now + IDEMPOTENCY_LOCK_SECONDS}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return None
+
+    async def complete(self, key: str, response: dict):
+        entry = self._entries.get(key)
+        if entry:
+            entry.update(state="completed", response=response, expires_at=time.time() + IDEMPOTENCY_TTL_SECONDS)
+
+    async def release(self, key: str):
+        self._entries.pop(key, None)
+
+class MongoStore:
+    """Keys shared by every replica; the insert that claims a key is what makes it exclusive"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def claim(self, key: str, fingerprint: str) -> dict:
+        return await run_in_threadpool(self._claim, key, fingerprint)
+
+    def _claim(self, key: str, fingerprint: str) -> dict:
+        now = datetime.utcnow()
+        # A claim left by a request that never finished no longer blocks its retries
+        self.collection.delete_one({"_id": key, "state": "processing", "expires_at": {"$lt": now}})
+        try:
+            self.collection.insert_one({
+                "_id": key,
+                "fingerprint": fingerprint,
+                "state": "processing",
+                "expires_at": now + timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS)
+            })
+            return None
+        except DuplicateKeyError:
+            return self.collection.find_one({"_id": key}) or {"fingerprint": fingerprint, "state": "processing"}
+
+    async def complete(self, key: str, response: dict):
+        await run_in_threadpool(
+            self.collection.update_one,
+            {"_id": key},
+            {"$set": {
+                "state": "completed",
+                "response": response,
+                "expires_at": datetime.utcnow() + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS)
+            }}
+        )
+
+    async def release(self, key: str):
+        await run_in_threadpool(self.collection.delete_one, {"_id": key, "state": "processing"})
+
+def check_backend():
+    """Refuse to start with per-process keys when gunicorn runs several workers"""
+    if IDEMPOTENCY_BACKEND != "mongo" and WEB_CONCURRENCY > 1:
+        # Each worker would keep its own keys, and a retry reaching another worker would run again
+        raise RuntimeError(
+            f"IDEMPOTENCY_BACKEND=memory cannot be used with {WEB_CONCURRENCY} workers; "
+            "set IDEMPOTENCY_BACKEND=mongo or WEB_CONCURRENCY=1"
+        )
+
+def caller_id(scope) -> str:
+    """The authenticated caller, or None if the route is going to reject the request anyway"""
+    authorization = dict(scope["headers"]).get(b"authorization", b"").decode("latin-1")
+    try:
+        return verify_token(get_token_from_header(authorization)).get("id")
+    except HTTPException:
+        return None
+
+async def send_error(send, status_code: int, detail: str, retry_after: int = None):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode("ascii")),
+    ]
+    if retry_after:
+        headers.append((b"retry-after", str(retry_after).encode("ascii")))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
+
+async def read_body(receive) -> bytes:
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    return body
+
+class IdempotencyMiddleware:
+    """
+    Replays the stored response when a POST to one of paths is retried with the same
+    Idempotency-Key, without running the handler again. Keys are scoped to the caller
+    and the path. Reusing a key for a different body is rejected with 422, and a retry
+    that arrives while the first attempt is still running gets 409. Server errors are
+    not stored, so a request that failed that way runs again when it is retried.
+    """
+
+    def __init__(self, app, paths: list):
+        self.app = app
+        self.paths = set(paths)
+        self.store = MongoStore(idempotency_collection) if IDEMPOTENCY_BACKEND == "mongo" else MemoryStore()
+
+    async def __call__(self, scope, receive, send):
+        key_header = dict(scope.get("headers", [])).get(IDEMPOTENCY_KEY_HEADER)
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in self.paths or not key_header:
+            await self.app(scope, receive, send)
+            return
+
+        caller = caller_id(scope)
+        if not caller:
+            await self.app(scope, receive, send)
+            return
+        if len(key_header) > MAX_KEY_LENGTH:
+            await send_error(send, 400, f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await read_body(receive)
+        key = f"{caller}:{scope['path']}:{key_header.decode('latin-1')}"
+        fingerprint = hashlib.sha256(body).hexdigest()
+
+        try:
+            existing = await self.store.claim(key, fingerprint)
+        except PyMongoError as e:
+            # Failing open: without the store a retry just runs again, as it did before keys existed
+            print(f"⚠️  Idempotency store unavailable, running request: {str(e)[:200]}")
+            existing, key = None, None
+
+        if existing:
+            if existing["fingerprint"] != fingerprint:
+                IDEMPOTENT_REQUESTS.labels("mismatch").inc()
+                await send_error(send, 422, "Idempotency-Key was already used for a different request")
+            elif existing["state"] == "processing":
+                IDEMPOTENT_REQUESTS.labels("in_progress").inc()
+                await send_error(send, 409, "A request with this Idempotency-Key is still being processed", retry_after=1)
+            else:
+                IDEMPOTENT_REQUESTS.labels("replayed").inc()
+                await replay(send, existing["response"])
+            return
+
+        body_sent = False
+
+        async def receive_body():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        start = None
+        chunks = []
+
+        async def send_and_capture(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        completed = False
+        try:
+            await self.app(scope, receive_body, send_and_capture)
+            completed = start is not None and start["status"] < 500
+        finally:
+            if key:
+                try:
+                    if completed:
+                        IDEMPOTENT_REQUESTS.labels("stored").inc()
+                        await self.store.complete(key, {
+                            "status": start["status"],
+                            "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in start["headers"]],
+                            "body": b"".join(chunks)
+                        })
+                    else:
+                        await self.store.release(key)
+                except PyMongoError as e:
+                    print(f"⚠️  Could not record idempotent response: {str(e)[:200]}")
+
+async def replay(send, response: dict):
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response["headers"]]
+    await send({
+        "type": "http.response.start",
+        "status": response["status"],
+        "headers": headers + [(b"idempotent-replayed", b"true")]
+    })
+    await send({"type": "http.response.body", "body": bytes(response["body"])})
@@ -0,0 +1,179 @@
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from datetime import datetime, timedelta
+
+from app.utils.database import db, enrollments_collection
+from app.utils.rate_limit import rate_limits_collection
+from app.utils.jobs import jobs_collection
+from app.utils.idempotency import idempotency_collection
+from app.utils.summaries import rebuild_all_summaries
+from app.utils.snapshots import backfill_snapshots
+
+SERVICE_NAME = "enrollment-service"
+LOCK_TIMEOUT_MINUTES = 10
+
+# Shared by every service; each record is keyed by "<service>:<version>"
+migrations_collection = db["schema_migrations"]
+
+# MongoDB error codes for indexes that are missing or already defined differently
+INDEX_NOT_FOUND = 27
+INDEX_CONFLICT_CODES = (85, 86)
+
+# Statuses that count as holding a seat; partial indexes on them need MongoDB 6.0+ for $in
+ACTIVE_STATUSES = ["enrolled", "completed"]
+ACTIVE_ENROLLMENT_INDEX = "active_student_course_unique"
+
+def drop_index_if_exists(collection, name: str):
+    """Drop an index by name, ignoring indexes that don't exist"""
+    try:
+        collection.drop_index(name)
+        print(f"✓ Dropped index: {collection.name}.{name}")
+    except OperationFailure as e:
+        if e.code != INDEX_NOT_FOUND and "index not found" not in str(e).lower():
+            raise
+
+def create_index(collection, keys, **kwargs):
+    """Create an index, tolerating an equivalent index under another name"""
+    try:
+        name = collection.create_index(keys, **kwargs)
+        print(f"✓ Ensured index: {collection.name}.{name}")
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        print(f"⚠️  Skipped conflicting index on {collection.name}: {e}")
+
+# ========== MIGRATIONS ==========
+
+def create_enrollment_indexes():
+    create_index(enrollments_collection, [("student_id", 1), ("course_id", 1)], unique=True)
+    create_index(enrollments_collection, "student_id")
+    create_index(enrollments_collection, "course_id")
+    create_index(enrollments_collection, "status")
+    create_index(enrollments_collection, "enrollment_date")
+
+def require_active_enrollment_index():
+    """Raise unless the partial unique index on active enrollments exists as defined above"""
+    index = enrollments_collection.index_information().get(ACTIVE_ENROLLMENT_INDEX)
+    expected_filter = {"status": {"$in": ACTIVE_STATUSES}}
+    if (
+        not index
+        or not index.get("unique")
+        or index.get("key") != [("student_id", 1), ("course_id", 1)]
+        or index.get("partialFilterExpression") != expected_filter
+    ):
+        raise RuntimeError(
+            f"Index {ACTIVE_ENROLLMENT_INDEX} is missing or differs from "
+            f"{{student_id, course_id}} unique where {expected_filter}; "
+            "keeping student_id_1_course_id_1 and leaving this migration unapplied"
+        )
+
+def align_enrollment_indexes():
+    # Only one active enrollment per student and course; dropped ones no longer block re-enrolling
+    create_index(
+        enrollments_collection,
+        [("student_id", 1), ("course_id", 1)],
+        name=ACTIVE_ENROLLMENT_INDEX,
+        unique=True,
+        partialFilterExpression={"status": {"$in": ACTIVE_STATUSES}}
+    )
+    # Capacity checks, enrollment counts and rosters: {course_id, status}
+    create_index(enrollments_collection, [("course_id", 1), ("status", 1)])
+    # Per-course counts for the catalog and the stats counts, answered from the index alone
+    create_index(enrollments_collection, [("status", 1), ("course_id", 1)])
+    # Dashboards list a student's enrollments newest first
+    create_index(enrollments_collection, [("student_id", 1), ("enrollment_date", -1)])
+
+    # create_index skips conflicts; without the partial index the old one is the only duplicate guard
+    require_active_enrollment_index()
+
+    # The old unique index, and single-field indexes the compound ones above start with
+    for name in ("student_id_1_course_id_1", "student_id_1", "course_id_1", "status_1"):
+        drop_index_if_exists(enrollments_collection, name)
+
+def build_student_summaries():
+    count = rebuild_all_summaries()
+    print(f"✓ Built {count} student summaries")
+
+def backfill_enrollment_snapshots():
+    count = backfill_snapshots()
+    print(f"✓ Backfilled course and student snapshots ({count} updates)")
+
+def create_rate_limit_ttl_index():
+    # Buckets are shared by all services (keys are per route), so each one ensures this
+    create_index(rate_limits_collection, "expires_at", expireAfterSeconds=0)
+
+def create_idempotency_ttl_index():
+    # Stored responses and abandoned claims both carry their own expiry
+    create_index(idempotency_collection, "expires_at", expireAfterSeconds=0)
+
+def create_job_indexes():
+    # Finished jobs expire on their own; the compound index serves the recent-jobs listing
+    create_index(jobs_collection, "expires_at", expireAfterSeconds=0)
+    create_index(jobs_collection, [("kind", 1), ("created_at", -1)])
+
+# Append new migrations with the next version number; never renumber applied ones
+MIGRATIONS = [
+    (1, "Create enrollment lookup indexes", create_enrollment_indexes),
+    (2, "Backfill course credits and build student summaries", build_student_summaries),
+    (3, "Backfill course and student snapshots on enrollments", backfill_enrollment_snapshots),
+    (4, "Replace single-field enrollment indexes with query-shaped compound ones", align_enrollment_indexes),
+    (5, "Expire shared rate-limit buckets", create_rate_limit_ttl_index),
+    (6, "Expire stored idempotent responses", create_idempotency_ttl_index),
+    (7, "Expire finished jobs and index them by kind", create_job_indexes),
+]
+
+# ========== RUNNER ==========
+
+def get_applied_versions() -> set:
+    """Return the migration versions already recorded for this service"""
+    records = migrations_collection.find(
+        {"service": SERVICE_NAME, "version": {"$exists": True}},
+        {"version": 1}
+    )
+    return {record["version"] for record in records}
+
+def get_pending_migrations() -> list:
+    applied = get_applied_versions()
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+def acquire_lock() -> bool:
+    """Take the per-service migration lock, breaking it if it has gone stale"""
+    lock_id = f"{SERVICE_NAME}:lock"
+    now = datetime.utcnow()
+    migrations_collection.delete_one({
+        "_id": lock_id,
+        "locked_at": {"$lt": now - timedelta(minutes=LOCK_TIMEOUT_MINUTES)}
+    })
+    try:
+        migrations_collection.insert_one({
+            "_id": lock_id,
+            "service": SERVICE_NAME,
+            "locked_at": now
+        })
+        return True
+    except DuplicateKeyError:
+        return False
+
+def release_lock():
+    migrations_collection.delete_one({"_id": f"{SERVICE_NAME}:lock"})
+
+def run_migrations() -> int:
+    """Apply pending migrations in version order and record each one"""
+    if not acquire_lock():
+        raise RuntimeError(f"Migrations for {SERVICE_NAME} are already running")
+
+    try:
+        applied_count = 0
+        for version, description, migrate in get_pending_migrations():
+            print(f"→ Applying {SERVICE_NAME} migration {version}: {description}")
+            migrate()
+            migrations_collection.insert_one({
+                "_id": f"{SERVICE_NAME}:{version}",
+                "service": SERVICE_NAME,
+                "version": version,
+                "description": description,
+                "applied_at": datetime.utcnow().isoformat()
+            })
+            applied_count += 1
+        return applied_count
+    finally:
+        release_lock()
@@ -0,0 +1,136 @@
+from bson import ObjectId
+from pymongo import UpdateMany
+
+from app.utils.database import (
+    db, enrollments_collection, enrollments_relaxed, summaries_durable, courses_collection, primary_reads
+)
+
+# Owned by student-service; only read here to fill in student snapshots
+students_collection = db["students"]
+
+BACKFILL_BATCH_SIZE = 1000
+
+# Statuses whose credits are counted in the student summaries
+SUMMARY_STATUSES = ["enrolled", "completed"]
+
+def course_snapshot(course: dict) -> dict:
+    """Course fields copied onto each enrollment so views don't call the course service"""
+    return {"course_title": course.get("title"), "course_credits": course.get("credits", 0)}
+
+def student_snapshot(student: dict) -> dict:
+    """Student fields copied onto each enrollment so rosters don't call the student service"""
+    return {"student_name": student.get("name"), "student_email": student.get("email")}
+
+def has_course_snapshot(enrollment: dict) -> bool:
+    return enrollment.get("course_title") is not None
+
+def has_student_snapshot(enrollment: dict) -> bool:
+    return enrollment.get("student_name") is not None
+
+# ========== PROPAGATION ==========
+
+def propagate_course_snapshot(course_id: str, title: str = None, credits: int = None) -> int:
+    """Fan a course title or credits change out to its enrollments and their students' summaries"""
+    modified = 0
+    if credits is not None:
+        modified += adjust_summary_credits(course_id, credits)
+        # Enrollments that don't count toward summaries can take the new credits without an $inc
+        modified += enrollments_relaxed.update_many(
+            {"course_id": course_id, "status": {"$nin": SUMMARY_STATUSES}, "course_credits": {"$ne": credits}},
+            {"$set": {"course_credits": credits}}
+        ).modified_count
+    if title is not None:
+        modified += enrollments_relaxed.update_many(
+            {"course_id": course_id}, {"$set": {"course_title": title}}
+        ).modified_count
+    return modified
+
+def adjust_summary_credits(course_id: str, new_credits: int) -> int:
+    """Move enrollments that count toward summaries to the new credits, shifting totals by what each update changed"""
+    pipeline = [
+        {"$match": {
+            "course_id": course_id,
+            "status": {"$in": SUMMARY_STATUSES},
+            "course_credits": {"$ne": new_credits}
+        }},
+        {"$group": {"_id": {"student_id": "$student_id", "status": "$status", "credits": "$course_credits"}}}
+    ]
+    modified = 0
+    # A concurrent change may have moved some enrollments between the read and the update; only the
+    # ones still at the credits we read are counted, and the rest are picked up by the next pass
+    while True:
+        groups = [group["_id"] for group in enrollments_collection.aggregate(pipeline)]
+        if not groups:
+            return modified
+
+        for group in groups:
+            result = enrollments_collection.update_many(
+                {
+                    "course_id": course_id,
+                    "student_id": group["student_id"],
+                    "status": group["status"],
+                    "course_credits": group.get("credits")
+                },
+                {"$set": {"course_credits": new_credits}}
+            )
+            if not result.modified_count:
+                continue
+            modified += result.modified_count
+
+            delta = result.modified_count * (new_credits - (group.get("credits") or 0))
+            increments = {"total_credits_enrolled": delta}
+            if group["status"] == "completed":
+                increments["total_credits_completed"] = delta
+            # $inc can't be safely redone, unlike the snapshot $sets around it
+            summaries_durable.update_one({"_id": group["student_id"]}, {"$inc": increments})
+
+def propagate_student_snapshot(student_id: str) -> int:
+    """Copy the student's stored name and email onto their enrollments"""
+    # Read from the student record, never the caller, and from the primary so a just-saved change is seen
+    student = primary_reads(students_collection).find_one(
+        {"_id": ObjectId(student_id)} if ObjectId.is_valid(student_id) else {"_id": student_id},
+        {"name": 1, "email": 1}
+    )
+    if not student:
+        return 0
+
+    result = enrollments_relaxed.update_many({"student_id": student_id}, {"$set": student_snapshot(student)})
+    return result.modified_count
+
+# ========== BACKFILL ==========
+
+def object_ids(ids: list) -> list:
+    return [ObjectId(i) for i in ids if ObjectId.is_valid(i)]
+
+def backfill_snapshots() -> int:
+    """Copy course and student fields onto enrollments created before snapshots were stored"""
+    updated = 0
+
+    course_ids = enrollments_collection.distinct("course_id", {"course_title": None})
+    for start in range(0, len(course_ids), BACKFILL_BATCH_SIZE):
+        courses = courses_collection.find(
+            {"_id": {"$in": object_ids(course_ids[start:start + BACKFILL_BATCH_SIZE])}},
+            {"title": 1}
+        )
+        # Only the title is filled in; credits were backfilled with the summaries and feed their totals
+        operations = [
+            UpdateMany({"course_id": str(c["_id"]), "course_title": None}, {"$set": {"course_title": c["title"]}})
+            for c in courses
+        ]
+        if operations:
+            updated += enrollments_relaxed.bulk_write(operations, ordered=False).modified_count
+
+    student_ids = enrollments_collection.distinct("student_id", {"student_name": None})
+    for start in range(0, len(student_ids), BACKFILL_BATCH_SIZE):
+        students = students_collection.find(
+            {"_id": {"$in": object_ids(student_ids[start:start + BACKFILL_BATCH_SIZE])}},
+            {"name": 1, "email": 1}
+        )
+        operations = [
+            UpdateMany({"student_id": str(s["_id"]), "student_name": None}, {"$set": student_snapshot(s)})
+            for s in students
+        ]
+        if operations:
+            updated += enrollments_relaxed.bulk_write(operations, ordered=False).modified_count
+
+    return updated
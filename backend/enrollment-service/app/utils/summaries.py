@@ -0,0 +1,201 @@
+from bson import ObjectId
+from datetime import datetime
+from typing import Optional
+
+from app.utils.database import (
+    enrollments_collection, enrollments_relaxed, summaries_collection, summaries_durable, summaries_relaxed,
+    summaries_replica, courses_collection
+)
+
+# Counter kept in the summary for each enrollment status
+STATUS_FIELDS = {
+    "enrolled": "total_enrolled",
+    "completed": "total_completed",
+    "dropped": "total_dropped",
+}
+
+SUMMARY_FIELDS = (
+    "total_enrolled",
+    "total_completed",
+    "total_dropped",
+    "total_credits_enrolled",
+    "total_credits_completed",
+)
+
+def empty_summary(student_id: str) -> dict:
+    return {"_id": student_id, **{field: 0 for field in SUMMARY_FIELDS}}
+
+def status_counters(status: str, credits: int) -> dict:
+    """What one enrollment in this status contributes to its student's summary"""
+    counters = {STATUS_FIELDS[status]: 1}
+    # Credits enrolled count in-progress and completed courses, as the dashboard always has
+    if status in ("enrolled", "completed"):
+        counters["total_credits_enrolled"] = credits
+    if status == "completed":
+        counters["total_credits_completed"] = credits
+    return counters
+
+def enrollment_credits(enrollment: dict) -> int:
+    """Credits stored on the enrollment, or looked up for ones created before they were stored"""
+    if "course_credits" in enrollment:
+        return enrollment["course_credits"]
+    if not ObjectId.is_valid(enrollment["course_id"]):
+        return 0
+    course = courses_collection.find_one({"_id": ObjectId(enrollment["course_id"])}, {"credits": 1})
+    return course.get("credits", 0) if course else 0
+
+def record_transition(enrollment: dict, old_status: Optional[str], new_status: str, session=None):
+    """Apply one status change to the student's summary; old_status is None for a new enrollment"""
+    credits = enrollment_credits(enrollment)
+    increments = status_counters(new_status, credits)
+    if old_status:
+        for field, value in status_counters(old_status, credits).items():
+            increments[field] = increments.get(field, 0) - value
+
+    # As durable as the enrollment change it follows
+    result = summaries_durable.update_one(
+        {"_id": enrollment["student_id"]},
+        {
+            "$inc": {field: value for field, value in increments.items() if value},
+            "$set": {"updated_at": datetime.utcnow().isoformat()}
+        },
+        session=session
+    )
+    # No summary yet (first enrollment, or never backfilled): create it from the
+    # enrollments, which already include this change
+    if result.matched_count == 0:
+        create_summary_if_missing(enrollment["student_id"], session)
+
+def get_summary(student_id: str, session=None) -> dict:
+    """Read the student's summary; pass a causal session to see its writes"""
+    summary = summaries_replica.find_one({"_id": student_id}, session=session)
+    # A miss may only be replica lag, so compute the answer without storing it:
+    # writing here would race with the counters record_transition is moving
+    return summary or compute_student_summary(student_id, session)
+
+# ========== REBUILD ==========
+
+def backfill_course_credits() -> int:
+    """Store course credits on enrollments created before they were stored at enroll time"""
+    updated = 0
+    for course in courses_collection.find({}, {"credits": 1}):
+        result = enrollments_relaxed.update_many(
+            {"course_id": str(course["_id"]), "course_credits": {"$exists": False}},
+            {"$set": {"course_credits": course.get("credits", 0)}}
+        )
+        updated += result.modified_count
+    return updated
+
+def summary_pipeline(match: dict, updated_at: str) -> list:
+    """Aggregate enrollments into one summary per student"""
+    def count_status(status):
+        return {"$sum": {"$cond": [{"$eq": ["$status", status]}, 1, 0]}}
+
+    def sum_credits(statuses):
+        return {"$sum": {"$cond": [
+            {"$in": ["$status", statuses]},
+            {"$ifNull": ["$course_credits", 0]},
+            0
+        ]}}
+
+    return [
+        {"$match": match},
+        {"$group": {
+            "_id": "$student_id",
+            "total_enrolled": count_status("enrolled"),
+            "total_completed": count_status("completed"),
+            "total_dropped": count_status("dropped"),
+            "total_credits_enrolled": sum_credits(["enrolled", "completed"]),
+            "total_credits_completed": sum_credits(["completed"]),
+        }},
+        {"$set": {"updated_at": updated_at}},
+    ]
+
+def compute_student_summary(student_id: str, session=None) -> dict:
+    """The student's summary as their enrollments currently add up, without writing anything"""
+    summary = {**empty_summary(student_id), "updated_at": datetime.utcnow().isoformat()}
+    enrollments = enrollments_collection.find(
+        {"student_id": student_id},
+        {"course_id": 1, "course_credits": 1, "status": 1},
+        session=session
+    )
+    for enrollment in enrollments:
+        if enrollment.get("status") in STATUS_FIELDS:
+            for field, value in status_counters(enrollment["status"], enrollment_credits(enrollment)).items():
+                summary[field] += value
+    return summary
+
+def create_summary_if_missing(student_id: str, session=None):
+    """Store a computed summary only if none exists; one created meanwhile already carries the counters"""
+    summary = compute_student_summary(student_id, session)
+    del summary["_id"]
+    summaries_durable.update_one({"_id": student_id}, {"$setOnInsert": summary}, upsert=True, session=session)
+
+def rebuild_student_summary(student_id: str, session=None) -> dict:
+    """Recompute one student's summary from their enrollments and overwrite it; for repairs only"""
+    for enrollment in enrollments_collection.find({"student_id": student_id, "course_credits": {"$exists": False}}, session=session):
+        enrollments_relaxed.update_one(
+            {"_id": enrollment["_id"]},
+            {"$set": {"course_credits": enrollment_credits(enrollment)}},
+            session=session
+        )
+
+    now = datetime.utcnow().isoformat()
+    results = list(enrollments_collection.aggregate(summary_pipeline({"student_id": student_id}, now), session=session))
+    summary = results[0] if results else {**empty_summary(student_id), "updated_at": now}
+    summaries_relaxed.replace_one({"_id": student_id}, summary, upsert=True, session=session)
+    return summary
+
+def rebuild_all_summaries(report=None) -> int:
+    """Recompute every summary server-side and remove summaries for students with no enrollments"""
+    report = report or (lambda progress, message: None)
+    report(0.0, "Backfilling course credits")
+    backfill_course_credits()
+    report(0.2, "Aggregating enrollments into summaries")
+    rebuilt_at = datetime.utcnow().isoformat()
+    # $merge writes with the collection's write concern; a rebuild can always be rerun
+    enrollments_relaxed.aggregate([
+        *summary_pipeline({}, rebuilt_at),
+        {"$merge": {"into": summaries_collection.name, "whenMatched": "replace", "whenNotMatched": "insert"}}
+    ], allowDiskUse=True)
+    report(0.9, "Removing summaries with no enrollments")
+    # Anything the merge didn't touch (and no request updated since) has no enrollments left
+    summaries_relaxed.delete_many({"updated_at": {"$lt": rebuilt_at}})
+    return summaries_collection.count_documents({})
+
+def summary_differences(stored: dict, expected: dict) -> dict:
+    return {
+        field: {"stored": stored.get(field, 0), "expected": expected[field]}
+        for field in SUMMARY_FIELDS
+        if stored.get(field, 0) != expected[field]
+    }
+
+def find_drift(limit: int = 20) -> list:
+    """Compare stored summaries with freshly aggregated ones without writing anything"""
+    pipeline = [
+        *summary_pipeline({}, datetime.utcnow().isoformat()),
+        {"$lookup": {"from": summaries_collection.name, "localField": "_id", "foreignField": "_id", "as": "stored"}},
+    ]
+    drifted = []
+    aggregated = set()
+    for expected in enrollments_collection.aggregate(pipeline, allowDiskUse=True):
+        aggregated.add(expected["_id"])
+        stored = expected["stored"][0] if expected["stored"] else empty_summary(expected["_id"])
+        differences = summary_differences(stored, expected)
+        if differences:
+            drifted.append({"student_id": expected["_id"], "differences": differences})
+            if len(drifted) >= limit:
+                return drifted
+
+    # Summaries left behind by students with no enrollments should have every counter at zero
+    nonzero = {"$or": [{field: {"$nin": [0, None]}} for field in SUMMARY_FIELDS]}
+    for stored in summaries_collection.find(nonzero, {field: 1 for field in SUMMARY_FIELDS}):
+        if stored["_id"] in aggregated:
+            continue
+        drifted.append({
+            "student_id": stored["_id"],
+            "differences": summary_differences(stored, empty_summary(stored["_id"]))
+        })
+        if len(drifted) >= limit:
+            break
+    return drifted
@@ -0,0 +1,89 @@
+import asyncio
+import os
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, WriteError
+
+from app.utils.database import enrollments_relaxed
+from app.utils.metrics import MONGO_WRITE_BATCH_SIZE
+
+# How long the first update in a batch waits for others to join it; 0 writes each update on its own
+PROGRESS_WRITE_WINDOW_MS = float(os.getenv("PROGRESS_WRITE_WINDOW_MS", "5"))
+# A batch this large is written at once instead of waiting out the window
+PROGRESS_WRITE_MAX_BATCH = int(os.getenv("PROGRESS_WRITE_MAX_BATCH", "500"))
+
+class WriteBuffer:
+    """
+    Coalesces single-document updates that arrive within a few milliseconds of each
+    other into one unordered bulk_write. update_one() returns only once the batch
+    holding its update has been acknowledged at the collection's write concern, and
+    raises that update's own error if it failed, so callers keep update_one's
+    acknowledgement semantics. Updates queued under the same key replace each other
+    and the last one wins, so a key must only be shared by updates that $set
+    absolute values.
+    """
+
+    def __init__(self, name: str, collection, window_ms: float, max_batch: int):
+        self.name = name
+        self.collection = collection
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        # key -> (operation, futures of every caller waiting on it)
+        self.pending = {}
+        self.timer = None
+
+    async def update_one(self, key, filter: dict, update: dict):
+        if self.window <= 0:
+            self.collection.update_one(filter, update)
+            return
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        _, waiters = self.pending.get(key, (None, []))
+        self.pending[key] = (UpdateOne(filter, update), waiters + [future])
+
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.timer is None:
+            self.timer = loop.call_later(self.window, self.flush)
+        await future
+
+    def flush(self):
+        """Write everything pending as one batch and settle its callers"""
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        if not self.pending:
+            return
+        batch = list(self.pending.values())
+        self.pending = {}
+
+        failure = None
+        failures = {}
+        try:
+            MONGO_WRITE_BATCH_SIZE.labels(self.name).observe(len(batch))
+            self.collection.bulk_write([operation for operation, _ in batch], ordered=False)
+        except BulkWriteError as e:
+            failures = {
+                error["index"]: WriteError(error.get("errmsg"), error.get("code"), error)
+                for error in e.details.get("writeErrors", [])
+            }
+            if e.details.get("writeConcernErrors"):
+                # Applied, but not acknowledged the way the collection asks; nobody gets a success
+                failure = e
+        except Exception as e:
+            # The batch is already out of pending; whatever went wrong, its callers must hear about it
+            failure = e
+
+        for index, (_, waiters) in enumerate(batch):
+            error = failure or failures.get(index)
+            for waiter in waiters:
+                if waiter.done():
+                    continue  # The request went away while it waited
+                if error:
+                    waiter.set_exception(error)
+                else:
+                    waiter.set_result(None)
+
+# Progress is the most frequent write and the cheapest to redo
+progress_writes = WriteBuffer("progress", enrollments_relaxed, PROGRESS_WRITE_WINDOW_MS, PROGRESS_WRITE_MAX_BATCH)
@@ -1,14 +1,61 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.routes import enrollments
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, Response, RedirectResponse
+from app.routes import enrollments, jobs
+from app.utils.health import warm_up, check_readiness
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.utils.compression import CompressionMiddleware
+from app.utils.rate_limit import AdmissionMiddleware, RateRule
+from app.utils.idempotency import IdempotencyMiddleware, check_backend as check_idempotency_backend
+from app.utils.profiling import PROFILING_ENABLED, ProfilingMiddleware
+from app.utils.tracing import setup_tracing, shutdown_tracing
+from app.utils.cache_bus import cache_bus
+from app.utils.jobs import job_queue
+from app.utils.http_client import close_http_client
+from app.utils.write_buffer import progress_writes
+
+# Public and aggregates every active enrollment when its cache is cold
+RATE_RULES = [
+    RateRule("counts", "GET", r"/enrollments/counts", "RATE_LIMIT_COUNTS", "20/second"),
+]
+
+# Retried after a timeout, these would repeat the upstream lookups and the write, then fail with a 400
+IDEMPOTENT_PATHS = ["/enrollments", "/enrollments/drop", "/enrollments/complete"]
+
+# Before any worker serves a request; under gunicorn a failure here stops the whole service
+check_idempotency_backend()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm connections in the background; /ready reports once this has succeeded
+    warm_up_task = asyncio.create_task(warm_up())
+    cache_bus.start()
+    job_queue.start()
+    yield
+    # Running jobs are cancelled and marked failed; their records say so to whoever polls
+    await job_queue.stop()
+    # Anything still waiting out its batch window is written before the process exits
+    progress_writes.flush()
+    warm_up_task.cancel()
+    cache_bus.stop()
+    await close_http_client()
+    shutdown_tracing()
 
 app = FastAPI(
     title="Enrollment Service",
     description="Handles course enrollments, progress tracking, and completions",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Innermost, so replays are rate limited like the requests they stand in for
+app.add_middleware(IdempotencyMiddleware, paths=IDEMPOTENT_PATHS)
+
+# Inside CORS so rejections still carry the headers browsers need to read them
+app.add_middleware(AdmissionMiddleware, rules=RATE_RULES)
+
 # Configure CORS - Allow all origins in development
 app.add_middleware(
     CORSMiddleware,
@@ -19,12 +66,43 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Opt-in per-request profiling for admins; not installed at all unless enabled
+if PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Outside CORS and profiling so their headers and bodies are final when it compresses
+app.add_middleware(CompressionMiddleware)
+
+# Added last so it wraps everything, including CORS preflights
+app.add_middleware(MetricsMiddleware)
+
+setup_tracing(app)
+
 app.include_router(enrollments.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 def root():
     return RedirectResponse(url="/docs")
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/live")
+def liveness_check():
+    """Process is up and serving; never touches dependencies"""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Dependencies are reachable and connection pools are warm"""
+    ready, report = await check_readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=report)
+
 @app.get("/health")
 def health_check():
+    """Kept for existing callers; equivalent to /live"""
     return {"status": "healthy"}
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Rebuild the per-student enrollment summaries from the enrollments collection
+Use --check to report drift without writing, or --student <id> to repair one student
+"""
+
+import sys
+
+from app.utils.summaries import find_drift, rebuild_all_summaries, rebuild_student_summary
+
+def print_drift():
+    """List students whose stored summary no longer matches their enrollments"""
+    drifted = find_drift()
+    if not drifted:
+        print("✅ All student summaries match their enrollments")
+        return
+    print(f"⚠️  {len(drifted)} drifted summaries (showing at most 20):")
+    for item in drifted:
+        fields = ", ".join(
+            f"{field} {values['stored']} → {values['expected']}"
+            for field, values in item["differences"].items()
+        )
+        print(f"   {item['student_id']}: {fields}")
+    sys.exit(2)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    try:
+        if "--check" in args:
+            print_drift()
+        elif "--student" in args:
+            student_id = args[args.index("--student") + 1]
+            summary = rebuild_student_summary(student_id)
+            print(f"✅ Rebuilt summary for {student_id}: {summary['total_enrolled']} enrolled, "
+                  f"{summary['total_completed']} completed, {summary['total_dropped']} dropped")
+        else:
+            print("Rebuilding student summaries...")
+            count = rebuild_all_summaries()
+            print(f"✅ Rebuilt {count} student summaries")
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        sys.exit(1)
@@ -0,0 +1,54 @@
+import asyncio
+
+from app.utils.write_buffer import WriteBuffer
+
+class FakeCollection:
+    """Records each bulk_write, or raises the error it was given"""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.batches = []
+
+    def bulk_write(self, operations, ordered=True):
+        if self.error:
+            raise self.error
+        self.batches.append(operations)
+
+def run_updates(buffer: WriteBuffer, count: int):
+    async def updates():
+        return await asyncio.wait_for(
+            asyncio.gather(
+                *(buffer.update_one(i, {"_id": i}, {"$set": {"progress": 50}}) for i in range(count)),
+                return_exceptions=True
+            ),
+            timeout=2
+        )
+    return asyncio.run(updates())
+
+def test_updates_in_one_window_share_a_bulk_write():
+    collection = FakeCollection()
+    buffer = WriteBuffer("test", collection, window_ms=5, max_batch=100)
+
+    results = run_updates(buffer, 3)
+
+    assert results == [None, None, None]
+    assert len(collection.batches) == 1
+    assert len(collection.batches[0]) == 3
+    assert buffer.pending == {}
+
+def test_unexpected_error_reaches_every_waiter():
+    collection = FakeCollection(error=TypeError("not a valid operation"))
+    buffer = WriteBuffer("test", collection, window_ms=5, max_batch=100)
+
+    results = run_updates(buffer, 3)
+
+    assert all(isinstance(result, TypeError) for result in results)
+    assert buffer.pending == {}
+
+def test_unexpected_error_on_a_full_batch_reaches_every_waiter():
+    collection = FakeCollection(error=TypeError("not a valid operation"))
+    buffer = WriteBuffer("test", collection, window_ms=1000, max_batch=2)
+
+    results = run_updates(buffer, 2)
+
+    assert all(isinstance(result, TypeError) for result in results)
@@ -1,11 +1,36 @@
 from fastapi import APIRouter, HTTPException, status, Header
+from bson import ObjectId
+from datetime import datetime
+from typing import Optional
 import bcrypt
+import os
+import re
 from app.models.schemas import AdminLogin, AdminResponse, TokenResponse
 from app.utils.jwt_handler import create_access_token, verify_token, get_token_from_header
-from app.utils.database import admins_collection, students_collection
+from app.utils.database import admins_collection, students_collection, students_replica, courses_replica, enrollments_replica
+from app.utils.cache_bus import TTLCache
+from app.utils.names import normalize_name, normalize_email, prefix_regex, encode_cursor, decode_cursor
+from app.utils.metrics import PASSWORD_HASHES_IN_PROGRESS
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+# The dashboard shows how old its numbers are, so a short fixed TTL is enough and
+# enrollment traffic doesn't keep invalidating it
+ADMIN_SUMMARY_TTL_SECONDS = float(os.getenv("ADMIN_SUMMARY_TTL_SECONDS", "30"))
+RECENT_ITEMS = 5
+
+summary_cache = TTLCache("admin_summary", lambda: ADMIN_SUMMARY_TTL_SECONDS, maxsize=1)
+
+# Typeahead asks for a handful of rows per keystroke
+DEFAULT_SEARCH_LIMIT = 10
+MAX_SEARCH_LIMIT = 50
+
+# Searchable field -> the index order its prefix is matched and paged in
+SEARCH_ORDERS = {
+    "name": [("name_normalized", 1), ("_id", 1)],
+    "email": [("email_normalized", 1), ("_id", 1)],
+}
+
 # ========== ADMIN AUTHENTICATION ==========
 
 @router.post("/login", response_model=TokenResponse)
@@ -23,7 +48,9 @@ def admin_login(credentials: AdminLogin):
     password_bytes = credentials.password.encode('utf-8')
     stored_password = admin["password"].encode('utf-8')
     
-    if not bcrypt.checkpw(password_bytes, stored_password):
+    with PASSWORD_HASHES_IN_PROGRESS.track_inprogress():
+        password_matches = bcrypt.checkpw(password_bytes, stored_password)
+    if not password_matches:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -83,6 +110,74 @@ def get_admin_profile(authorization: str = Header(...)):
     admin["role"] = "admin"
     return admin
 
+# ========== DASHBOARD ==========
+
+def build_admin_summary() -> dict:
+    """Totals and the newest students and courses, without scanning any collection"""
+    # Collection totals come from metadata rather than a count over every document
+    totals = {
+        "students": students_replica.estimated_document_count(),
+        "courses": courses_replica.estimated_document_count(),
+        "enrollments": enrollments_replica.estimated_document_count(),
+    }
+    # Counted on the status index
+    for enrollment_status in ("enrolled", "completed", "dropped"):
+        totals[enrollment_status] = enrollments_replica.count_documents({"status": enrollment_status})
+    
+    # ObjectIds increase with creation time, so the _id index gives the newest students
+    recent_students = list(
+        students_replica.find({}, {"name": 1, "email": 1, "created_at": 1})
+        .sort("_id", -1)
+        .limit(RECENT_ITEMS)
+    )
+    recent_courses = list(
+        courses_replica.find({}, {"title": 1, "credits": 1, "max_students": 1, "created_at": 1})
+        .sort("created_at", -1)
+        .limit(RECENT_ITEMS)
+    )
+    
+    course_ids = [str(course["_id"]) for course in recent_courses]
+    counts = {
+        item["_id"]: item["count"]
+        for item in enrollments_replica.aggregate([
+            {"$match": {"course_id": {"$in": course_ids}, "status": {"$in": ["enrolled", "completed"]}}},
+            {"$group": {"_id": "$course_id", "count": {"$sum": 1}}}
+        ])
+    }
+    
+    for item in recent_students + recent_courses:
+        item["_id"] = str(item["_id"])
+        item["id"] = item["_id"]
+    for course in recent_courses:
+        course["current_enrollments"] = counts.get(course["id"], 0)
+    
+    return {
+        "totals": totals,
+        "recent_students": recent_students,
+        "recent_courses": recent_courses,
+        "generated_at": datetime.utcnow().isoformat()
+    }
+
+@router.get("/summary")
+def get_admin_summary(authorization: str = Header(...), refresh: bool = False):
+    """Dashboard totals and recent items, cached for ADMIN_SUMMARY_TTL_SECONDS"""
+    token = get_token_from_header(authorization)
+    decoded = verify_token(token)
+    
+    # Verify admin role
+    if decoded.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    summary = None if refresh else summary_cache.get("summary")
+    if summary is None:
+        summary = build_admin_summary()
+        summary_cache.set("summary", summary)
+    
+    return {**summary, "max_age_seconds": ADMIN_SUMMARY_TTL_SECONDS}
+
 # ========== STUDENT MANAGEMENT ==========
 
 @router.get("/students")
@@ -123,6 +218,102 @@ def get_all_students(
         "limit": limit
     }
 
+@router.get("/students/search")
+def search_students(
+    q: str,
+    authorization: str = Header(...),
+    field: Optional[str] = None,
+    limit: int = DEFAULT_SEARCH_LIMIT,
+    after: Optional[str] = None
+):
+    """Find students whose name or email starts with q (typeahead, keyset paged)"""
+    token = get_token_from_header(authorization)
+    decoded = verify_token(token)
+    
+    # Verify admin role
+    if decoded.get("role") != "admin":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin access required"
+        )
+    
+    # Anything with an @ can only be an email; otherwise match names, then emails
+    if field:
+        fields = [field]
+    else:
+        fields = ["email"] if "@" in q else ["name", "email"]
+    combined = len(fields) > 1
+    if any(f not in SEARCH_ORDERS for f in fields):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="field must be 'name' or 'email'"
+        )
+    
+    prefixes = {"name": normalize_name(q), "email": normalize_email(q)}
+    if not all(prefixes[f] for f in fields):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search text is required"
+        )
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    
+    cursor = None
+    if after:
+        try:
+            cursor = decode_cursor(after)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        if cursor[0] not in fields or not ObjectId.is_valid(cursor[2]):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid cursor"
+            )
+        # Fields before the cursor's were already paged through
+        fields = fields[fields.index(cursor[0]):]
+    
+    students = []
+    next_cursor = None
+    for position, searched in enumerate(fields):
+        # An anchored regex on the stored key is a range scan of its index
+        order = SEARCH_ORDERS[searched]
+        key = order[0][0]
+        query = {key: {"$regex": prefix_regex(prefixes[searched])}}
+        if cursor and cursor[0] == searched:
+            # Resume right after the last row instead of skipping over the earlier pages
+            last_value, last_id = cursor[1], ObjectId(cursor[2])
+            query[key]["$gte"] = last_value
+            query["$or"] = [{key: {"$gt": last_value}}, {"_id": {"$gt": last_id}}]
+        if searched == "email" and combined:
+            # Listed among the name matches already
+            query["name_normalized"] = {"$not": re.compile(prefix_regex(prefixes["name"]))}
+        remaining = limit - len(students)
+        rows = list(
+            students_collection.find(query, {"name": 1, "email": 1, "name_normalized": 1, "email_normalized": 1, "created_at": 1})
+            .sort(order)
+            .limit(remaining + 1)
+        )
+        students.extend(rows[:remaining])
+        if len(rows) > remaining or (len(students) == limit and position < len(fields) - 1):
+            # Resume in this field; once it runs out the next page moves on to the next one
+            last = students[-1]
+            next_cursor = encode_cursor(searched, last.get(key, ""), str(last["_id"]))
+            break
+    
+    for student in students:
+        student.pop("name_normalized", None)
+        student.pop("email_normalized", None)
+        student["_id"] = str(student["_id"])
+        student["id"] = str(student["_id"])
+    
+    return {
+        "students": students,
+        "field": "any" if combined else fields[0],
+        "next": next_cursor
+    }
+
 @router.get("/students/{student_id}")
 def get_student_details(
     student_id: str,
@@ -139,7 +330,6 @@ def get_student_details(
             detail="Admin access required"
         )
     
-    from bson import ObjectId
     if not ObjectId.is_valid(student_id):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, status, Header
+from fastapi import APIRouter, HTTPException, status, Header, BackgroundTasks
 import bcrypt
+import os
 from datetime import datetime
 from bson import ObjectId
 from app.models.schemas import (
@@ -10,10 +11,32 @@ from app.models.schemas import (
     TokenResponse
 )
 from app.utils.jwt_handler import create_access_token, verify_token, get_token_from_header
-from app.utils.database import students_collection
+from app.utils.database import students_collection, students_durable
+from app.utils.cache_bus import cache_bus
+from app.utils.http_client import get_http_client
+from app.utils.names import normalize_name, normalize_email
+from app.utils.metrics import PASSWORD_HASHES_IN_PROGRESS
 
 router = APIRouter(prefix="/students", tags=["Students"])
 
+ENROLLMENT_SERVICE_URL = os.getenv("ENROLLMENT_SERVICE_URL", "http://localhost:8002")
+
+# Other services look students up by id on every enrollment; invalidated by the change stream
+students_cache = cache_bus.cache("students", maxsize=4096)
+cache_bus.invalidate_on("students", students_cache)
+
+async def propagate_student_snapshot(student_id: str, authorization: str):
+    """Have the enrollment service refresh the name and email copied onto the student's enrollments"""
+    try:
+        response = await get_http_client().put(
+            f"{ENROLLMENT_SERVICE_URL}/enrollments/snapshots/student/{student_id}",
+            headers={"Authorization": authorization}
+        )
+        response.raise_for_status()
+    except Exception as e:
+        # Rosters show the old values until the next profile update or a backfill
+        print(f"⚠️  Could not propagate student {student_id} changes: {e}")
+
 # ========== AUTHENTICATION ==========
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
@@ -37,17 +60,20 @@ def register_student(student: StudentRegister):
     # Hash password using bcrypt directly
     password_bytes = password.encode('utf-8')
     salt = bcrypt.gensalt()
-    hashed_password = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
+    with PASSWORD_HASHES_IN_PROGRESS.track_inprogress():
+        hashed_password = bcrypt.hashpw(password_bytes, salt).decode('utf-8')
     
     student_doc = {
         "name": student.name,
+        "name_normalized": normalize_name(student.name),
         "email": student.email,
+        "email_normalized": normalize_email(student.email),
         "password": hashed_password,
         "created_at": datetime.utcnow().isoformat(),
         "updated_at": datetime.utcnow().isoformat()
     }
     
-    result = students_collection.insert_one(student_doc)
+    result = students_durable.insert_one(student_doc)
     
     return {
         "message": "Student registered successfully",
@@ -69,7 +95,9 @@ def login_student(credentials: StudentLogin):
     password_bytes = credentials.password.encode('utf-8')
     stored_password = student["password"].encode('utf-8')
     
-    if not bcrypt.checkpw(password_bytes, stored_password):
+    with PASSWORD_HASHES_IN_PROGRESS.track_inprogress():
+        password_matches = bcrypt.checkpw(password_bytes, stored_password)
+    if not password_matches:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -125,6 +153,7 @@ def get_student_profile(authorization: str = Header(...)):
 @router.put("/me")
 def update_student_profile(
     update_data: StudentUpdate,
+    background_tasks: BackgroundTasks,
     authorization: str = Header(...)
 ):
     """Update current student profile"""
@@ -135,6 +164,7 @@ def update_student_profile(
     update_fields = {}
     if update_data.name:
         update_fields["name"] = update_data.name
+        update_fields["name_normalized"] = normalize_name(update_data.name)
     if update_data.email:
         # Check if new email is already taken
         existing = students_collection.find_one({
@@ -147,6 +177,7 @@ def update_student_profile(
                 detail="Email already in use"
             )
         update_fields["email"] = update_data.email
+        update_fields["email_normalized"] = normalize_email(update_data.email)
     
     if not update_fields:
         raise HTTPException(
@@ -157,7 +188,7 @@ def update_student_profile(
     update_fields["updated_at"] = datetime.utcnow().isoformat()
     
     # Update student
-    result = students_collection.update_one(
+    result = students_durable.update_one(
         {"_id": ObjectId(decoded["id"])},
         {"$set": update_fields}
     )
@@ -168,6 +199,10 @@ def update_student_profile(
             detail="Student not found"
         )
     
+    # Enrollments store the name and email for rosters; the enrollment service rereads them after we respond
+    if "name" in update_fields or "email" in update_fields:
+        background_tasks.add_task(propagate_student_snapshot, decoded["id"], authorization)
+    
     return {"message": "Profile updated successfully"}
 
 # ========== INTERNAL SERVICE ENDPOINTS ==========
@@ -181,10 +216,15 @@ def get_student_by_id(student_id: str):
             detail="Invalid student ID format"
         )
     
-    student = students_collection.find_one(
-        {"_id": ObjectId(student_id)},
-        {"password": 0}
-    )
+    student = students_cache.get(student_id)
+    if student is None:
+        generation = students_cache.generation()
+        student = students_collection.find_one(
+            {"_id": ObjectId(student_id)},
+            {"password": 0}
+        )
+        if student:
+            students_cache.set(student_id, student, generation)
     
     if not student:
         raise HTTPException(
@@ -221,7 +261,7 @@ def delete_student(
             detail="Invalid student ID format"
         )
     
-    result = students_collection.delete_one({"_id": ObjectId(student_id)})
+    result = students_durable.delete_one({"_id": ObjectId(student_id)})
     
     if result.deleted_count == 0:
         raise HTTPException(
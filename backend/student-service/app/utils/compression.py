@@ -0,0 +1,109 @@
+import gzip
+import os
+
+try:
+    import brotli
+except ImportError:  # gzip only; clients asking for br get gzip instead
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() in ("1", "true", "yes")
+# Below this many bytes the headers and CPU cost more than compression saves
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+# Higher levels shrink JSON a little more for a lot more CPU; these defaults sit at the knee
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+COMPRESSIBLE_TYPES = (b"application/json", b"text/")
+
+def supported_encodings() -> list:
+    """Encodings this process can produce, preferred first"""
+    return ["br", "gzip"] if brotli else ["gzip"]
+
+def choose_encoding(accept_encoding: str):
+    """The preferred encoding the client accepts, or None"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        params = params.replace(" ", "")
+        try:
+            weight = float(params[2:]) if params.startswith("q=") else 1.0
+        except ValueError:
+            weight = 0.0
+        weights[name.strip().lower()] = weight
+    for encoding in supported_encodings():
+        # An encoding named explicitly, even with q=0, overrides the wildcard
+        if weights.get(encoding, weights.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    # mtime=0 keeps identical bodies byte-identical, which proxies and ETags like
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+def should_compress(start: dict, body: bytes) -> bool:
+    if len(body) < COMPRESSION_MIN_SIZE:
+        return False
+    headers = {name.lower(): value for name, value in start["headers"]}
+    if b"content-encoding" in headers:
+        return False
+    return headers.get(b"content-type", b"").startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    """
+    Compresses complete JSON and text responses of at least COMPRESSION_MIN_SIZE
+    bytes with brotli or gzip, whichever the client prefers that we can produce.
+    Streamed responses pass through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = dict(scope["headers"]).get(b"accept-encoding", b"").decode("latin-1")
+        encoding = choose_encoding(accept_encoding)
+        if not encoding:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                # Held until the body shows whether it is worth compressing
+                start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or not should_compress(start, body):
+                # Streaming or not worth it: release what was held and stop interfering
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            compressed = compress(body, encoding)
+            headers = [
+                (name, value) for name, value in start["headers"]
+                if name.lower() not in (b"content-length", b"vary")
+            ]
+            vary = [value for name, value in start["headers"] if name.lower() == b"vary"]
+            headers += [
+                (b"content-encoding", encoding.encode("ascii")),
+                (b"content-length", str(len(compressed)).encode("ascii")),
+                (b"vary", b", ".join(vary + [b"Accept-Encoding"])),
+            ]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": compressed})
+
+        await self.app(scope, receive, send_compressed)
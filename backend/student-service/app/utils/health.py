@@ -0,0 +1,66 @@
+import asyncio
+import os
+import time
+import pymongo
+from fastapi.concurrency import run_in_threadpool
+
+from app.utils.database import client
+from app.utils.cache_bus import cache_bus
+
+# How long a readiness result is reused before dependencies are pinged again
+READY_CACHE_SECONDS = float(os.getenv("READY_CACHE_SECONDS", "2"))
+PING_TIMEOUT_SECONDS = float(os.getenv("READY_PING_TIMEOUT_SECONDS", "1"))
+
+_warmed_up = False
+_warm_up_lock = asyncio.Lock()
+_cached_result = None
+_cached_at = 0.0
+
+def ping_mongo():
+    """Round-trip a ping to MongoDB within the readiness timeout"""
+    with pymongo.timeout(PING_TIMEOUT_SECONDS):
+        client.admin.command("ping")
+
+async def timed_check(check) -> dict:
+    started = time.perf_counter()
+    try:
+        await check()
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {str(e)[:200]}"
+    result = {"ok": ok, "latency_ms": round((time.perf_counter() - started) * 1000, 1)}
+    if error:
+        result["error"] = error
+    return result
+
+async def check_mongo():
+    await run_in_threadpool(ping_mongo)
+
+async def run_checks() -> dict:
+    return {"mongodb": await timed_check(check_mongo)}
+
+async def warm_up() -> dict:
+    """Run the first checks, which opens the first Mongo connection so real requests don't pay for it"""
+    global _warmed_up
+    async with _warm_up_lock:
+        checks = await run_checks()
+        _warmed_up = _warmed_up or checks["mongodb"]["ok"]
+        return checks
+
+async def check_readiness() -> tuple:
+    """Return (ready, report), pinging dependencies at most once per cache window"""
+    global _cached_result, _cached_at
+    if _cached_result and time.monotonic() - _cached_at < READY_CACHE_SECONDS:
+        return _cached_result
+
+    checks = await (run_checks() if _warmed_up else warm_up())
+    ready = checks["mongodb"]["ok"]
+
+    _cached_result = (ready, {
+        "status": "ready" if ready else "not ready",
+        "checks": checks,
+        # Informational: caches fall back to a short TTL without a change stream
+        "cache_bus": cache_bus.status()
+    })
+    _cached_at = time.monotonic()
+    return _cached_result
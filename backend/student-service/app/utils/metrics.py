@@ -0,0 +1,209 @@
+import os
+import threading
+import time
+import httpx
+from prometheus_client import (
+    Counter, Gauge, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest, disable_created_metrics, multiprocess
+)
+from pymongo import monitoring
+
+# Drop the *_created series; they double the scrape size and nothing reads them
+disable_created_metrics()
+
+# Probe and scrape traffic would otherwise dominate the request histograms
+UNTRACKED_PATHS = {"/metrics", "/live", "/ready", "/health"}
+
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Request latency by route template",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled",
+    # Under gunicorn each worker writes its own value; report the sum over live workers
+    multiprocess_mode="livesum"
+)
+# bcrypt is the dominant cost in this service; hashes outnumbering CPUs means logins are queueing
+PASSWORD_HASHES_IN_PROGRESS = Gauge(
+    "password_hashes_in_progress",
+    "Logins and registrations currently waiting on or running bcrypt",
+    multiprocess_mode="livesum"
+)
+REQUESTS_REJECTED = Counter(
+    "http_requests_rejected_total",
+    "Requests turned away before reaching a handler",
+    ["reason"]
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command latency by collection and command",
+    ["collection", "command"],
+    buckets=MONGO_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error",
+    ["collection", "command"]
+)
+MONGO_POOL_CHECKOUT_WAIT = Histogram(
+    "mongodb_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection, including opening a new one",
+    buckets=MONGO_BUCKETS
+)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Connection checkouts that failed, e.g. timing out in the wait queue",
+    ["reason"]
+)
+MONGO_POOL_IN_USE = Gauge(
+    "mongodb_pool_connections_in_use",
+    "Pooled connections currently checked out",
+    multiprocess_mode="livesum"
+)
+MONGO_POOL_OPEN = Gauge(
+    "mongodb_pool_connections_open",
+    "Connections open to MongoDB, idle or in use",
+    multiprocess_mode="livesum"
+)
+UPSTREAM_LATENCY = Histogram(
+    "http_upstream_duration_seconds",
+    "Latency of calls to other services, until response headers arrive",
+    ["upstream", "method", "status"]
+)
+
+def render_metrics() -> tuple:
+    """Return (body, content type) for the /metrics endpoint"""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        # Several gunicorn workers: merge what every worker has written, not just this one's counts
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so timing adds no extra task or body buffering per request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in UNTRACKED_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            # The router stores the matched route on the scope; using its template keeps label cardinality bounded
+            route = scope.get("route")
+            REQUEST_LATENCY.labels(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                str(status_code)
+            ).observe(time.perf_counter() - started)
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every command the driver sends, keyed by the collection it targets"""
+
+    def __init__(self):
+        self._collections = {}
+
+    def started(self, event):
+        # getMore carries a cursor id under its own name and the collection separately
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        target = event.command.get(key)
+        self._collections[(event.connection_id, event.request_id)] = (
+            target if isinstance(target, str) else event.database_name
+        )
+
+    def succeeded(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), event.database_name)
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        collection = self._collections.pop((event.connection_id, event.request_id), event.database_name)
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(event.duration_micros / 1e6)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+class MongoPoolMetrics(monitoring.ConnectionPoolListener):
+    """Pool occupancy and checkout wait from the driver's connection monitoring (CMAP) events"""
+
+    def __init__(self):
+        # Checkout starts and finishes on the calling thread, so the thread identifies it
+        self._started = {}
+
+    def connection_check_out_started(self, event):
+        self._started[(event.address, threading.get_ident())] = time.perf_counter()
+
+    def connection_checked_out(self, event):
+        started = self._started.pop((event.address, threading.get_ident()), None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+        MONGO_POOL_IN_USE.inc()
+
+    def connection_check_out_failed(self, event):
+        started = self._started.pop((event.address, threading.get_ident()), None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+        MONGO_POOL_CHECKOUT_FAILURES.labels(str(event.reason)).inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_IN_USE.dec()
+
+    def connection_created(self, event):
+        MONGO_POOL_OPEN.inc()
+
+    def connection_closed(self, event):
+        MONGO_POOL_OPEN.dec()
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps the real transport to time each upstream call, including failed connections"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        started = time.perf_counter()
+        status_code = "error"
+        try:
+            response = await self._transport.handle_async_request(request)
+            status_code = str(response.status_code)
+            return response
+        finally:
+            UPSTREAM_LATENCY.labels(
+                request.url.host,
+                request.method,
+                status_code
+            ).observe(time.perf_counter() - started)
+
+    async def aclose(self):
+        await self._transport.aclose()
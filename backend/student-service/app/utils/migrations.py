@@ -0,0 +1,146 @@
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from datetime import datetime, timedelta
+
+from app.utils.database import db, students_collection, students_relaxed, admins_collection
+from app.utils.rate_limit import rate_limits_collection
+from app.utils.names import normalize_name, normalize_email
+
+SERVICE_NAME = "student-service"
+LOCK_TIMEOUT_MINUTES = 10
+BACKFILL_BATCH_SIZE = 1000
+
+# Shared by every service; each record is keyed by "<service>:<version>"
+migrations_collection = db["schema_migrations"]
+
+# MongoDB error codes for indexes that are missing or already defined differently
+INDEX_NOT_FOUND = 27
+INDEX_CONFLICT_CODES = (85, 86)
+
+def drop_index_if_exists(collection, name: str):
+    """Drop an index by name, ignoring indexes that don't exist"""
+    try:
+        collection.drop_index(name)
+        print(f"✓ Dropped index: {collection.name}.{name}")
+    except OperationFailure as e:
+        if e.code != INDEX_NOT_FOUND and "index not found" not in str(e).lower():
+            raise
+
+def create_index(collection, keys, **kwargs):
+    """Create an index, tolerating an equivalent index under another name"""
+    try:
+        name = collection.create_index(keys, **kwargs)
+        print(f"✓ Ensured index: {collection.name}.{name}")
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            raise
+        print(f"⚠️  Skipped conflicting index on {collection.name}: {e}")
+
+# ========== MIGRATIONS ==========
+
+def create_email_indexes():
+    create_index(students_collection, "email", unique=True)
+    create_index(admins_collection, "email", unique=True)
+
+def backfill_name_search():
+    updated = 0
+    operations = []
+    for student in students_collection.find({"name_normalized": {"$exists": False}}, {"name": 1}):
+        operations.append(UpdateOne(
+            {"_id": student["_id"]},
+            {"$set": {"name_normalized": normalize_name(student.get("name", ""))}}
+        ))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            updated += students_relaxed.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += students_relaxed.bulk_write(operations, ordered=False).modified_count
+    print(f"✓ Normalized {updated} student names")
+    # Prefix search on names pages by (name, _id) without a sort stage
+    create_index(students_collection, [("name_normalized", 1), ("_id", 1)])
+
+def create_rate_limit_ttl_index():
+    # Buckets are shared by all services (keys are per route), so each one ensures this
+    create_index(rate_limits_collection, "expires_at", expireAfterSeconds=0)
+
+def backfill_email_search():
+    updated = 0
+    operations = []
+    for student in students_collection.find({"email_normalized": {"$exists": False}}, {"email": 1}):
+        operations.append(UpdateOne(
+            {"_id": student["_id"]},
+            {"$set": {"email_normalized": normalize_email(student.get("email", ""))}}
+        ))
+        if len(operations) >= BACKFILL_BATCH_SIZE:
+            updated += students_relaxed.bulk_write(operations, ordered=False).modified_count
+            operations = []
+    if operations:
+        updated += students_relaxed.bulk_write(operations, ordered=False).modified_count
+    print(f"✓ Normalized {updated} student emails")
+    # Stored emails keep the case they were typed in, so prefix search runs on a lowercased copy
+    create_index(students_collection, [("email_normalized", 1), ("_id", 1)])
+
+# Append new migrations with the next version number; never renumber applied ones
+MIGRATIONS = [
+    (1, "Create unique email indexes for students and admins", create_email_indexes),
+    (2, "Backfill normalized names and index them for admin search", backfill_name_search),
+    (3, "Expire shared rate-limit buckets", create_rate_limit_ttl_index),
+    (4, "Backfill lowercased emails and index them for admin search", backfill_email_search),
+]
+
+# ========== RUNNER ==========
+
+def get_applied_versions() -> set:
+    """Return the migration versions already recorded for this service"""
+    records = migrations_collection.find(
+        {"service": SERVICE_NAME, "version": {"$exists": True}},
+        {"version": 1}
+    )
+    return {record["version"] for record in records}
+
+def get_pending_migrations() -> list:
+    applied = get_applied_versions()
+    return [m for m in MIGRATIONS if m[0] not in applied]
+
+def acquire_lock() -> bool:
+    """Take the per-service migration lock, breaking it if it has gone stale"""
+    lock_id = f"{SERVICE_NAME}:lock"
+    now = datetime.utcnow()
+    migrations_collection.delete_one({
+        "_id": lock_id,
+        "locked_at": {"$lt": now - timedelta(minutes=LOCK_TIMEOUT_MINUTES)}
+    })
+    try:
+        migrations_collection.insert_one({
+            "_id": lock_id,
+            "service": SERVICE_NAME,
+            "locked_at": now
+        })
+        return True
+    except DuplicateKeyError:
+        return False
+
+def release_lock():
+    migrations_collection.delete_one({"_id": f"{SERVICE_NAME}:lock"})
+
+def run_migrations() -> int:
+    """Apply pending migrations in version order and record each one"""
+    if not acquire_lock():
+        raise RuntimeError(f"Migrations for {SERVICE_NAME} are already running")
+
+    try:
+        applied_count = 0
+        for version, description, migrate in get_pending_migrations():
+            print(f"→ Applying {SERVICE_NAME} migration {version}: {description}")
+            migrate()
+            migrations_collection.insert_one({
+                "_id": f"{SERVICE_NAME}:{version}",
+                "service": SERVICE_NAME,
+                "version": version,
+                "description": description,
+                "applied_at": datetime.utcnow().isoformat()
+            })
+            applied_count += 1
+        return applied_count
+    finally:
+        release_lock()
@@ -0,0 +1,33 @@
+import base64
+import json
+import re
+import unicodedata
+
+def normalize_name(name: str) -> str:
+    """Lowercase, accent-free, single-spaced name stored for prefix search"""
+    decomposed = unicodedata.normalize("NFKD", name)
+    stripped = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return " ".join(stripped.casefold().split())
+
+def normalize_email(email: str) -> str:
+    """Lowercased email stored for prefix search; the email itself keeps the case it was typed in"""
+    return email.strip().lower()
+
+def prefix_regex(prefix: str) -> str:
+    """An anchored, case-sensitive pattern, which MongoDB turns into an index range scan"""
+    return "^" + re.escape(prefix)
+
+def encode_cursor(field: str, value: str, document_id: str) -> str:
+    """Opaque keyset cursor: the field searched, and the sort key and _id of the last row returned"""
+    raw = json.dumps([field, value, document_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+def decode_cursor(cursor: str) -> tuple:
+    """Inverse of encode_cursor; raises ValueError for anything it didn't produce"""
+    try:
+        parts = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except Exception:
+        raise ValueError("Invalid cursor")
+    if not isinstance(parts, list) or len(parts) != 3 or not all(isinstance(part, str) for part in parts):
+        raise ValueError("Invalid cursor")
+    return tuple(parts)
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.database import db
+from app.utils.metrics import REQUESTS_REJECTED
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() in ("1", "true", "yes")
+# "memory" keeps buckets per process; "mongo" shares them between replicas
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+# Behind an ingress or load balancer every request comes from the proxy; trust its X-Forwarded-For
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() in ("1", "true", "yes")
+# Proxies in front of the service that each append to X-Forwarded-For; entries left of theirs are client-supplied
+RATE_LIMIT_TRUSTED_HOPS = max(1, int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "1")))
+
+# Requests handled at once; more wait up to ADMISSION_TIMEOUT_SECONDS in a queue of MAX_QUEUED_REQUESTS
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "100"))
+MAX_QUEUED_REQUESTS = int(os.getenv("MAX_QUEUED_REQUESTS", "50"))
+ADMISSION_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_TIMEOUT_SECONDS", "2"))
+
+# Probes and scrapes must keep working while the service sheds load
+EXEMPT_PATHS = {"/metrics", "/live", "/ready", "/health"}
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600}
+
+# Shared buckets; expired documents are removed by a TTL index on expires_at
+rate_limits_collection = db["rate_limits"]
+
+def parse_rate(value: str) -> tuple:
+    """'5/minute' -> (5 requests, 60 seconds)"""
+    count, period = value.split("/")
+    return int(count), PERIODS[period.strip().lower()]
+
+class RateRule:
+    """A token bucket per client for requests whose method and path match"""
+
+    def __init__(self, name: str, method: str, path: str, env_var: str, default: str):
+        self.name = name
+        self.method = method
+        self.path = re.compile(path)
+        count, seconds = parse_rate(os.getenv(env_var, default))
+        # A client may burst the whole allowance at once, then refills at count per period
+        self.burst = count
+        self.rate = count / seconds
+
+    def matches(self, method: str, path: str) -> bool:
+        return method == self.method and self.path.fullmatch(path) is not None
+
+class MemoryBuckets:
+    """Buckets in this process; the least recently seen clients are evicted past maxsize"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, rule: RateRule) -> float:
+        """Spend one token; returns 0 if allowed, else seconds until a token is available"""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (rule.burst, now))
+        tokens = min(rule.burst, tokens + (now - updated) * rule.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.maxsize:
+            self._buckets.popitem(last=False)
+        return 0.0 if allowed else (1 - tokens) / rule.rate
+
+class MongoBuckets:
+    """Buckets shared by every replica, refilled and spent in one atomic update"""
+
+    def __init__(self, collection):
+        self.collection = collection
+        self._failure_logged = False
+
+    async def take(self, key: str, rule: RateRule) -> float:
+        try:
+            bucket = await run_in_threadpool(self._take, key, rule)
+        except PyMongoError as e:
+            # Failing open: a limiter outage shouldn't become a service outage
+            if not self._failure_logged:
+                print(f"⚠️  Rate limit store unavailable, allowing requests: {str(e)[:200]}")
+                self._failure_logged = True
+            return 0.0
+        self._failure_logged = False
+        return 0.0 if bucket["allowed"] else (1 - bucket["tokens"]) / rule.rate
+
+    def _take(self, key: str, rule: RateRule) -> dict:
+        now = datetime.utcnow()
+        elapsed = {"$divide": [{"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}, 1000]}
+        refilled = {"$min": [rule.burst, {"$add": [{"$ifNull": ["$tokens", rule.burst]}, {"$multiply": [elapsed, rule.rate]}]}]}
+        return self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"tokens": refilled, "updated_at": now}},
+                {"$set": {
+                    "allowed": {"$gte": ["$tokens", 1]},
+                    "tokens": {"$cond": [{"$gte": ["$tokens", 1]}, {"$subtract": ["$tokens", 1]}, "$tokens"]},
+                    # A full bucket holds no state worth keeping
+                    "expires_at": now + timedelta(seconds=rule.burst / rule.rate)
+                }}
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+def client_address(scope) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        # The client can send any X-Forwarded-For it likes; only the entries our proxies appended can be trusted
+        forwarded = [
+            address.strip()
+            for name, value in scope["headers"] if name == b"x-forwarded-for"
+            for address in value.decode("latin-1").split(",") if address.strip()
+        ]
+        if forwarded:
+            return forwarded[-min(RATE_LIMIT_TRUSTED_HOPS, len(forwarded))]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+async def reject(send, status_code: int, detail: str, retry_after: float):
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+            (b"retry-after", str(max(1, round(retry_after))).encode("ascii")),
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
+
+class AdmissionMiddleware:
+    """
+    Per-client token buckets for the routes in rules, then a cap on requests in
+    progress. Excess traffic gets a fast 429 or 503 with Retry-After instead of
+    queueing until every caller times out.
+    """
+
+    def __init__(self, app, rules: list):
+        self.app = app
+        self.rules = rules if RATE_LIMIT_ENABLED else []
+        self.buckets = MongoBuckets(rate_limits_collection) if RATE_LIMIT_BACKEND == "mongo" else MemoryBuckets()
+        self.slots = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS) if MAX_CONCURRENT_REQUESTS > 0 else None
+        self.queued = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        for rule in self.rules:
+            if rule.matches(scope["method"], scope["path"]):
+                retry_after = await self.buckets.take(f"{rule.name}:{client_address(scope)}", rule)
+                if retry_after:
+                    REQUESTS_REJECTED.labels("rate_limited").inc()
+                    await reject(send, 429, "Too many requests, please slow down", retry_after)
+                    return
+                break
+
+        if self.slots is None:
+            await self.app(scope, receive, send)
+            return
+
+        if self.slots.locked():
+            if self.queued >= MAX_QUEUED_REQUESTS:
+                REQUESTS_REJECTED.labels("overloaded").inc()
+                await reject(send, 503, "Service is busy, please retry shortly", 1)
+                return
+            self.queued += 1
+            try:
+                await asyncio.wait_for(self.slots.acquire(), ADMISSION_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                REQUESTS_REJECTED.labels("overloaded").inc()
+                await reject(send, 503, "Service is busy, please retry shortly", 1)
+                return
+            finally:
+                self.queued -= 1
+        else:
+            await self.slots.acquire()
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.slots.release()
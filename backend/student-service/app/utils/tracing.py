@@ -0,0 +1,130 @@
+import os
+import httpx
+from opentelemetry import propagate, trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from pymongo import monitoring
+
+SERVICE_NAME = "student-service"
+
+# Probes and scrapes would only add noise to traces
+EXCLUDED_PATHS = ("/metrics", "/live", "/ready", "/health")
+EXCLUDED_URLS = ",".join(EXCLUDED_PATHS)
+
+tracer = trace.get_tracer(SERVICE_NAME)
+
+def get_exporter_name() -> str:
+    """TRACING_EXPORTER: "none" (default), "otlp" (OTEL_EXPORTER_OTLP_ENDPOINT, e.g. a
+    local collector), "file" (JSON lines in TRACING_FILE) or "console"
+    """
+    return os.getenv("TRACING_EXPORTER", "none").lower()
+
+def tracing_enabled() -> bool:
+    return get_exporter_name() != "none"
+
+def build_exporter():
+    exporter_name = get_exporter_name()
+
+    # The SDK is imported lazily so services with tracing off don't pay for it at startup
+    from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+    if exporter_name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    if exporter_name == "file":
+        return ConsoleSpanExporter(
+            out=open(os.getenv("TRACING_FILE", "traces.jsonl"), "a"),
+            formatter=lambda span: span.to_json(indent=None) + "\n"
+        )
+    if exporter_name == "console":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown TRACING_EXPORTER: {exporter_name}")
+
+def setup_tracing(app):
+    """Install the tracer provider and server spans for the app; a no-op when tracing is off"""
+    if not tracing_enabled():
+        return
+
+    from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+    provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+    provider.add_span_processor(BatchSpanProcessor(build_exporter()))
+    trace.set_tracer_provider(provider)
+
+    # Extracts incoming traceparent headers so spans join the caller's trace
+    FastAPIInstrumentor.instrument_app(app, excluded_urls=EXCLUDED_URLS)
+
+def shutdown_tracing():
+    """Flush buffered spans before the process exits"""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+def mongo_listeners() -> list:
+    return [MongoCommandTracer()] if tracing_enabled() else []
+
+class MongoCommandTracer(monitoring.CommandListener):
+    """Opens a client span per MongoDB command under the current request span"""
+
+    def __init__(self):
+        self._spans = {}
+
+    def started(self, event):
+        key = "collection" if event.command_name == "getMore" else event.command_name
+        target = event.command.get(key)
+        collection = target if isinstance(target, str) else None
+        span = tracer.start_span(
+            f"mongodb.{event.command_name} {collection or event.database_name}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "db.system": "mongodb",
+                "db.name": event.database_name,
+                "db.operation": event.command_name,
+                "db.mongodb.collection": collection or "",
+                "net.peer.name": str(event.connection_id[0]),
+                "net.peer.port": event.connection_id[1],
+            }
+        )
+        self._spans[(event.connection_id, event.request_id)] = span
+
+    def succeeded(self, event):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span:
+            span.end()
+
+    def failed(self, event):
+        span = self._spans.pop((event.connection_id, event.request_id), None)
+        if span:
+            span.set_status(Status(StatusCode.ERROR, str(event.failure.get("errmsg", ""))))
+            span.end()
+
+class TracingTransport(httpx.AsyncBaseTransport):
+    """Opens a client span per upstream call and injects traceparent so the callee joins the trace"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request):
+        if request.url.path in EXCLUDED_PATHS:
+            return await self._transport.handle_async_request(request)
+
+        with tracer.start_as_current_span(
+            f"{request.method} {request.url.host}",
+            kind=SpanKind.CLIENT,
+            attributes={
+                "http.method": request.method,
+                "http.url": str(request.url),
+                "net.peer.name": request.url.host,
+            }
+        ) as span:
+            propagate.inject(request.headers)
+            response = await self._transport.handle_async_request(request)
+            span.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                span.set_status(Status(StatusCode.ERROR))
+            return response
+
+    async def aclose(self):
+        await self._transport.aclose()
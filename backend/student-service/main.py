@@ -1,13 +1,44 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, Response
 from app.routes import students, admin
+from app.utils.health import warm_up, check_readiness
+from app.utils.metrics import MetricsMiddleware, render_metrics
+from app.utils.compression import CompressionMiddleware
+from app.utils.rate_limit import AdmissionMiddleware, RateRule
+from app.utils.tracing import setup_tracing, shutdown_tracing
+from app.utils.cache_bus import cache_bus
+from app.utils.http_client import close_http_client
+
+# bcrypt makes every login and registration cost tens of milliseconds of CPU
+RATE_RULES = [
+    RateRule("login", "POST", r"/(students|admin)/login", "RATE_LIMIT_LOGIN", "10/minute"),
+    RateRule("register", "POST", r"/students/register", "RATE_LIMIT_REGISTER", "20/hour"),
+]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm connections in the background; /ready reports once this has succeeded
+    warm_up_task = asyncio.create_task(warm_up())
+    cache_bus.start()
+    yield
+    warm_up_task.cancel()
+    cache_bus.stop()
+    await close_http_client()
+    shutdown_tracing()
 
 app = FastAPI(
     title="Student Service",
     description="Handles student and admin authentication and management",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+# Inside CORS so rejections still carry the headers browsers need to read them
+app.add_middleware(AdmissionMiddleware, rules=RATE_RULES)
+
 # Configure CORS - Allow all origins in development
 app.add_middleware(
     CORSMiddleware,
@@ -18,6 +49,14 @@ app.add_middleware(
     expose_headers=["*"]
 )
 
+# Outside CORS and profiling so their headers and bodies are final when it compresses
+app.add_middleware(CompressionMiddleware)
+
+# Added last so it wraps everything, including CORS preflights
+app.add_middleware(MetricsMiddleware)
+
+setup_tracing(app)
+
 app.include_router(students.router)
 app.include_router(admin.router)
 
@@ -29,6 +68,24 @@ def root():
         "version": "1.0.0"
     }
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint"""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+@app.get("/live")
+def liveness_check():
+    """Process is up and serving; never touches dependencies"""
+    return {"status": "alive"}
+
+@app.get("/ready")
+async def readiness_check():
+    """Dependencies are reachable and connection pools are warm"""
+    ready, report = await check_readiness()
+    return JSONResponse(status_code=200 if ready else 503, content=report)
+
 @app.get("/health")
 def health_check():
+    """Kept for existing callers; equivalent to /live"""
     return {"status": "healthy"}
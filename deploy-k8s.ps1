@@ -1,5 +1,10 @@
 # Deploy Student Portal to Kubernetes
 # Run this from the student-portal root directory
+#   -ReplicaSet  run MongoDB as a three-member replica set and read from its secondaries
+
+param(
+    [switch]$ReplicaSet
+)
 
 Write-Host "Deploying Student Portal to Kubernetes..." -ForegroundColor Green
 
@@ -33,30 +38,65 @@ kubectl apply -f k8s/02-secret.yaml
 
 Write-Host ""
 Write-Host "Step 4: Deploying MongoDB..." -ForegroundColor Cyan
-kubectl apply -f k8s/03-mongodb.yaml
+if ($ReplicaSet) {
+    kubectl apply -f k8s/03-mongodb-replicaset.yaml
+} else {
+    kubectl apply -f k8s/03-mongodb.yaml
+}
 
 Write-Host ""
 Write-Host "Waiting for MongoDB to be ready (this may take 1-2 minutes)..." -ForegroundColor Yellow
 kubectl wait --for=condition=ready pod -l app=mongodb -n student-portal --timeout=300s
 
+if ($ReplicaSet) {
+    Write-Host "Waiting for the replica set to elect a primary..." -ForegroundColor Yellow
+    kubectl wait --for=condition=complete job/mongodb-rs-init -n student-portal --timeout=300s
+    # Every member in the seed list, so clients still connect while one is down
+    $mongoUri = "mongodb://mongodb-0.mongodb:27017,mongodb-1.mongodb:27017,mongodb-2.mongodb:27017/?replicaSet=rs0"
+    $patch = @{ data = @{ MONGO_URI = $mongoUri } } | ConvertTo-Json -Compress
+    kubectl patch configmap student-portal-config -n student-portal --type merge -p $patch
+}
+
 Write-Host ""
-Write-Host "Step 5: Deploying Student Service..." -ForegroundColor Cyan
+Write-Host "Step 5: Running schema migrations..." -ForegroundColor Cyan
+# Jobs have fixed names and a finished Job is never rerun, so remove the last deploy's before applying
+kubectl delete -f k8s/10-migrations-job.yaml -n student-portal --ignore-not-found --wait=true
+kubectl apply -f k8s/10-migrations-job.yaml
+
+# Services must not start against a schema their migrations haven't reached
+foreach ($service in @("student-service", "course-service", "enrollment-service")) {
+    Write-Host "Waiting for $service migrations..." -ForegroundColor Yellow
+    kubectl wait --for=condition=complete job/migrate-$service -n student-portal --timeout=600s
+    if ($LASTEXITCODE -ne 0) {
+        Write-Host "Error: $service migrations did not complete; not deploying the services" -ForegroundColor Red
+        Write-Host "  kubectl logs -n student-portal job/migrate-$service" -ForegroundColor White
+        exit 1
+    }
+}
+
+Write-Host ""
+Write-Host "Step 6: Deploying Student Service..." -ForegroundColor Cyan
 kubectl apply -f k8s/04-student-service.yaml
 
 Write-Host ""
-Write-Host "Step 6: Deploying Course Service..." -ForegroundColor Cyan
+Write-Host "Step 7: Deploying Course Service..." -ForegroundColor Cyan
 kubectl apply -f k8s/05-course-service.yaml
 
 Write-Host ""
-Write-Host "Step 7: Deploying Enrollment Service..." -ForegroundColor Cyan
+Write-Host "Step 8: Deploying Enrollment Service..." -ForegroundColor Cyan
 kubectl apply -f k8s/06-enrollment-service.yaml
 
 Write-Host ""
-Write-Host "Step 8: Deploying Frontend..." -ForegroundColor Cyan
+Write-Host "Step 9: Deploying Frontend..." -ForegroundColor Cyan
 kubectl apply -f k8s/07-frontend.yaml
 
 Write-Host ""
-Write-Host "Step 9: Creating Admin User..." -ForegroundColor Cyan
+Write-Host "Step 10: Configuring autoscaling..." -ForegroundColor Cyan
+kubectl apply -f k8s/11-hpa.yaml
+Write-Host "  Custom-metric scaling needs prometheus-adapter with k8s/12-prometheus-adapter-rules.yaml" -ForegroundColor Yellow
+
+Write-Host ""
+Write-Host "Step 11: Creating Admin User..." -ForegroundColor Cyan
 kubectl apply -f k8s/09-init-admin-job.yaml
 
 Write-Host ""
@@ -90,5 +130,7 @@ Write-Host ""
 Write-Host "Useful commands:" -ForegroundColor Yellow
 Write-Host "  View pods:        kubectl get pods -n student-portal" -ForegroundColor White
 Write-Host "  View services:    kubectl get svc -n student-portal" -ForegroundColor White
+Write-Host "  View autoscaling: kubectl get hpa -n student-portal" -ForegroundColor White
 Write-Host "  View logs:        kubectl logs -n student-portal <pod-name>" -ForegroundColor White
-Write-Host "  Check admin job:  kubectl logs -n student-portal job/init-admin" -ForegroundColor White
\ No newline at end of file
+Write-Host "  Check admin job:  kubectl logs -n student-portal job/init-admin" -ForegroundColor White
+Write-Host "  Check migrations: kubectl logs -n student-portal job/migrate-course-service" -ForegroundColor White
\ No newline at end of file
@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { adminService, courseService, enrollmentService } from '../../services/api';
+import { adminService } from '../../services/api';
 
 const AdminDashboard = () => {
   const [stats, setStats] = useState({
@@ -14,29 +14,30 @@ const AdminDashboard = () => {
   const [error, setError] = useState('');
   const [recentCourses, setRecentCourses] = useState([]);
   const [recentStudents, setRecentStudents] = useState([]);
+  const [generatedAt, setGeneratedAt] = useState(null);
 
   useEffect(() => {
     fetchDashboardData();
   }, []);
 
-  const fetchDashboardData = async () => {
+  const fetchDashboardData = async (refresh = false) => {
     try {
-      const [studentsRes, coursesRes, enrollmentStatsRes] = await Promise.all([
-        adminService.getAllStudents(0, 10),
-        courseService.getAllCourses(0, 10),
-        enrollmentService.getStats(),
-      ]);
+      // Totals and recent items come precomputed and cached from one endpoint
+      const response = await adminService.getSummary(refresh);
+      const { totals, recent_courses, recent_students, generated_at } = response.data;
 
       setStats({
-        totalStudents: studentsRes.data.total,
-        totalCourses: coursesRes.data.total,
-        totalEnrollments: enrollmentStatsRes.data.total,
-        activeEnrollments: enrollmentStatsRes.data.enrolled,
-        completedEnrollments: enrollmentStatsRes.data.completed,
+        totalStudents: totals.students,
+        totalCourses: totals.courses,
+        totalEnrollments: totals.enrollments,
+        activeEnrollments: totals.enrolled,
+        completedEnrollments: totals.completed,
       });
 
-      setRecentCourses(coursesRes.data.courses.slice(0, 5));
-      setRecentStudents(studentsRes.data.students.slice(0, 5));
+      setRecentCourses(recent_courses);
+      setRecentStudents(recent_students);
+      setGeneratedAt(generated_at);
+      setError('');
     } catch (err) {
       setError('Failed to load dashboard data');
     } finally {
@@ -58,6 +59,14 @@ const AdminDashboard = () => {
         <div className="mb-8">
           <h1 className="text-3xl font-bold text-gray-900">Admin Dashboard</h1>
           <p className="text-gray-600 mt-2">System overview and management</p>
+          {generatedAt && (
+            <p className="text-sm text-gray-500 mt-1">
+              Figures as of {new Date(`${generatedAt}Z`).toLocaleTimeString()}{' '}
+              <button onClick={() => fetchDashboardData(true)} className="text-blue-600 hover:underline">
+                Refresh
+              </button>
+            </p>
+          )}
         </div>
 
         {error && (
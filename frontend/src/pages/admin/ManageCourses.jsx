@@ -91,7 +91,11 @@ const ManageCourses = () => {
   const handleDelete = async (courseId, courseTitle) => {
     if (window.confirm(`Are you sure you want to delete "${courseTitle}"?`)) {
       try {
-        await courseService.deleteCourse(courseId);
+        const job = await courseService.deleteCourse(courseId);
+        if (job.status === 'failed') {
+          alert(job.error || 'Failed to delete course');
+          return;
+        }
         await fetchCourses();
       } catch (err) {
         alert(err.response?.data?.detail || 'Failed to delete course');
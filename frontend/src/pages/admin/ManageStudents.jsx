@@ -7,15 +7,26 @@ const ManageStudents = () => {
   const [studentEnrollments, setStudentEnrollments] = useState(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState('');
+  const [query, setQuery] = useState('');
+  const [nextCursor, setNextCursor] = useState(null);
 
+  // Debounced so typing sends one search, not one per keystroke
   useEffect(() => {
-    fetchStudents();
-  }, []);
+    const timer = setTimeout(() => {
+      if (query.trim()) {
+        searchStudents();
+      } else {
+        fetchStudents();
+      }
+    }, 250);
+    return () => clearTimeout(timer);
+  }, [query]);
 
   const fetchStudents = async () => {
     try {
       const response = await adminService.getAllStudents(0, 100);
       setStudents(response.data.students);
+      setNextCursor(null);
     } catch (err) {
       setError('Failed to load students');
     } finally {
@@ -23,6 +34,19 @@ const ManageStudents = () => {
     }
   };
 
+  const searchStudents = async (after) => {
+    try {
+      const response = await adminService.searchStudents(query.trim(), after);
+      setStudents(current => after ? [...current, ...response.data.students] : response.data.students);
+      setNextCursor(response.data.next);
+      setError('');
+    } catch (err) {
+      setError('Failed to search students');
+    } finally {
+      setLoading(false);
+    }
+  };
+
   const fetchStudentDetails = async (studentId) => {
     try {
       const response = await enrollmentService.getStudentEnrollments(studentId);
@@ -59,7 +83,16 @@ const ManageStudents = () => {
           {/* Students List */}
           <div className="bg-white rounded-lg shadow-md">
             <div className="p-6 border-b">
-              <h2 className="text-xl font-bold text-gray-900">All Students ({students.length})</h2>
+              <h2 className="text-xl font-bold text-gray-900">
+                {query.trim() ? `Matching Students (${students.length})` : `All Students (${students.length})`}
+              </h2>
+              <input
+                type="text"
+                value={query}
+                onChange={(e) => setQuery(e.target.value)}
+                placeholder="Search by name or email"
+                className="mt-4 w-full px-3 py-2 border border-gray-300 rounded-md"
+              />
             </div>
             {students.length > 0 ? (
               <div className="divide-y divide-gray-200 max-h-[600px] overflow-y-auto">
@@ -82,6 +115,14 @@ const ManageStudents = () => {
                     </div>
                   </div>
                 ))}
+                {nextCursor && (
+                  <button
+                    onClick={() => searchStudents(nextCursor)}
+                    className="w-full p-4 text-blue-600 hover:bg-gray-50"
+                  >
+                    Load more
+                  </button>
+                )}
               </div>
             ) : (
               <div className="p-12 text-center">
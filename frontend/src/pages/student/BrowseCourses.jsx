@@ -2,34 +2,40 @@ import { useState, useEffect } from 'react';
 import { useAuth } from '../../contexts/AuthContext';
 import { courseService, enrollmentService } from '../../services/api';
 
+const PAGE_SIZE = 30;
+
 const BrowseCourses = () => {
   const { user } = useAuth();
   const [courses, setCourses] = useState([]);
-  const [enrolledCourseIds, setEnrolledCourseIds] = useState(new Set());
+  const [total, setTotal] = useState(0);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState('');
   const [enrolling, setEnrolling] = useState(null);
+  const [filters, setFilters] = useState({ q: '', credits: '', hasSeats: false, sort: '' });
 
+  // Debounced so typing sends one search, not one per keystroke
   useEffect(() => {
-    fetchData();
-  }, []);
+    const timer = setTimeout(() => fetchCourses(), 300);
+    return () => clearTimeout(timer);
+  }, [filters]);
 
-  const fetchData = async () => {
+  // skip > 0 appends the next page to the courses already shown
+  const fetchCourses = async (skip = 0) => {
     try {
-      const [coursesRes, enrollmentsRes] = await Promise.all([
-        courseService.getAllCourses(0, 100),
-        enrollmentService.getStudentEnrollments(user.id)
-      ]);
-      
-      setCourses(coursesRes.data.courses);
-      
-      // Create a set of enrolled course IDs
-      const enrolled = new Set(
-        enrollmentsRes.data.enrollments
-          .filter(e => e.status === 'enrolled' || e.status === 'completed')
-          .map(e => e.course_id)
-      );
-      setEnrolledCourseIds(enrolled);
+      // One call returns the page, its seat counts and this student's enrollment in each course
+      const response = await courseService.getCatalog({
+        q: filters.q || undefined,
+        min_credits: filters.credits || undefined,
+        max_credits: filters.credits || undefined,
+        has_seats: filters.hasSeats || undefined,
+        sort: filters.sort || undefined,
+        skip: skip || undefined,
+        limit: PAGE_SIZE,
+      });
+      setCourses(current => skip ? [...current, ...response.data.courses] : response.data.courses);
+      setTotal(response.data.total);
+      setError('');
     } catch (err) {
       setError('Failed to load courses');
     } finally {
@@ -37,6 +43,16 @@ const BrowseCourses = () => {
     }
   };
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    await fetchCourses(courses.length);
+    setLoadingMore(false);
+  };
+
+  const updateFilter = (name, value) => {
+    setFilters(current => ({ ...current, [name]: value }));
+  };
+
   const handleEnroll = async (courseId) => {
     setEnrolling(courseId);
     try {
@@ -45,8 +61,15 @@ const BrowseCourses = () => {
         course_id: courseId,
       });
       
-      // Refresh data
-      await fetchData();
+      // Update the course in place so the pages already loaded stay on screen
+      setCourses(current => current.map(course => course.id === courseId
+        ? {
+            ...course,
+            enrollment_status: 'enrolled',
+            current_enrollments: (course.current_enrollments || 0) + 1,
+            seats_left: course.seats_left == null ? course.seats_left : Math.max(course.seats_left - 1, 0),
+          }
+        : course));
       alert('Successfully enrolled in course!');
     } catch (err) {
       alert(err.response?.data?.detail || 'Failed to enroll in course');
@@ -71,6 +94,47 @@ const BrowseCourses = () => {
           <p className="text-gray-600 mt-2">Discover and enroll in available courses</p>
         </div>
 
+        <div className="bg-white rounded-lg shadow-md p-4 mb-6 grid md:grid-cols-4 gap-4">
+          <input
+            type="text"
+            value={filters.q}
+            onChange={(e) => updateFilter('q', e.target.value)}
+            placeholder="Search by title or instructor"
+            className="md:col-span-2 px-3 py-2 border border-gray-300 rounded-md"
+          />
+          <select
+            value={filters.credits}
+            onChange={(e) => updateFilter('credits', e.target.value)}
+            className="px-3 py-2 border border-gray-300 rounded-md"
+          >
+            <option value="">Any credits</option>
+            {[1, 2, 3, 4, 5, 6].map((credits) => (
+              <option key={credits} value={credits}>{credits} credits</option>
+            ))}
+          </select>
+          <select
+            value={filters.sort}
+            onChange={(e) => updateFilter('sort', e.target.value)}
+            className="px-3 py-2 border border-gray-300 rounded-md"
+          >
+            <option value="">{filters.q ? 'Best match' : 'Newest'}</option>
+            <option value="title">Title</option>
+            <option value="credits">Credits</option>
+            <option value="duration">Duration</option>
+          </select>
+          <label className="flex items-center gap-2 text-sm text-gray-700">
+            <input
+              type="checkbox"
+              checked={filters.hasSeats}
+              onChange={(e) => updateFilter('hasSeats', e.target.checked)}
+            />
+            Only courses with open seats
+          </label>
+          <p className="md:col-span-3 text-sm text-gray-500 self-center">
+            Showing {courses.length} of {total} courses
+          </p>
+        </div>
+
         {error && (
           <div className="bg-red-100 border border-red-400 text-red-700 px-4 py-3 rounded mb-6">
             {error}
@@ -80,8 +144,8 @@ const BrowseCourses = () => {
         {courses.length > 0 ? (
           <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
             {courses.map((course) => {
-              const isEnrolled = enrolledCourseIds.has(course.id);
-              const isFull = course.max_students && course.current_enrollments >= course.max_students;
+              const isEnrolled = Boolean(course.enrollment_status);
+              const isFull = course.seats_left === 0;
               
               return (
                 <div key={course.id} className="bg-white rounded-lg shadow-md p-6 hover:shadow-lg transition-shadow">
@@ -137,10 +201,23 @@ const BrowseCourses = () => {
                 </div>
               );
             })}
+            {courses.length < total && (
+              <button
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="md:col-span-2 lg:col-span-3 w-full bg-white text-blue-600 py-3 rounded-lg shadow-md hover:bg-gray-50 disabled:text-gray-400"
+              >
+                {loadingMore ? 'Loading...' : `Load more (${total - courses.length} remaining)`}
+              </button>
+            )}
           </div>
         ) : (
           <div className="bg-white rounded-lg shadow-md p-12 text-center">
-            <p className="text-gray-500 text-lg">No courses available at the moment</p>
+            <p className="text-gray-500 text-lg">
+              {filters.q || filters.credits || filters.hasSeats
+                ? 'No courses match your search'
+                : 'No courses available at the moment'}
+            </p>
           </div>
         )}
       </div>
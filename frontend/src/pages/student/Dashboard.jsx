@@ -15,7 +15,8 @@ const StudentDashboard = () => {
 
   const fetchStats = async () => {
     try {
-      const response = await enrollmentService.getStudentEnrollments(user.id);
+      // Totals come from the precomputed summary; only the latest rows are fetched in full
+      const response = await enrollmentService.getStudentEnrollments(user.id, 5);
       setStats(response.data);
     } catch (err) {
       setError('Failed to load dashboard data');
@@ -31,6 +31,60 @@ studentAPI.interceptors.request.use(addAuthToken);
 courseAPI.interceptors.request.use(addAuthToken);
 enrollmentAPI.interceptors.request.use(addAuthToken);
 
+// Enroll, drop and complete return a causal token; sending it back on later reads
+// makes them see the write even when a lagging replica answers them
+const CAUSAL_TOKEN_KEY = 'causalToken';
+
+const saveCausalToken = (response) => {
+  const token = response.headers['x-causal-token'];
+  if (token) {
+    sessionStorage.setItem(CAUSAL_TOKEN_KEY, token);
+  }
+  return response;
+};
+
+const addCausalToken = (config) => {
+  const token = sessionStorage.getItem(CAUSAL_TOKEN_KEY);
+  if (token) {
+    config.headers['X-Causal-Token'] = token;
+  }
+  return config;
+};
+
+enrollmentAPI.interceptors.response.use(saveCausalToken);
+courseAPI.interceptors.request.use(addCausalToken);
+enrollmentAPI.interceptors.request.use(addCausalToken);
+
+// One key per user action: if the request is retried, the service replays the
+// first response instead of enrolling (or failing with "Already enrolled") again
+const withIdempotencyKey = () => ({
+  headers: { 'Idempotency-Key': crypto.randomUUID() },
+});
+
+// No response means the write may or may not have happened; resending it once with
+// the same key is safe either way
+const retryIdempotent = (error) => {
+  const { config } = error;
+  if (config && !error.response && config.headers['Idempotency-Key'] && !config.idempotentRetry) {
+    config.idempotentRetry = true;
+    return enrollmentAPI.request(config);
+  }
+  return Promise.reject(error);
+};
+
+enrollmentAPI.interceptors.response.use(undefined, retryIdempotent);
+
+// Slow admin operations answer 202 with a job; poll it until it has finished
+const JOB_POLL_INTERVAL_MS = 1000;
+
+const waitForJob = async (api, job) => {
+  while (job.status === 'queued' || job.status === 'running') {
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+    job = (await api.get(`/jobs/${job.id}`)).data;
+  }
+  return job;
+};
+
 // Student Service APIs
 export const studentService = {
   register: (data) => studentAPI.post('/students/register', data),
@@ -44,8 +98,12 @@ export const studentService = {
 export const adminService = {
   login: (data) => studentAPI.post('/admin/login', data),
   getProfile: () => studentAPI.get('/admin/me'),
+  getSummary: (refresh = false) => 
+    studentAPI.get('/admin/summary', { params: refresh ? { refresh } : {} }),
   getAllStudents: (skip = 0, limit = 100) => 
     studentAPI.get('/admin/students', { params: { skip, limit } }),
+  searchStudents: (q, after, limit = 20) => 
+    studentAPI.get('/admin/students/search', { params: { q, after, limit } }),
   getStudentDetails: (id) => studentAPI.get(`/admin/students/${id}`),
 };
 
@@ -53,23 +111,27 @@ export const adminService = {
 export const courseService = {
   getAllCourses: (skip = 0, limit = 100) => 
     courseAPI.get('/courses', { params: { skip, limit } }),
+  searchCourses: (params) => courseAPI.get('/courses/search', { params }),
+  getCatalog: (params) => courseAPI.get('/courses/catalog', { params }),
   getCourse: (id) => courseAPI.get(`/courses/${id}`),
   createCourse: (data) => courseAPI.post('/courses', data),
   updateCourse: (id, data) => courseAPI.put(`/courses/${id}`, data),
-  deleteCourse: (id) => courseAPI.delete(`/courses/${id}`),
+  deleteCourse: async (id) => waitForJob(courseAPI, (await courseAPI.delete(`/courses/${id}`)).data),
 };
 
 // Enrollment Service APIs
 export const enrollmentService = {
-  enrollInCourse: (data) => enrollmentAPI.post('/enrollments', data),
-  dropCourse: (data) => enrollmentAPI.post('/enrollments/drop', data),
-  getStudentEnrollments: (studentId) => 
-    enrollmentAPI.get(`/enrollments/student/${studentId}`),
+  enrollInCourse: (data) => enrollmentAPI.post('/enrollments', data, withIdempotencyKey()),
+  dropCourse: (data) => enrollmentAPI.post('/enrollments/drop', data, withIdempotencyKey()),
+  getStudentEnrollments: (studentId, limit) => 
+    enrollmentAPI.get(`/enrollments/student/${studentId}`, { params: { limit } }),
+  getStudentSummary: (studentId) => 
+    enrollmentAPI.get(`/enrollments/student/${studentId}/summary`),
   getCourseEnrollments: (courseId) => 
     enrollmentAPI.get(`/enrollments/course/${courseId}`),
   updateProgress: (enrollmentId, progress) => 
     enrollmentAPI.put(`/enrollments/${enrollmentId}/progress`, { progress }),
-  markComplete: (data) => enrollmentAPI.post('/enrollments/complete', data),
+  markComplete: (data) => enrollmentAPI.post('/enrollments/complete', data, withIdempotencyKey()),
   getEnrollmentCounts: () => enrollmentAPI.get('/enrollments/counts'),
   getStats: () => enrollmentAPI.get('/enrollments/stats'),
   getAllEnrollments: (skip = 0, limit = 100) => 